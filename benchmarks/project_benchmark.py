@@ -0,0 +1,346 @@
+"""
+Time the main operations of dbt-llm-tools on synthetic dbt projects of increasing size, and write
+the results to a JSON file that can be compared between runs.
+
+Usage:
+    python -m benchmarks.project_benchmark --models 100 1000 10000
+    python -m benchmarks.project_benchmark --models 1000 --output results.json --skip-vector-store
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from benchmarks.synthetic_project import WORDS, generate_project
+from dbt_llm_tools import (
+    BM25Index,
+    DbtModel,
+    DbtProject,
+    HashEmbeddingFunction,
+    LRUCache,
+    VectorStore,
+)
+
+LOOKUP_COUNT = 1000
+QUERY_COUNT = 100
+VECTOR_BACKENDS = ["chroma", "numpy"]
+
+
+def time_operation(
+    operation: Callable[[], None], repeat: int = 1, setup: Callable[[], None] = None
+) -> float:
+    """
+    Time an operation, keeping the fastest of several runs.
+
+    Args:
+        operation (Callable): The operation to time.
+        repeat (int, optional): The number of runs. Defaults to 1.
+        setup (Callable, optional): A function called before every run, which is not timed.
+
+    Returns:
+        float: The duration of the fastest run, in seconds.
+    """
+    best = float("inf")
+
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+
+        start = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def get_git_commit() -> str:
+    """
+    Get the commit of the benchmarked code.
+
+    Returns:
+        str: The hash of the current git commit, or None if it is not known.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_vector_store(  # pylint: disable=unnecessary-lambda
+    storage_backend: str,
+    dbt_models: list[DbtModel],
+    queries: list[str],
+    *,
+    tmp_dir: str,
+    arguments: argparse.Namespace,
+    record: Callable[..., None],
+) -> None:
+    """
+    Time upserting, opening and querying a vector store with a storage backend.
+
+    Args:
+        storage_backend (str): The storage backend of the vector store.
+        dbt_models (list[DbtModel]): The models to upsert.
+        queries (list[str]): The queries to search.
+        tmp_dir (str): The directory of the vector stores.
+        arguments (argparse.Namespace): The command line arguments.
+        record (Callable): The function that records the result of an operation.
+    """
+    suffix = "" if storage_backend == "chroma" else f"_{storage_backend}"
+    stores = []
+
+    def new_store(name: str) -> VectorStore:
+        return VectorStore(
+            "unused",
+            vector_db_path=os.path.join(tmp_dir, f"{storage_backend}_{name}"),
+            embedding_fn=HashEmbeddingFunction(),
+            embedding_cache_path=os.path.join(
+                tmp_dir, f"embeddings_{storage_backend}_{name}.sqlite"
+            ),
+            query_embedding_cache=LRUCache(max_size=0),
+            storage_backend=storage_backend,
+        )
+
+    record(
+        f"upsert_models{suffix}",
+        time_operation(
+            lambda: stores[-1].upsert_models(dbt_models),
+            arguments.repeat,
+            setup=lambda: stores.append(new_store(str(len(stores)))),
+        ),
+        len(dbt_models),
+    )
+    open_script = (
+        "from dbt_llm_tools import HashEmbeddingFunction, VectorStore\n"
+        "VectorStore('unused', vector_db_path="
+        f"{os.path.join(tmp_dir, f'{storage_backend}_{len(stores) - 1}')!r}, "
+        f"embedding_fn=HashEmbeddingFunction(), storage_backend={storage_backend!r})"
+    )
+    record(
+        f"open_vector_store{suffix}",
+        time_operation(
+            lambda: subprocess.run([sys.executable, "-c", open_script], check=True),
+            arguments.repeat,
+        ),
+    )
+    record(
+        f"query_collection{suffix}",
+        time_operation(
+            lambda: [stores[-1].query_collection(query) for query in queries],
+            arguments.repeat,
+        ),
+        len(queries),
+    )
+    record(
+        f"query_collection_many{suffix}",
+        time_operation(
+            lambda: stores[-1].query_collection_many(queries), arguments.repeat
+        ),
+        len(queries),
+    )
+
+
+def benchmark_project(  # pylint: disable=too-many-locals,unnecessary-lambda
+    model_count: int, arguments: argparse.Namespace
+) -> list[dict]:
+    """
+    Generate a synthetic project and time every benchmarked operation on it.
+
+    Args:
+        model_count (int): The number of models of the project.
+        arguments (argparse.Namespace): The command line arguments.
+
+    Returns:
+        list[dict]: The result of every operation.
+    """
+    results = []
+    rng = random.Random(arguments.seed)
+
+    def record(operation: str, seconds: float, calls: int = 1) -> None:
+        results.append(
+            {
+                "models": model_count,
+                "operation": operation,
+                "calls": calls,
+                "seconds": round(seconds, 6),
+                "ms_per_call": round(seconds * 1000 / calls, 6),
+            }
+        )
+        print(
+            f"{model_count:>7} models  {operation:<27} {seconds:>9.3f}s  ({calls} calls)"
+        )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        project_root = os.path.join(tmp_dir, "project")
+        model_names = generate_project(
+            project_root,
+            model_count,
+            depth=arguments.depth,
+            fan_out=arguments.fan_out,
+            columns_per_model=arguments.columns,
+            seed=arguments.seed,
+        )
+        projects = []
+
+        def new_project(storage: str) -> DbtProject:
+            return DbtProject(
+                project_root,
+                database_path=os.path.join(tmp_dir, storage, "directory.json"),
+                package_cache_path=os.path.join(tmp_dir, "packages"),
+            )
+
+        record(
+            "parse",
+            time_operation(
+                lambda: projects[-1].parse(),
+                arguments.repeat,
+                setup=lambda: projects.append(new_project(f"parse_{len(projects)}")),
+            ),
+        )
+        project = projects[-1]
+        storage = f"parse_{len(projects) - 1}"
+
+        record(
+            "parse_incremental",
+            time_operation(lambda: project.parse(incremental=True), arguments.repeat),
+        )
+        record(
+            "get_models_cold",
+            time_operation(
+                lambda: projects[-1].get_models(),
+                arguments.repeat,
+                setup=lambda: projects.append(new_project(storage)),
+            ),
+        )
+        project.get_models()
+        record(
+            "get_models",
+            time_operation(project.get_models, arguments.repeat),
+        )
+
+        lookups = [rng.choice(model_names) for _ in range(LOOKUP_COUNT)]
+        record(
+            "get_single_model",
+            time_operation(
+                lambda: [project.get_single_model(name) for name in lookups],
+                arguments.repeat,
+            ),
+            LOOKUP_COUNT,
+        )
+
+        dbt_models = [
+            DbtModel(model["documentation"])
+            for model in project.get_models()
+            if "documentation" in model
+        ]
+        queries = [
+            " ".join(rng.choice(WORDS) for _ in range(5)) for _ in range(QUERY_COUNT)
+        ]
+        lexical_index = BM25Index()
+        lexical_index.add_many(
+            [model.name for model in dbt_models],
+            [model.as_prompt_text() for model in dbt_models],
+        )
+        record(
+            "bm25_search",
+            time_operation(
+                lambda: [lexical_index.search(query, 20) for query in queries],
+                arguments.repeat,
+            ),
+            QUERY_COUNT,
+        )
+        name_queries = [
+            f"Where is {rng.choice(model_names)}?" for _ in range(QUERY_COUNT)
+        ]
+        record(
+            "bm25_search_names",
+            time_operation(
+                lambda: [lexical_index.search(query, 20) for query in name_queries],
+                arguments.repeat,
+            ),
+            QUERY_COUNT,
+        )
+
+        if arguments.skip_vector_store:
+            return results
+
+        for storage_backend in VECTOR_BACKENDS:
+            benchmark_vector_store(
+                storage_backend,
+                dbt_models,
+                queries,
+                tmp_dir=tmp_dir,
+                arguments=arguments,
+                record=record,
+            )
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--fan-out", type=int, default=3)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--skip-vector-store", action="store_true")
+    parser.add_argument(
+        "--output",
+        help="Path to the JSON results. Defaults to a timestamped file in benchmarks/results.",
+    )
+    arguments = parser.parse_args()
+
+    created_at = datetime.datetime.now(datetime.timezone.utc)
+    output = arguments.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "results",
+        f"project_benchmark_{created_at:%Y%m%dT%H%M%SZ}.json",
+    )
+
+    results = [
+        result
+        for model_count in arguments.models
+        for result in benchmark_project(model_count, arguments)
+    ]
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "benchmark": "project_benchmark",
+                "created_at": created_at.isoformat(),
+                "git_commit": get_git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "parameters": {
+                    key: value
+                    for key, value in vars(arguments).items()
+                    if key != "output"
+                },
+                "results": results,
+            },
+            f,
+            indent=4,
+        )
+
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
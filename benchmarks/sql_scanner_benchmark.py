@@ -0,0 +1,169 @@
+"""
+Compare the single-pass SQL scanner with the regular expressions it replaced.
+
+Usage:
+    python -m benchmarks.sql_scanner_benchmark --files 20000
+    python -m benchmarks.sql_scanner_benchmark --project /path/to/dbt/project
+"""
+
+import argparse
+import glob
+import os
+import random
+import re
+import time
+from typing import Callable
+
+from dbt_llm_tools.sql_scanner import scan_sql
+
+LEGACY_SOURCE_SEARCH_EXPRESSION = r"source\(['\"]*(.*?)['\"]*,\s*['\"]*(.*?)['\"]*\)"
+LEGACY_REF_SEARCH_EXPRESSION = r"ref\(['\"]*(.*?)['\"]*\)"
+LEGACY_ALIAS_SEARCH_EXPRESSION = r"config\([^)]*alias\s*=\s*['\"](.*?)['\"]"
+
+
+def scan_sql_with_regexes(sql_contents: str) -> dict:
+    """
+    Extract refs, sources and the alias of a model with the regular expressions used before the scanner.
+
+    Args:
+        sql_contents (str): The contents of the SQL file.
+
+    Returns:
+        dict: The refs, sources and alias of the model.
+    """
+    alias_search = re.search(LEGACY_ALIAS_SEARCH_EXPRESSION, sql_contents)
+
+    return {
+        "refs": re.findall(LEGACY_REF_SEARCH_EXPRESSION, sql_contents),
+        "sources": re.findall(LEGACY_SOURCE_SEARCH_EXPRESSION, sql_contents),
+        "alias": alias_search.group(1) if alias_search is not None else None,
+    }
+
+
+def generate_model_sql(index: int, model_count: int, rng: random.Random) -> str:
+    """
+    Generate the SQL of a synthetic dbt model with refs, sources, comments and a config block.
+
+    Args:
+        index (int): The index of the model.
+        model_count (int): The number of models in the corpus.
+        rng (random.Random): The random number generator.
+
+    Returns:
+        str: The SQL of the model.
+    """
+    refs = [f"model_{rng.randrange(model_count)}" for _ in range(rng.randint(1, 6))]
+    lines = [
+        f"{{{{ config(materialized='table', tags=['tag_{index % 10}'], alias='alias_{index}') }}}}",
+        f"-- {{{{ ref('commented_model_{index}') }}}}",
+        "{# Jinja comment mentioning {{ ref('old_model') }} #}",
+        "with",
+    ]
+
+    for position, ref in enumerate(refs):
+        lines.append(
+            f"cte_{position} as (select id, 'it''s -- text' as note from {{{{ ref('{ref}') }}}}),"
+        )
+
+    lines.append(
+        f"raw_data as (select * from {{{{ source('raw', 'table_{index % 50}') }}}})"
+    )
+    lines.append("select * from raw_data")
+    lines.extend(
+        f"join cte_{position} using (id) /* join {position} */"
+        for position in range(len(refs))
+    )
+    lines.extend(f"-- filler line {position}" for position in range(rng.randint(5, 40)))
+
+    return "\n".join(lines)
+
+
+def generate_corpus(file_count: int, seed: int = 0) -> list[str]:
+    """
+    Generate a corpus of synthetic dbt models.
+
+    Args:
+        file_count (int): The number of models to generate.
+        seed (int, optional): The seed of the random number generator. Defaults to 0.
+
+    Returns:
+        list[str]: The SQL of every model.
+    """
+    rng = random.Random(seed)
+
+    return [generate_model_sql(index, file_count, rng) for index in range(file_count)]
+
+
+def load_corpus(project_root: str) -> list[str]:
+    """
+    Load the SQL files of a dbt project.
+
+    Args:
+        project_root (str): The root of the dbt project.
+
+    Returns:
+        list[str]: The contents of every SQL file.
+    """
+    corpus = []
+
+    for sql_file in glob.glob(
+        os.path.join(project_root, "**", "*.sql"), recursive=True
+    ):
+        with open(sql_file, encoding="utf-8") as f:
+            corpus.append(f.read())
+
+    return corpus
+
+
+def time_scanner(
+    scanner: Callable[[str], dict], corpus: list[str], repeat: int
+) -> tuple[float, int]:
+    """
+    Time a scanner over a corpus, keeping the best of several runs.
+
+    Args:
+        scanner (Callable): The scanner to time.
+        corpus (list[str]): The SQL files to scan.
+        repeat (int): The number of runs.
+
+    Returns:
+        float: The duration of the fastest run, in seconds.
+        int: The number of refs found.
+    """
+    best = float("inf")
+    ref_count = 0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [scanner(sql_contents) for sql_contents in corpus]
+        best = min(best, time.perf_counter() - start)
+        ref_count = sum(len(result["refs"]) for result in results)
+
+    return best, ref_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--project", help="Scan the SQL files of a dbt project.")
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    corpus = (
+        load_corpus(arguments.project)
+        if arguments.project
+        else generate_corpus(arguments.files)
+    )
+    corpus_size = sum(map(len, corpus)) / 1024 / 1024
+
+    print(f"Scanning {len(corpus)} files ({corpus_size:.1f} MB)")
+
+    for label, scanner in [("regexes", scan_sql_with_regexes), ("scanner", scan_sql)]:
+        duration, ref_count = time_scanner(scanner, corpus, arguments.repeat)
+        print(
+            f"{label:>8}: {duration:.3f}s, {len(corpus) / duration:,.0f} files/s, {ref_count} refs"
+        )
+
+
+if __name__ == "__main__":
+    main()
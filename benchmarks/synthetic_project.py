@@ -0,0 +1,242 @@
+"""
+Generate synthetic dbt projects of any size, to benchmark dbt-llm-tools on projects larger than the test data.
+
+Usage:
+    python benchmarks/synthetic_project.py /tmp/synthetic_project --models 10000 --depth 8 --fan-out 3
+"""
+
+import argparse
+import os
+import random
+
+from dbt_llm_tools.yaml_io import dump_yaml
+
+WORDS = [
+    "account",
+    "active",
+    "amount",
+    "balance",
+    "campaign",
+    "channel",
+    "churn",
+    "country",
+    "customer",
+    "daily",
+    "discount",
+    "event",
+    "invoice",
+    "margin",
+    "marketing",
+    "monthly",
+    "order",
+    "payment",
+    "product",
+    "refund",
+    "region",
+    "revenue",
+    "session",
+    "shipment",
+    "subscription",
+    "supplier",
+    "user",
+    "weekly",
+]
+MODELS_PER_FOLDER = 100
+
+
+def get_model_name(layer: int, index: int) -> str:
+    """
+    Get the name of a synthetic model.
+
+    Args:
+        layer (int): The layer of the model in the DAG, 0 for the staging models.
+        index (int): The index of the model in the project.
+
+    Returns:
+        str: The name of the model.
+    """
+    prefix = "stg" if layer == 0 else f"layer_{layer}"
+
+    return f"{prefix}_model_{index:06d}"
+
+
+def get_sentence(rng: random.Random, word_count: int) -> str:
+    """
+    Get a sentence of random words.
+
+    Args:
+        rng (random.Random): The random number generator.
+        word_count (int): The number of words.
+
+    Returns:
+        str: The sentence.
+    """
+    return " ".join(rng.choice(WORDS) for _ in range(word_count)).capitalize()
+
+
+def get_layers(model_count: int, depth: int) -> list[list[int]]:
+    """
+    Split the models of a project into the layers of its DAG, with the same number of models per layer.
+
+    Args:
+        model_count (int): The number of models.
+        depth (int): The number of layers.
+
+    Returns:
+        list[list[int]]: The indexes of the models in every layer.
+    """
+    layers = [[] for _ in range(min(depth, model_count))]
+
+    for index in range(model_count):
+        layers[index * len(layers) // model_count].append(index)
+
+    return layers
+
+
+def write_file(path: str, contents: str) -> None:
+    """
+    Write a file, creating its folder if needed.
+
+    Args:
+        path (str): The path to the file.
+        contents (str): The contents of the file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(contents)
+
+
+def generate_project(  # pylint: disable=too-many-locals
+    project_root: str,
+    model_count: int,
+    *,
+    depth: int = 5,
+    fan_out: int = 3,
+    columns_per_model: int = 10,
+    seed: int = 0,
+) -> list[str]:
+    """
+    Generate a synthetic dbt project. The models are split into layers: staging models select
+    from a source, and the models of every other layer ref models of the layer before it.
+    Every folder of models has a yaml file that documents its models and their columns.
+
+    Args:
+        project_root (str): The folder to write the project to.
+        model_count (int): The number of models.
+        depth (int, optional): The number of layers of the DAG. Defaults to 5.
+        fan_out (int, optional): The number of refs of every model outside of the staging layer. Defaults to 3.
+        columns_per_model (int, optional): The number of documented columns of every model. Defaults to 10.
+        seed (int, optional): The seed of the random number generator. Defaults to 0.
+
+    Returns:
+        list[str]: The names of the generated models.
+    """
+    rng = random.Random(seed)
+    model_names = []
+
+    write_file(
+        os.path.join(project_root, "dbt_project.yml"),
+        dump_yaml(
+            {
+                "name": "synthetic_project",
+                "version": "1.0.0",
+                "config-version": 2,
+                "model-paths": ["models"],
+            }
+        ),
+    )
+    write_file(
+        os.path.join(project_root, "models", "_sources.yml"),
+        dump_yaml(
+            {
+                "version": 2,
+                "sources": [
+                    {
+                        "name": "raw",
+                        "tables": [{"name": f"table_{i}"} for i in range(50)],
+                    }
+                ],
+            }
+        ),
+    )
+
+    layers = get_layers(model_count, depth)
+
+    for layer, indexes in enumerate(layers):
+        for start in range(0, len(indexes), MODELS_PER_FOLDER):
+            end = start + MODELS_PER_FOLDER
+            folder = os.path.join(
+                project_root,
+                "models",
+                f"layer_{layer}",
+                f"group_{start // MODELS_PER_FOLDER}",
+            )
+            documentation = []
+
+            for index in indexes[start:end]:
+                name = get_model_name(layer, index)
+                columns = [f"{rng.choice(WORDS)}_{i}" for i in range(columns_per_model)]
+
+                if layer == 0:
+                    upstream = [f"{{{{ source('raw', 'table_{index % 50}') }}}}"]
+                else:
+                    upstream = [
+                        f"{{{{ ref('{get_model_name(layer - 1, parent)}') }}}}"
+                        for parent in rng.sample(
+                            layers[layer - 1], min(fan_out, len(layers[layer - 1]))
+                        )
+                    ]
+
+                select_list = ",\n    ".join(columns)
+                joins = "".join(f"\njoin {table} using (id)" for table in upstream[1:])
+                write_file(
+                    os.path.join(folder, f"{name}.sql"),
+                    f"{{{{ config(materialized='table', tags=['layer_{layer}']) }}}}\n"
+                    f"-- {get_sentence(rng, 6)}\n"
+                    f"select\n    {select_list}\nfrom {upstream[0]}{joins}\n",
+                )
+                documentation.append(
+                    {
+                        "name": name,
+                        "description": get_sentence(rng, 12),
+                        "columns": [
+                            {"name": column, "description": get_sentence(rng, 6)}
+                            for column in columns
+                        ],
+                    }
+                )
+                model_names.append(name)
+
+            write_file(
+                os.path.join(folder, "_models.yml"),
+                dump_yaml({"version": 2, "models": documentation}, sort_keys=False),
+            )
+
+    return model_names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("project_root")
+    parser.add_argument("--models", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--fan-out", type=int, default=3)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    model_names = generate_project(
+        arguments.project_root,
+        arguments.models,
+        depth=arguments.depth,
+        fan_out=arguments.fan_out,
+        columns_per_model=arguments.columns,
+        seed=arguments.seed,
+    )
+
+    print(f"Generated {len(model_names)} models in {arguments.project_root}")
+
+
+if __name__ == "__main__":
+    main()
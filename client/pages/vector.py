@@ -70,6 +70,16 @@ with setting_tab:
             help="Enter the folder paths to exclude, one per line.",
         )
 
+        model_selector = st.text_input(
+            "Model selector",
+            help="Enter a dbt node selector, e.g. +customers tag:finance path:models/marts",
+        )
+
+        delete_unselected_models = st.checkbox(
+            "Remove models that are not selected",
+            help="Delete the models in the vector store that are not part of this selection.",
+        )
+
         st.caption("")
 
         st.write("Models to include:")
@@ -92,16 +102,19 @@ with setting_tab:
                     models=convert_text_input_to_list(models_to_include),
                     included_folders=convert_text_input_to_list(folders_to_include),
                     excluded_folders=convert_text_input_to_list(folders_to_exclude),
+                    select=model_selector or None,
                 )
 
         with col2:
             if st.button(
-                "Load to Vector Store", help="Load the models into the vector store."
+                "Load to Vector Store",
+                help="Load the selected models into the vector store.",
             ):
                 models = dbt_project.get_models(
                     models=convert_text_input_to_list(models_to_include),
                     included_folders=convert_text_input_to_list(folders_to_include),
                     excluded_folders=convert_text_input_to_list(folders_to_exclude),
+                    select=model_selector or None,
                 )
 
                 models_to_store = [
@@ -111,9 +124,16 @@ with setting_tab:
                 ]
 
                 # st.write(models_to_store)
-                vector_store.upsert_models(models_to_store)
+                counts = vector_store.sync(
+                    models_to_store, delete_missing=delete_unselected_models
+                )
 
-                st.toast("Models loaded into the vector store!", icon="✅")
+                st.toast(
+                    f"Models loaded into the vector store! {counts['added']} added, "
+                    f"{counts['updated']} updated, {counts['unchanged']} unchanged, "
+                    f"{counts['deleted']} deleted.",
+                    icon="✅",
+                )
 
         with col3:
             if st.button(
@@ -1,15 +1,39 @@
 from dbt_llm_tools.chatbot import Chatbot
 from dbt_llm_tools.dbt_model import DbtModel
 from dbt_llm_tools.dbt_project import DbtProject
+from dbt_llm_tools.directory_store import (
+    DirectoryStore,
+    SqliteDirectoryStore,
+    TinyDbDirectoryStore,
+)
 from dbt_llm_tools.documentation_generator import DocumentationGenerator
+from dbt_llm_tools.embedding_pipeline import EmbeddingPipeline
+from dbt_llm_tools.embeddings import HashEmbeddingFunction, OpenAIEmbeddingFunction
 from dbt_llm_tools.instructions import (
     ANSWER_QUESTION_INSTRUCTIONS,
     INTERPRET_MODEL_INSTRUCTIONS,
 )
+from dbt_llm_tools.lexical_index import BM25Index
+from dbt_llm_tools.project_watcher import ProjectWatcher
+from dbt_llm_tools.query_cache import LRUCache
+from dbt_llm_tools.tracing import (
+    JsonLinesSpanExporter,
+    LoggingSpanExporter,
+    OpenTelemetrySpanExporter,
+    Span,
+    SpanExporter,
+    Tracer,
+    get_tracer,
+)
 from dbt_llm_tools.types import (
     DbtModelDict,
     DbtModelDirectoryEntry,
     ParsedSearchResult,
     PromptMessage,
 )
+from dbt_llm_tools.vector_backends import (
+    ChromaVectorBackend,
+    NumpyVectorBackend,
+    VectorBackend,
+)
 from dbt_llm_tools.vector_store import VectorStore
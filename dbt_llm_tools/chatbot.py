@@ -3,6 +3,7 @@ from openai import OpenAI
 from dbt_llm_tools.dbt_model import DbtModel
 from dbt_llm_tools.dbt_project import DbtProject
 from dbt_llm_tools.instructions import ANSWER_QUESTION_INSTRUCTIONS
+from dbt_llm_tools.tracing import Tracer, get_tracer
 from dbt_llm_tools.types import ParsedSearchResult, PromptMessage
 from dbt_llm_tools.vector_store import VectorStore
 
@@ -33,6 +34,8 @@ class Chatbot:
         vector_db_path: str = ".local_storage/chroma.db",
         embedding_model: str = "text-embedding-3-large",
         chatbot_model: str = "gpt-4o",
+        *,
+        tracer: Tracer = None,
     ) -> None:
         """
         Initializes a chatbot object along with a default set of instructions.
@@ -55,18 +58,25 @@ class Chatbot:
                 The name of the OpenAI chatbot model to be used.
                 Defaults to "gpt-4o".
 
+            tracer (Tracer, optional):
+                The tracer that records the time and tokens spent answering questions, shared with
+                the dbt project and the vector store. Defaults to the tracer returned by get_tracer().
+
         Returns:
             None
         """
         self.__chatbot_model: str = chatbot_model
         self.__openai_api_key: str = openai_api_key
+        self.__tracer: Tracer = tracer or get_tracer()
 
         self.project: DbtProject = DbtProject(
-            dbt_project_root=dbt_project_root, database_path=database_path
+            dbt_project_root=dbt_project_root,
+            database_path=database_path,
+            tracer=self.__tracer,
         )
 
         self.store: VectorStore = VectorStore(
-            openai_api_key, embedding_model, vector_db_path
+            openai_api_key, embedding_model, vector_db_path, tracer=self.__tracer
         )
 
         self.client = OpenAI(api_key=self.__openai_api_key)
@@ -148,6 +158,7 @@ class Chatbot:
         models: list[str] = None,
         included_folders: list[str] = None,
         excluded_folders: list[str] = None,
+        select: str = None,
     ) -> None:
         """
         Upsert the set of models that will be available to your chatbot into a vector store.
@@ -165,13 +176,20 @@ class Chatbot:
             exclude_folders (list[str], optional): A list of paths to all folders that should be excluded
             in model search. Paths are relative to dbt project root.
 
+            select (str, optional): A dbt node selector for more models to load,
+            e.g. "+customers tag:finance path:models/marts".
+
         Returns:
             None
         """
-        models = self.project.get_models(models, included_folders, excluded_folders)
-        self.store.upsert_models(
-            list(map(lambda x: DbtModel(x.get("documentation")), models))
-        )
+        with self.__tracer.span("chatbot.load_models") as span:
+            models = self.project.get_models(
+                models, included_folders, excluded_folders, select
+            )
+            span.add_count("models", len(models))
+            self.store.upsert_models(
+                list(map(lambda x: DbtModel(x.get("documentation")), models))
+            )
 
     def reset_model_db(self) -> None:
         """
@@ -194,26 +212,33 @@ class Chatbot:
         Returns:
             str: The chatbot's response to your question.
         """
-        print("Asking question: ", query)
+        with self.__tracer.span("chatbot.ask_question") as span:
+            print("Asking question: ", query)
 
-        print("\nLooking for closest models to the query...")
+            print("\nLooking for closest models to the query...")
 
-        closest_models = self.store.query_collection(query)
-        model_names = ", ".join(map(lambda x: x["id"], closest_models))
+            closest_models = self.store.query_collection(query)
+            model_names = ", ".join(map(lambda x: x["id"], closest_models))
+            span.add_count("models", len(closest_models))
 
-        if get_model_names_only:
-            return model_names
+            if get_model_names_only:
+                return model_names
 
-        print("Closest models found:", model_names)
+            print("Closest models found:", model_names)
 
-        print("\nPreparing prompt...")
-        prompt = self.__prepare_prompt(closest_models, query)
+            print("\nPreparing prompt...")
+            prompt = self.__prepare_prompt(closest_models, query)
 
-        print("\nCalculating response...")
-        completion = self.client.chat.completions.create(
-            model=self.__chatbot_model,
-            messages=prompt,
-        )
+            print("\nCalculating response...")
+            with self.__tracer.span(
+                "chatbot.completion", model=self.__chatbot_model
+            ) as completion_span:
+                completion = self.client.chat.completions.create(
+                    model=self.__chatbot_model,
+                    messages=prompt,
+                )
+                completion_span.add_token_usage(getattr(completion, "usage", None))
+                span.add_token_usage(getattr(completion, "usage", None))
 
         print("\nResponse received: \n")
         print(completion.choices[0].message.content)
@@ -1,20 +1,41 @@
+# pylint: disable=too-many-lines
 import glob
 import json
 import os
-import re
 from typing import Union
 
-import yaml
-
-from tinydb import TinyDB, Query
-
+from dbt_llm_tools.dependency_graph import DependencyGraph
+from dbt_llm_tools.directory_store import (
+    DirectoryStore,
+    diff_directories,
+    get_directory_store,
+    keep_preserved_fields,
+)
+from dbt_llm_tools.folder_index import FolderIndex
+from dbt_llm_tools.manifest import read_manifest
+from dbt_llm_tools.model_selector import ModelSelector
+from dbt_llm_tools.packages import (
+    PackageCache,
+    find_packages,
+    get_default_package_cache_path,
+    get_package_versions,
+    parse_package,
+)
+from dbt_llm_tools.project_files import (
+    find_changed_files,
+    get_alias_index,
+    get_changed_aliases,
+    get_model_name,
+    parse_project_file,
+    parse_project_files_in_pool,
+)
+from dbt_llm_tools.sql_blob_store import SqlBlobStore
+from dbt_llm_tools.tracing import Tracer, get_tracer
 from dbt_llm_tools.types import DbtModelDirectoryEntry, DbtProjectDirectory
-
-SOURCE_SEARCH_EXPRESSION = r"source\(['\"]*(.*?)['\"]*,\s*['\"]*(.*?)['\"]*\)"
-REF_SEARCH_EXPRESSION = r"ref\(['\"]*(.*?)['\"]*\)"
+from dbt_llm_tools.yaml_io import YamlCache, load_yaml
 
 
-class DbtProject:
+class DbtProject:  # pylint: disable=too-many-instance-attributes
     """
     A class representing a DBT project.
     """
@@ -23,6 +44,13 @@ class DbtProject:
         self,
         dbt_project_root: str,
         database_path: str = ".local_storage/db.json",
+        *,
+        file_manifest_path: str = None,
+        yaml_cache_path: str = None,
+        storage_backend: Union[str, DirectoryStore] = None,
+        sql_blob_path: str = None,
+        package_cache_path: str = None,
+        tracer: Tracer = None,
     ) -> None:
         """
         Initializes a dbt project parser object.
@@ -30,29 +58,87 @@ class DbtProject:
         Args:
             dbt_project_root (str): Root of the dbt prject
             database_path (str, optional): Path to the directory file that stores the parsed dbt project.
+            file_manifest_path (str, optional): Path to the file that records the state of every parsed file,
+                used by incremental parses. Defaults to the database path with a ".manifest.json" extension.
+            yaml_cache_path (str, optional): Path to the folder that caches parsed yaml files by content hash.
+                Every parse removes the entries of the yaml files it did not see.
+                Defaults to a "yaml_cache" folder next to the database file.
+            storage_backend (str | DirectoryStore, optional): Where the directory is stored: "tinydb",
+                "sqlite" or a custom DirectoryStore object. Defaults to "sqlite" for database paths ending
+                in .db, .sqlite or .sqlite3, and to "tinydb" otherwise.
+            sql_blob_path (str, optional): Path to the file that stores the SQL code of the models, which
+                directory entries only reference by hash and offset. Defaults to the database path with
+                a ".sql.pack" extension.
+            package_cache_path (str, optional): Path to the folder that caches the installed dbt packages
+                by package name and version, which can be shared by several projects.
+                Defaults to a "dbt_llm_tools/packages" folder in the user cache directory.
+            tracer (Tracer, optional): The tracer that records the time spent parsing, loading and saving
+                the directory. Defaults to the tracer returned by get_tracer().
 
         Methods:
             parse: Parse the dbt project and store details in a manifest file.
+            parse_manifest: Build the directory from a manifest.json file compiled by dbt.
+            get_model_paths: Get the absolute paths of the folders that contain the models.
             get_single_model: Get a single model by name.
             get_models: Get a list of models based on the provided filters.
+            get_sql_contents: Get the SQL code of a model.
+            get_upstream: Get the models that a model depends on.
+            get_downstream: Get the models that depend on a model.
+            get_subgraph: Get the lineage around a model.
             update_model_directory: Update a model in the directory.
         """
         self.__project_root = dbt_project_root
+        self.__tracer = tracer or get_tracer()
         dbt_project_file = os.path.join(dbt_project_root, "dbt_project.yml")
 
         if not os.path.isfile(dbt_project_file):
             raise Exception("No dbt project found in the specified folder")
 
-        self.__database_path = database_path
         os.makedirs(os.path.dirname(database_path), exist_ok=True)
+        self.__directory_store = get_directory_store(database_path, storage_backend)
+
+        if file_manifest_path is None:
+            file_manifest_path = os.path.splitext(database_path)[0] + ".manifest.json"
+        self.__file_manifest_path = file_manifest_path
+
+        if yaml_cache_path is None:
+            yaml_cache_path = os.path.join(os.path.dirname(database_path), "yaml_cache")
+        self.__yaml_cache_path = yaml_cache_path
+
+        if sql_blob_path is None:
+            sql_blob_path = os.path.splitext(database_path)[0] + ".sql.pack"
+        self.__sql_blob_store = SqlBlobStore(sql_blob_path)
+        self.__package_cache = PackageCache(
+            package_cache_path or get_default_package_cache_path()
+        )
 
         with open(dbt_project_file, encoding="utf-8") as f:
-            project_config = yaml.safe_load(f)
+            project_config = load_yaml(f)
+            self.__project_name = project_config.get("name")
             self.__model_paths = project_config.get("model-paths", ["models"])
+            self.__target_path = project_config.get("target-path", "target")
+            self.__packages_path = project_config.get(
+                "packages-install-path", "dbt_packages"
+            )
+
+        self.__model_alias_index: dict[str, str] = {}
+        self.__package_model_index: dict[str, str] = {}
+        self.__directory_cache: Union[DbtProjectDirectory, None] = None
+        self.__directory_cache_version = None
+        self.__folder_index: Union[FolderIndex, None] = None
+        self.__lineage_graph: Union[DependencyGraph, None] = None
+        self.__model_selector: Union[ModelSelector, None] = None
+        self.__scan_files()
 
+    def __scan_files(self) -> None:
+        """
+        Find all the SQL and yaml files in the model paths and index the SQL files by model name.
+        """
         self.__sql_files = self.__get_all_files("sql")
         self.__yaml_files = self.__get_all_files("yml")
 
+        self.__model_path_index = self.__build_model_path_index(self.__sql_files)
+
     def __get_all_files(self, file_extension: str):
         """
         Get all files of a certain type in the dbt project.
@@ -75,82 +161,149 @@ class DbtProject:
                 )
             )
 
-        return files
+        return sorted(files)
 
-    def __find_upstream_references(
-        self, file_path: str, recursive: bool = False, dependencies: list[str] = None
-    ):
+    def __build_model_path_index(self, sql_files: list[str]) -> dict[str, list[str]]:
+        """
+        Build an index from model names to the SQL files that define them.
+        Models with the same name in several folders keep all their paths, in file order.
+
+        Args:
+            sql_files (list): A list of SQL files in the dbt project.
+
+        Returns:
+            dict: A dictionary mapping model names to lists of SQL file paths.
+        """
+        index = {}
+
+        for sql_file in sql_files:
+            index.setdefault(get_model_name(sql_file), []).append(sql_file)
+
+        return index
+
+    def __resolve_model_name(self, name: str) -> str:
         """
-        Find upstream references in a SQL file.
+        Resolve a name used in a ref() to the name of the model it points to.
 
         Args:
-            file_path (str): The path to the SQL file.
-            recursive (bool, optional): Whether to recursively search for upstream references.
-            dependencies (list, optional): A list of dependencies to add to.
+            name (str): A model name or alias, optionally prefixed with a package name, e.g. "dbt_utils.date_spine".
 
         Returns:
-            list: A list of upstream references.
+            str: The model name, or the given name if it does not match any model. Models of this project
+            take precedence over the models of installed packages, which have namespaced names.
         """
-        if dependencies is None:
-            dependencies = []
+        if name in self.__model_path_index:
+            return name
 
-        with open(file_path, encoding="utf-8") as f:
-            file_contents = f.read()
+        if name in self.__model_alias_index:
+            return self.__model_alias_index[name]
 
-        search_results = re.findall(REF_SEARCH_EXPRESSION, file_contents)
-        unique_results = list(set(search_results))
+        package_name, _, model_name = name.rpartition(".")
+        if package_name == self.__project_name:
+            return self.__resolve_model_name(model_name)
 
-        if recursive:
-            for result in unique_results:
-                if result in dependencies or result in file_path:
-                    continue
+        return self.__package_model_index.get(name, name)
 
-                sub_file_path = next(
-                    (x for x in self.__sql_files if x.endswith(f"/{result}.sql")), None
+    def __resolve_dependencies(
+        self, models: dict[str, dict], model_names: set[str] = None
+    ) -> None:
+        """
+        Build the ref graph of the parsed models in memory and set the transitive
+        dependencies of every model from it.
+
+        Args:
+            models (dict): A dictionary of parsed models keyed by model name.
+            model_names (set, optional): Only update the dependencies of these models.
+                Defaults to all models.
+        """
+        for model in models.values():
+            if "refs" in model:
+                model["refs"] = list(
+                    dict.fromkeys(map(self.__resolve_model_name, model["refs"]))
                 )
-                if sub_file_path is not None:
-                    dependencies = self.__find_upstream_references(
-                        file_path=sub_file_path,
-                        recursive=True,
-                        dependencies=dependencies,
-                    )
 
-        return dependencies + unique_results
+        graph = DependencyGraph(
+            {name: model["refs"] for name, model in models.items() if "refs" in model}
+        )
+
+        for cycle in graph.get_cycles():
+            print(
+                f"Warning: found a reference cycle between models: {', '.join(cycle)}"
+            )
+
+        for name, model in models.items():
+            if "refs" in model and (model_names is None or name in model_names):
+                model["deps"] = graph.get_deps(name)
 
-    def __parse_sql_file(self, sql_file: str):
+    def __store_sql_contents(self, models: list[dict]) -> None:
         """
-        Parse a SQL file and return a dictionary with the file metadata.
+        Move the SQL code of models to the SQL blob store, replacing it with the hash and offset of its blob.
 
         Args:
-            sql_file (str): The path to the SQL file.
+            models (list): The models to update in place. Models without SQL code are left unchanged.
+        """
+        models = [model for model in models if "sql_contents" in model]
+        locations = self.__sql_blob_store.put_many(
+            [model.pop("sql_contents") for model in models]
+        )
 
-        Returns:
-            dict: A dictionary containing the parsed SQL file metadata.
+        for model, (sql_hash, sql_offset) in zip(models, locations):
+            model["sql_hash"] = sql_hash
+            model["sql_offset"] = sql_offset
+
+    def __compact_sql_blobs(self, directory: DbtProjectDirectory) -> None:
         """
-        with open(sql_file, encoding="utf-8") as f:
-            sql_contents = f.read()
+        Drop the SQL code that no model of a full directory uses from the SQL blob store,
+        updating the offsets of the blobs of the models.
 
-        source_search = re.findall(SOURCE_SEARCH_EXPRESSION, sql_contents)
+        Args:
+            directory (dict): The directory to update in place.
+        """
+        models = [
+            model for model in directory["models"].values() if "sql_hash" in model
+        ]
+        offsets = self.__sql_blob_store.compact({model["sql_hash"] for model in models})
 
-        sources = [{"name": match[0], "table": match[1]} for match in source_search]
+        for model in models:
+            model["sql_offset"] = offsets.get(model["sql_hash"])
 
-        return {
-            "type": "model",
-            "absolute_path": sql_file,
-            "relative_path": sql_file.replace(self.__project_root, ""),
-            "name": os.path.basename(sql_file).replace(".sql", ""),
-            "refs": self.__find_upstream_references(sql_file, False),
-            "deps": self.__find_upstream_references(sql_file, True),
-            "sources": sources,
-            "sql_contents": sql_contents,
-        }
+    def __add_packages(self, directory: DbtProjectDirectory) -> None:
+        """
+        Add the models and sources of the installed dbt packages to a directory, parsing every package
+        version only once thanks to the package cache. Package models and sources have namespaced names.
 
-    def __parse_yaml_files(self, yaml_files: list[str]):
+        Args:
+            directory (dict): The directory to update in place.
         """
-        Extract documentation from the parsed yaml files.
+        self.__package_model_index = {}
+
+        with self.__tracer.span("dbt_project.add_packages") as span:
+            for package_root in find_packages(
+                self.__project_root, self.__packages_path
+            ):
+                package = parse_package(
+                    self.__project_root,
+                    package_root,
+                    self.__yaml_cache_path,
+                    self.__package_cache,
+                )
+                self.__store_sql_contents(list(package["models"].values()))
+                span.add_count("packages")
+                span.add_count("models", len(package["models"]))
+
+                for name, model in package["models"].items():
+                    self.__package_model_index.setdefault(name.split(".", 1)[1], name)
+                    directory["models"].setdefault(name, model)
+
+                for name, source in package["sources"].items():
+                    directory["sources"].setdefault(name, source)
+
+    def __merge_yaml_files(self, yaml_records: dict[str, dict]):
+        """
+        Merge the documentation extracted from all the yaml files.
 
         Args:
-            yaml_files (list): A list of yaml files to parse.
+            yaml_records (dict): The file manifest records of the yaml files, keyed by file path.
 
         Returns:
             dict: A dictionary containing the parsed models.
@@ -159,91 +312,565 @@ class DbtProject:
         models = {}
         sources = {}
 
-        for yaml_path in yaml_files:
-            with open(yaml_path, encoding="utf-8") as f:
-                yaml_contents = yaml.safe_load(f)
+        for yaml_path, record in yaml_records.items():
+            for name, model in record["models"].items():
+                models[name] = {**model, "yaml_path": yaml_path}
 
-            if yaml_contents is None:
-                continue
+            for name, source in record["sources"].items():
+                sources[name] = {**source, "type": "source", "yaml_path": yaml_path}
 
-            for model in yaml_contents.get("models", []):
-                model["yaml_path"] = yaml_path
-                models[model["name"]] = model
+        return models, sources
 
-            for source in yaml_contents.get("sources", []):
-                source["type"] = "source"
-                source["yaml_path"] = yaml_path
-                sources[source["name"]] = source
+    def __build_directory(
+        self, sql_models: dict[str, dict], yaml_records: dict[str, dict]
+    ) -> DbtProjectDirectory:
+        """
+        Attach the documentation from the yaml files to the parsed SQL models.
 
-        return models, sources
+        Args:
+            sql_models (dict): A dictionary of parsed SQL models keyed by model name.
+            yaml_records (dict): The file manifest records of the yaml files, keyed by file path.
+
+        Returns:
+            dict: The parsed directory.
+        """
+        documented_models, documented_sources = self.__merge_yaml_files(yaml_records)
+        self.__store_sql_contents(list(sql_models.values()))
+
+        for model in sql_models.values():
+            model.pop("yaml_path", None)
+            model.pop("documentation", None)
+
+        for model_name, model_dict in documented_models.items():
+            yaml_path = model_dict.pop("yaml_path")
+
+            if model_name in sql_models:
+                sql_models[model_name]["yaml_path"] = yaml_path
+                sql_models[model_name]["documentation"] = model_dict
+            else:
+                sql_models[model_name] = {
+                    "yaml_path": yaml_path,
+                    "documentation": model_dict,
+                }
+
+        return {
+            "models": sql_models,
+            "sources": documented_sources,
+        }
+
+    def __load_file_manifest(self) -> Union[dict, None]:
+        """
+        Load the file manifest written by the last parse.
+
+        Returns:
+            dict: The file manifest records keyed by file path, or None if there is no manifest.
+        """
+        if not os.path.isfile(self.__file_manifest_path):
+            return None
+
+        with open(self.__file_manifest_path, encoding="utf-8") as f:
+            return json.load(f)["files"]
+
+    def __save_file_manifest(self, file_records: dict[str, dict]) -> None:
+        """
+        Save the state of all the parsed files to the file manifest.
+
+        Args:
+            file_records (dict): The file manifest records keyed by file path.
+        """
+        with open(self.__file_manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"files": file_records}, f)
+
+    def __prune_yaml_cache(self, file_records: dict[str, dict]) -> None:
+        """
+        Remove the cached yaml documents of the yaml files that were not seen by the current parse.
+
+        Args:
+            file_records (dict): The file manifest records of the current parse, keyed by file path.
+        """
+        YamlCache(self.__yaml_cache_path).prune(
+            {
+                record["hash"]
+                for file_path, record in file_records.items()
+                if not file_path.endswith(".sql")
+            }
+        )
 
-    def __get_directory(self):
+    def __get_directory(self) -> DbtProjectDirectory:
         """
-        Get the parsed directory from the directory file.
+        Get the parsed directory, loading it from the directory store only when the stored
+        directory has changed since it was last loaded. The returned directory is shared with
+        later calls and must not be modified.
 
         Returns:
             dict: The parsed directory.
         """
-        with open(self.__database_path, encoding="utf-8") as f:
-            return json.load(f)
+        version = self.__directory_store.get_version()
+
+        if (
+            self.__directory_cache is not None
+            and version is not None
+            and version == self.__directory_cache_version
+        ):
+            return self.__directory_cache
+
+        with self.__tracer.span("dbt_project.load_directory") as span:
+            self.__directory_cache = {
+                "models": {
+                    model["name"]: model
+                    for model in self.__directory_store.search("model")
+                },
+                "sources": {
+                    source["name"]: source
+                    for source in self.__directory_store.search("source")
+                },
+            }
+            span.add_count("models", len(self.__directory_cache["models"]))
+        self.__directory_cache_version = version
+        self.__folder_index = None
+        self.__lineage_graph = None
+        self.__model_selector = None
+
+        return self.__directory_cache
+
+    def __get_lineage_graph(self, model_name: str = None) -> DependencyGraph:
+        """
+        Get the ref graph of the models in the directory, building it when the directory was reloaded.
+        The graph holds the upstream and downstream edges of every model in memory.
+
+        Args:
+            model_name (str, optional): The name of the model the graph is needed for, which must exist.
+
+        Returns:
+            DependencyGraph: The ref graph.
+        """
+        models = self.__get_directory()["models"]
+
+        if model_name is not None and model_name not in models:
+            raise Exception(f"Model {model_name} not found in the directory")
+
+        if self.__lineage_graph is None:
+            self.__lineage_graph = DependencyGraph(
+                {
+                    name: model["refs"]
+                    for name, model in models.items()
+                    if "refs" in model
+                }
+            )
+
+        return self.__lineage_graph
+
+    def __get_model_selector(self) -> ModelSelector:
+        """
+        Get the selector of the models in the directory, building it when the directory was reloaded.
+
+        Returns:
+            ModelSelector: The model selector.
+        """
+        models = self.__get_directory()["models"].values()
+
+        if self.__model_selector is None:
+            self.__model_selector = ModelSelector(
+                list(models), self.__get_lineage_graph(), self.__get_folder_index()
+            )
+
+        return self.__model_selector
+
+    def __get_folder_index(self) -> FolderIndex:
+        """
+        Get the folder index of the models in the directory, building it when the directory was reloaded.
+        Models are identified by their position in the directory.
+
+        Returns:
+            FolderIndex: The folder index.
+        """
+        models = self.__get_directory()["models"].values()
+
+        if self.__folder_index is None:
+            self.__folder_index = FolderIndex(
+                self.__project_root,
+                [
+                    [
+                        model[key]
+                        for key in ["absolute_path", "yaml_path"]
+                        if key in model
+                    ]
+                    for model in models
+                ],
+            )
+
+        return self.__folder_index
 
     def __save_directory(self, directory):
         """
-        Save the parsed directory to a file.
+        Save a fully parsed directory to the directory store. The directory is diffed against the stored
+        directory like in incremental parses, so that entries are replaced as a whole and the entries that
+        no longer exist are removed. Fields that parsing does not produce, like the interpretation of
+        a model, are kept from the stored entries.
 
         Args:
             directory (dict): The directory to save.
         """
-        db = TinyDB(self.__database_path, sort_keys=True, indent=4)
-        Model = Query()  # pylint: disable=invalid-name
-        Source = Query()  # pylint: disable=invalid-name
+        stored_directory = self.__get_directory()
+
+        self.__replace_directory_entries(
+            *diff_directories(
+                stored_directory,
+                {
+                    entry_type: {
+                        name: keep_preserved_fields(
+                            entry, stored_directory[entry_type].get(name)
+                        )
+                        for name, entry in directory[entry_type].items()
+                    }
+                    for entry_type in ["models", "sources"]
+                },
+            )
+        )
 
-        for name, model in directory["models"].items():
-            if "name" in model:
-                db.upsert(model, Model.name == name)
+    def __replace_directory_entries(
+        self, entries: list[dict], removed_entries: list[dict]
+    ) -> None:
+        """
+        Replace individual entries in the directory store and remove the ones that no longer exist.
 
-        for name, source in directory["sources"].items():
-            if "name" in source:
-                db.upsert(source, Source.name == source["name"])
+        Args:
+            entries (list): The model and source entries to write, replacing any existing entry.
+            removed_entries (list): The model and source entries to remove.
+        """
+        if not entries and not removed_entries:
+            return
 
-    def parse(self) -> DbtProjectDirectory:
+        self.__directory_cache = None
+
+        with self.__tracer.span("dbt_project.save_directory") as span:
+            span.add_count("entries", len(entries))
+            span.add_count("removed_entries", len(removed_entries))
+            self.__directory_store.replace_many(entries, removed_entries)
+
+    def __parse_all_files(self, jobs: int = 1) -> DbtProjectDirectory:
         """
-        Parse the dbt project and store details in a manifest file.
+        Parse every SQL and yaml file in the project and save the results.
+
+        Args:
+            jobs (int, optional): The number of worker processes to use. Defaults to 1.
 
         Returns:
             dict: The parsed directory.
         """
-        source_sql_models = {}
+        file_records = {}
+        sql_models = {}
+        file_paths = self.__sql_files + self.__yaml_files
+
+        with self.__tracer.span("dbt_project.parse_files", jobs=jobs) as span:
+            parsed_files = parse_project_files_in_pool(
+                self.__project_root,
+                file_paths,
+                self.__yaml_cache_path,
+                jobs,
+                timings=span.counts,
+            )
+            span.add_count("files", len(file_paths))
+
+        for file_path, (record, parsed_model) in parsed_files.items():
+            file_records[file_path] = record
+
+            if parsed_model is None:
+                continue
 
-        for sql_file in self.__sql_files:
-            parsed_model = self.__parse_sql_file(sql_file)
-            source_sql_models[parsed_model["name"]] = parsed_model
+            model_name = parsed_model["name"]
+            sql_files = self.__model_path_index[model_name]
 
-        documented_models, documented_sources = self.__parse_yaml_files(
-            self.__yaml_files
+            if file_path != sql_files[0]:
+                print(
+                    f"Warning: found {len(sql_files)} models named {model_name}, using {sql_files[0]}"
+                )
+                continue
+
+            sql_models[model_name] = parsed_model
+
+        self.__model_alias_index = get_alias_index(
+            file_records, self.__model_path_index
         )
+        directory = self.__build_directory(
+            sql_models,
+            {path: file_records[path] for path in self.__yaml_files},
+        )
+        self.__add_packages(directory)
+        self.__resolve_dependencies(directory["models"])
+        self.__compact_sql_blobs(directory)
 
-        for model_name, model_dict in documented_models.items():
-            yaml_path = model_dict.pop("yaml_path")
+        self.__save_directory(directory)
+        self.__save_file_manifest(file_records)
+        self.__prune_yaml_cache(file_records)
 
-            if model_name in source_sql_models:
-                source_sql_models[model_name]["yaml_path"] = yaml_path
-                source_sql_models[model_name]["documentation"] = model_dict
-            else:
-                source_sql_models[model_name] = {
-                    "yaml_path": yaml_path,
-                    "documentation": model_dict,
-                }
+        return directory
+
+    def __find_changed_files(self, previous_records: dict[str, dict], jobs: int = 1):
+        """
+        Re-parse the files that changed since the last parse.
+
+        Args:
+            previous_records (dict): The file manifest records written by the last parse.
+            jobs (int, optional): The number of worker processes to use. Defaults to 1.
+
+        Returns:
+            dict: The current file manifest records keyed by file path.
+            dict: The parsed models of the added and changed SQL files keyed by file path.
+            set: The paths of the added, changed and deleted files.
+        """
+        with self.__tracer.span("dbt_project.parse_files", jobs=jobs) as span:
+            file_records, parsed_models, changed_files = find_changed_files(
+                self.__project_root,
+                self.__sql_files + self.__yaml_files,
+                previous_records,
+                self.__yaml_cache_path,
+                jobs,
+                timings=span.counts,
+            )
+            span.add_count("files", len(file_records))
+            span.add_count("changed_files", len(changed_files))
+
+        return file_records, parsed_models, changed_files
+
+    def __parse_changed_files(
+        self, previous_records: dict[str, dict], jobs: int = 1
+    ) -> Union[DbtProjectDirectory, None]:
+        """
+        Re-parse only the files that were added, changed or deleted since the last parse, and update
+        the directory entries affected by them.
+
+        Args:
+            previous_records (dict): The file manifest records written by the last parse.
+            jobs (int, optional): The number of worker processes to use. Defaults to 1.
+
+        Returns:
+            dict: The parsed directory, or None if the stored directory does not match the file manifest.
+        """
+        previous_directory = self.__get_directory()
+
+        file_records, parsed_models, changed_files = self.__find_changed_files(
+            previous_records, jobs
+        )
+
+        previous_alias_index = get_alias_index(
+            previous_records, self.__model_path_index
+        )
+        self.__model_alias_index = get_alias_index(
+            file_records, self.__model_path_index
+        )
+
+        sql_models = {
+            name: dict(model)
+            for name, model in previous_directory["models"].items()
+            if "absolute_path" in model and "package_name" not in model
+        }
+        changed_models = {
+            get_model_name(file_path)
+            for file_path in changed_files
+            if file_path.endswith(".sql")
+        }
+
+        if any(
+            name not in sql_models and name not in changed_models
+            for name in self.__model_path_index
+        ):
+            return None
+
+        # Stored refs were resolved with the previous aliases, so the models that ref a changed alias are parsed again.
+        changed_refs = get_changed_aliases(
+            previous_alias_index, self.__model_alias_index
+        )
+        changed_models |= {
+            name
+            for name, model in sql_models.items()
+            if changed_refs.intersection(model.get("refs", []))
+            and name in self.__model_path_index
+        }
+
+        for model_name in changed_models:
+            if model_name not in self.__model_path_index:
+                sql_models.pop(model_name, None)
+                continue
+
+            sql_file = self.__model_path_index[model_name][0]
+            if sql_file not in parsed_models:
+                file_records[sql_file], parsed_models[sql_file] = parse_project_file(
+                    self.__project_root, sql_file, self.__yaml_cache_path
+                )
+
+            sql_models[model_name] = keep_preserved_fields(
+                parsed_models[sql_file], sql_models.get(model_name)
+            )
+
+        directory = self.__build_directory(
+            sql_models,
+            {path: file_records[path] for path in self.__yaml_files},
+        )
+        self.__add_packages(directory)
+
+        affected_models = changed_models | {
+            name
+            for name, model in directory["models"].items()
+            if changed_models.intersection(model.get("deps", []))
+            or "package_name" in model
+        }
+        self.__resolve_dependencies(
+            directory["models"],
+            (
+                affected_models
+                if get_package_versions(previous_directory["models"])
+                == get_package_versions(directory["models"])
+                else None
+            ),
+        )
+
+        self.__replace_directory_entries(
+            *diff_directories(previous_directory, directory)
+        )
+        self.__save_file_manifest(file_records)
+        self.__prune_yaml_cache(file_records)
+
+        return directory
+
+    def parse(self, incremental: bool = False, jobs: int = 1) -> DbtProjectDirectory:
+        """
+        Parse the dbt project and store details in a manifest file. The models and sources of the dbt
+        packages installed in the project are added with names namespaced by package, e.g. "dbt_utils.date_spine".
+
+        Args:
+            incremental (bool, optional): Only re-parse the files that were added, changed or deleted
+                since the last parse, based on their modification time, size and content hash.
+                Falls back to a full parse when there is no previous parse to build on. Defaults to False.
+            jobs (int, optional): The number of worker processes used to read and parse files,
+                -1 to use all available cores. Defaults to 1, which parses files in the current process.
+
+        Returns:
+            dict: The parsed directory.
+        """
+        with self.__tracer.span(
+            "dbt_project.parse", incremental=incremental, jobs=jobs
+        ) as span:
+            self.__scan_files()
+            directory = None
+
+            if incremental:
+                previous_records = self.__load_file_manifest()
+
+                if previous_records is not None:
+                    directory = self.__parse_changed_files(previous_records, jobs)
+
+            span.set_attribute("full_parse", directory is None)
+            directory = directory or self.__parse_all_files(jobs)
+            span.add_count("models", len(directory["models"]))
+            span.add_count("sources", len(directory["sources"]))
+
+            return directory
+
+    def parse_manifest(self, manifest_path: str = None) -> DbtProjectDirectory:
+        """
+        Build the directory from a manifest.json file compiled by dbt instead of scanning the SQL files.
+        The manifest is streamed one node at a time, so large manifests are never loaded into memory
+        as a whole. Only the models and sources of this project are added to the directory.
+
+        Args:
+            manifest_path (str, optional): Path to the manifest.json file.
+                Defaults to manifest.json in the target path of the project.
+
+        Returns:
+            dict: The parsed directory.
+        """
+        if manifest_path is None:
+            manifest_path = os.path.join(
+                self.__project_root, self.__target_path, "manifest.json"
+            )
+
+        if not os.path.isfile(manifest_path):
+            raise Exception(f"No dbt manifest found at {manifest_path}")
+
+        with self.__tracer.span("dbt_project.parse_manifest") as span:
+            models, sources, aliases = read_manifest(
+                self.__project_root, self.__project_name, manifest_path
+            )
+            self.__model_alias_index.update(aliases)
+            self.__store_sql_contents(list(models.values()))
+            self.__resolve_dependencies(models)
+            span.add_count("models", len(models))
+            span.add_count("sources", len(sources))
 
         directory = {
-            "models": source_sql_models,
-            "sources": documented_sources,
+            "models": models,
+            "sources": sources,
         }
 
+        self.__compact_sql_blobs(directory)
         self.__save_directory(directory)
 
         return directory
 
+    @classmethod
+    def from_manifest(
+        cls,
+        manifest_path: str,
+        dbt_project_root: str = None,
+        database_path: str = ".local_storage/db.json",
+        *,
+        file_manifest_path: str = None,
+        yaml_cache_path: str = None,
+        storage_backend: Union[str, DirectoryStore] = None,
+        sql_blob_path: str = None,
+        package_cache_path: str = None,
+        tracer: Tracer = None,
+    ) -> "DbtProject":
+        """
+        Create a dbt project and build its directory from a manifest.json file compiled by dbt.
+
+        Args:
+            manifest_path (str): Path to the manifest.json file.
+            dbt_project_root (str, optional): Root of the dbt project.
+                Defaults to the parent of the folder that contains the manifest.
+            database_path (str, optional): Path to the directory file that stores the parsed dbt project.
+            file_manifest_path (str, optional): Path to the file that records the state of every parsed file.
+            yaml_cache_path (str, optional): Path to the folder that caches parsed yaml files by content hash.
+            storage_backend (str | DirectoryStore, optional): Where the directory is stored.
+            sql_blob_path (str, optional): Path to the file that stores the SQL code of the models.
+            package_cache_path (str, optional): Path to the folder that caches the installed dbt packages.
+            tracer (Tracer, optional): The tracer that records the time spent building and saving the directory.
+
+        Returns:
+            DbtProject: The dbt project, with its directory built from the manifest.
+        """
+        if dbt_project_root is None:
+            dbt_project_root = os.path.dirname(
+                os.path.dirname(os.path.abspath(manifest_path))
+            )
+
+        project = cls(
+            dbt_project_root,
+            database_path=database_path,
+            file_manifest_path=file_manifest_path,
+            yaml_cache_path=yaml_cache_path,
+            storage_backend=storage_backend,
+            sql_blob_path=sql_blob_path,
+            package_cache_path=package_cache_path,
+            tracer=tracer,
+        )
+        project.parse_manifest(manifest_path)
+
+        return project
+
+    def get_model_paths(self) -> list[str]:
+        """
+        Get the absolute paths of the folders that contain the models, as set by model-paths in dbt_project.yml.
+
+        Returns:
+            list: The paths of the model folders.
+        """
+        return [
+            os.path.abspath(os.path.join(self.__project_root, path))
+            for path in self.__model_paths
+        ]
+
     def get_single_model(self, model_name: str) -> Union[DbtModelDirectoryEntry, None]:
         """
         Get a single model by name.
@@ -257,17 +884,16 @@ class DbtProject:
         if model_name is None:
             raise Exception("No model name provided")
 
-        # directory = self.__get_directory()
-        db = TinyDB(self.__database_path)
-        Model = Query()  # pylint: disable=invalid-name
+        model = self.__get_directory()["models"].get(model_name)
 
-        return db.get(Model.name == model_name)
+        return dict(model) if model is not None else None
 
     def get_models(
         self,
         models: list[str] = None,
         included_folders: list[str] = None,
         excluded_folders: list[str] = None,
+        select: str = None,
     ):
         """
         Get a list of models based on the provided filters.
@@ -276,38 +902,136 @@ class DbtProject:
             models (list, optional): A list of model names to get.
             included_folders (list, optional): A list of folders to include in the search for sql or yaml files.
             excluded_folders (list, optional): A list of folders to exclude from the search for sql or yaml files.
+            select (str, optional): A dbt node selector for more models to get, e.g. "+customers tag:finance".
+                Supports model names with wildcards, the tag: and path: methods, the +, n+, + and +n graph
+                operators, spaces for unions and commas for intersections.
 
         Returns:
-            list: A list of DbtModel objects.
+            list: A list of DbtModel objects, with the models requested by name first, followed by the
+            models found in the included folders or matched by the selector in directory order.
+            Every model is returned once.
         """
-        searched_models = []
+        directory_models = self.__get_directory()["models"]
+        all_models = list(directory_models.values())
+        folder_index = self.__get_folder_index()
+        selected_models = (
+            self.__get_model_selector().select(select) if select is not None else set()
+        )
 
-        db = TinyDB(self.__database_path)
-        Model = Query()  # pylint: disable=invalid-name
-        File = Query()  # pylint: disable=invalid-name
+        searched_models = {
+            model: directory_models[model]
+            for model in models or []
+            if model in directory_models
+        }
+
+        if models is None and included_folders is None and select is None:
+            included_positions = range(len(all_models))
+        else:
+            included_positions = sorted(
+                folder_index.find(included_folders or [])
+                | {
+                    position
+                    for position, model in enumerate(all_models)
+                    if model["name"] in selected_models
+                }
+            )
 
-        if models is None and included_folders is None:
-            searched_models = db.search(File.type == "model")
+        for position in included_positions:
+            searched_models.setdefault(
+                all_models[position]["name"], all_models[position]
+            )
 
-        for model in models or []:
-            if model := db.get(Model.name == model):
-                searched_models.append(model)
+        excluded_models = {
+            all_models[position]["name"]
+            for position in folder_index.find(excluded_folders or [])
+        }
 
-        for included_folder in included_folders or []:
-            for model in db.search(File.type == "model"):
-                if included_folder in model.get(
-                    "absolute_path", ""
-                ) or included_folder in model.get("yaml_path", ""):
-                    searched_models.append(model)
+        return [
+            dict(model)
+            for name, model in searched_models.items()
+            if name not in excluded_models
+        ]
 
-        for excluded_folder in excluded_folders or []:
-            for model in searched_models.copy():
-                if excluded_folder in model.get(
-                    "absolute_path", ""
-                ) or excluded_folder in model.get("yaml_path", ""):
-                    searched_models.remove(model)
+    def get_sql_contents(self, model: dict) -> Union[str, None]:
+        """
+        Get the SQL code of a model. Directory entries do not hold the code, which is only loaded
+        from the SQL blob store when it is requested.
 
-        return searched_models
+        Args:
+            model (dict): The directory entry of the model.
+
+        Returns:
+            str: The SQL code, or None if the model has no SQL file. Entries written before the
+            SQL blob store existed hold the code itself.
+        """
+        if "sql_hash" in model:
+            return self.__sql_blob_store.get(model["sql_hash"], model.get("sql_offset"))
+
+        return model.get("sql_contents")
+
+    def get_upstream(self, model_name: str, depth: int = None) -> list[str]:
+        """
+        Get the models that a model depends on, directly or indirectly.
+
+        Args:
+            model_name (str): The name of the model.
+            depth (int, optional): The maximum number of ref() edges to follow, e.g. 1 for the direct parents.
+                Defaults to no limit.
+
+        Returns:
+            list: The names of the upstream models, nearest first.
+        """
+        return self.__get_lineage_graph(model_name).get_upstream(model_name, depth)
+
+    def get_downstream(self, model_name: str, depth: int = None) -> list[str]:
+        """
+        Get the models that depend on a model, directly or indirectly. Useful to find the models
+        affected by a change.
+
+        Args:
+            model_name (str): The name of the model.
+            depth (int, optional): The maximum number of ref() edges to follow, e.g. 1 for the direct children.
+                Defaults to no limit.
+
+        Returns:
+            list: The names of the downstream models, nearest first.
+        """
+        return self.__get_lineage_graph(model_name).get_downstream(model_name, depth)
+
+    def get_subgraph(
+        self,
+        model_name: str,
+        upstream_depth: int = None,
+        downstream_depth: int = None,
+    ) -> dict[str, list[str]]:
+        """
+        Get the lineage around a model: the model itself with its upstream and downstream models,
+        and the refs between them.
+
+        Args:
+            model_name (str): The name of the model.
+            upstream_depth (int, optional): The maximum number of ref() edges to follow upstream.
+                Defaults to no limit.
+            downstream_depth (int, optional): The maximum number of ref() edges to follow downstream.
+                Defaults to no limit.
+
+        Returns:
+            dict: The refs of every model in the subgraph that point to other models of the subgraph,
+            keyed by model name.
+        """
+        graph = self.__get_lineage_graph(model_name)
+        nodes = dict.fromkeys(
+            [
+                model_name,
+                *graph.get_upstream(model_name, upstream_depth),
+                *graph.get_downstream(model_name, downstream_depth),
+            ]
+        )
+
+        return {
+            node: [ref for ref in graph.get_refs(node) if ref in nodes]
+            for node in nodes
+        }
 
     def update_model_directory(self, model: dict):
         """
@@ -316,9 +1040,7 @@ class DbtProject:
         Args:
             model (dict): The model to update.
         """
-        directory = self.__get_directory()
-
-        if model["name"] in directory["models"]:
-            directory["models"][model["name"]] = model
-
-        self.__save_directory(directory)
+        if model["name"] in self.__get_directory()["models"]:
+            model = dict(model)
+            self.__store_sql_contents([model])
+            self.__replace_directory_entries([model], [])
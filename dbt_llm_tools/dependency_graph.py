@@ -0,0 +1,256 @@
+from typing import Union
+
+
+class DependencyGraph:
+    """
+    An in-memory graph of the ref() edges between the models of a dbt project.
+
+    Methods:
+        get_refs: Get the direct upstream references of a model.
+        get_children: Get the models that directly reference a model.
+        get_deps: Get all the transitive upstream dependencies of a model.
+        get_upstream: Get the upstream models of a model, nearest first.
+        get_downstream: Get the downstream models of a model, nearest first.
+        get_cycles: Get the reference cycles found in the graph.
+    """
+
+    def __init__(self, edges: dict[str, list[str]]) -> None:
+        """
+        Initializes a dependency graph from the direct references of each model.
+
+        Args:
+            edges (dict[str, list[str]]): A mapping of model names to the names of the models they reference.
+                Referenced names that are not keys of the mapping are treated as leaf nodes.
+        """
+        self.__edges: dict[str, list[str]] = {
+            node: list(dict.fromkeys(refs)) for node, refs in edges.items()
+        }
+
+        self.__children: dict[str, list[str]] = {}
+        for node, refs in self.__edges.items():
+            for ref in refs:
+                self.__children.setdefault(ref, []).append(node)
+
+        self.__component_of: dict[str, int] = {}
+        self.__components: list[list[str]] = []
+        self.__closures: dict[int, list[str]] = {}
+
+        self.__find_components()
+
+    def __find_components(self) -> None:
+        """
+        Split the graph into strongly connected components using an iterative version of Tarjan's algorithm.
+        Components are discovered in reverse topological order, i.e. every component is found after all of
+        the components it depends on.
+        """
+        index_of: dict[str, int] = {}
+        lowlink: dict[str, int] = {}
+        on_stack: set[str] = set()
+        stack: list[str] = []
+
+        for root in self.__edges:
+            if root in index_of:
+                continue
+
+            work = [(root, iter(self.__edges.get(root, [])))]
+            index_of[root] = lowlink[root] = len(index_of)
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                child = next(children, None)
+
+                if child is not None:
+                    if child not in index_of:
+                        index_of[child] = lowlink[child] = len(index_of)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.__edges.get(child, []))))
+                    elif child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+
+                    for member in component:
+                        self.__component_of[member] = len(self.__components)
+                    self.__components.append(component[::-1])
+
+    def __is_cyclic(self, component_id: int) -> bool:
+        """
+        Check whether a strongly connected component contains a cycle.
+
+        Args:
+            component_id (int): The id of the component.
+
+        Returns:
+            bool: True if the component has more than one member or a model that references itself.
+        """
+        component = self.__components[component_id]
+
+        if len(component) > 1:
+            return True
+
+        return component[0] in self.__edges.get(component[0], [])
+
+    def __get_closure(self, component_id: int) -> list[str]:
+        """
+        Get the memoized transitive closure of a component. Since components are discovered in reverse
+        topological order, the closures of all upstream components are always computed first.
+
+        Args:
+            component_id (int): The id of the component.
+
+        Returns:
+            list[str]: All the nodes reachable from the component, upstream models first.
+        """
+        if component_id in self.__closures:
+            return self.__closures[component_id]
+
+        for current_id in range(component_id + 1):
+            if current_id in self.__closures:
+                continue
+
+            closure: dict[str, None] = {}
+
+            for member in self.__components[current_id]:
+                for ref in self.__edges.get(member, []):
+                    ref_id = self.__component_of[ref]
+                    if ref_id == current_id:
+                        continue
+
+                    closure.update(dict.fromkeys(self.__closures[ref_id]))
+                    closure.update(dict.fromkeys(self.__components[ref_id]))
+
+            if self.__is_cyclic(current_id):
+                closure.update(dict.fromkeys(self.__components[current_id]))
+
+            self.__closures[current_id] = list(closure)
+
+        return self.__closures[component_id]
+
+    def __walk(
+        self, node: str, adjacency: dict[str, list[str]], depth: Union[int, None]
+    ) -> list[str]:
+        """
+        Walk the graph breadth first from a model.
+
+        Args:
+            node (str): The name of the model to start from.
+            adjacency (dict): The edges to follow, keyed by model name.
+            depth (int, optional): The maximum number of edges to follow. Follows all edges if None.
+
+        Returns:
+            list[str]: The names of the reached models, nearest first. The starting model is only
+            included if it can be reached through a reference cycle.
+        """
+        reached: dict[str, None] = {}
+        frontier = [node]
+        distance = 0
+
+        while frontier and (depth is None or distance < depth):
+            next_frontier = []
+
+            for current in frontier:
+                for neighbour in adjacency.get(current, []):
+                    if neighbour not in reached:
+                        reached[neighbour] = None
+                        next_frontier.append(neighbour)
+
+            frontier = next_frontier
+            distance += 1
+
+        return list(reached)
+
+    def get_refs(self, node: str) -> list[str]:
+        """
+        Get the direct upstream references of a model.
+
+        Args:
+            node (str): The name of the model.
+
+        Returns:
+            list[str]: The names of the models directly referenced by the model.
+        """
+        return list(self.__edges.get(node, []))
+
+    def get_children(self, node: str) -> list[str]:
+        """
+        Get the models that directly reference a model.
+
+        Args:
+            node (str): The name of the model.
+
+        Returns:
+            list[str]: The names of the models that reference the model.
+        """
+        return list(self.__children.get(node, []))
+
+    def get_upstream(self, node: str, depth: int = None) -> list[str]:
+        """
+        Get the upstream models of a model, i.e. the models it references directly or indirectly.
+
+        Args:
+            node (str): The name of the model.
+            depth (int, optional): The maximum number of ref() edges to follow. Defaults to no limit.
+
+        Returns:
+            list[str]: The names of the upstream models, nearest first.
+        """
+        return self.__walk(node, self.__edges, depth)
+
+    def get_downstream(self, node: str, depth: int = None) -> list[str]:
+        """
+        Get the downstream models of a model, i.e. the models that reference it directly or indirectly.
+
+        Args:
+            node (str): The name of the model.
+            depth (int, optional): The maximum number of ref() edges to follow. Defaults to no limit.
+
+        Returns:
+            list[str]: The names of the downstream models, nearest first.
+        """
+        return self.__walk(node, self.__children, depth)
+
+    def get_deps(self, node: str) -> list[str]:
+        """
+        Get all the transitive upstream dependencies of a model. A model only appears in its own
+        dependencies if it is part of a reference cycle.
+
+        Args:
+            node (str): The name of the model.
+
+        Returns:
+            list[str]: The names of all the upstream models, ordered so that every model comes
+            after the models it depends on.
+        """
+        if node not in self.__component_of:
+            return []
+
+        return list(self.__get_closure(self.__component_of[node]))
+
+    def get_cycles(self) -> list[list[str]]:
+        """
+        Get the reference cycles found in the graph.
+
+        Returns:
+            list[list[str]]: A list of groups of models that reference each other in a cycle.
+        """
+        return [
+            component
+            for component_id, component in enumerate(self.__components)
+            if self.__is_cyclic(component_id)
+        ]
@@ -0,0 +1,502 @@
+import json
+import os
+import sqlite3
+import tempfile
+from itertools import count
+from stat import S_IMODE
+from typing import Hashable, Iterator, Union
+
+from tinydb import TinyDB, Query
+from tinydb.storages import Storage
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+SQLITE_BATCH_SIZE = 500
+
+# Fields of the directory entries that are not produced by parsing, which parses keep from the stored entries.
+PRESERVED_FIELDS = ["interpretation"]
+
+
+class DirectoryStore:
+    """
+    Base class for the storage backends of a dbt project directory. Every entry is a dictionary
+    with at least a "type" ("model" or "source") and a "name".
+
+    Methods:
+        get: Get a single entry by type and name.
+        search: Get all the entries of a type.
+        upsert_many: Insert entries, or update the fields of existing entries.
+        replace_many: Replace entries as a whole and remove others.
+        get_version: Get a token that changes whenever the stored entries change.
+    """
+
+    def get(self, name: str, entry_type: str = "model") -> Union[dict, None]:
+        """
+        Get a single entry by type and name.
+
+        Args:
+            name (str): The name of the entry.
+            entry_type (str, optional): The type of the entry. Defaults to "model".
+
+        Returns:
+            dict: The entry, or None if it does not exist.
+        """
+        raise NotImplementedError
+
+    def search(self, entry_type: str) -> list[dict]:
+        """
+        Get all the entries of a type, in insertion order.
+
+        Args:
+            entry_type (str): The type of the entries.
+
+        Returns:
+            list[dict]: The entries.
+        """
+        raise NotImplementedError
+
+    def upsert_many(self, entries: list[dict]) -> None:
+        """
+        Insert entries, or update the fields of the existing entries with the same type and name.
+
+        Args:
+            entries (list[dict]): The entries to upsert.
+        """
+        raise NotImplementedError
+
+    def replace_many(self, entries: list[dict], removed_entries: list[dict]) -> None:
+        """
+        Replace entries as a whole, keeping their position, inserting the ones that do not exist yet,
+        and remove others.
+
+        Args:
+            entries (list[dict]): The entries to write.
+            removed_entries (list[dict]): The entries to remove.
+        """
+        raise NotImplementedError
+
+    def get_version(self) -> Union[Hashable, None]:
+        """
+        Get a token that changes whenever the stored entries change, including changes made by
+        other processes. Used to tell whether an in-memory copy of the directory is still current.
+
+        Returns:
+            Hashable: The version token, or None if the store cannot tell, in which case
+            in-memory copies are never reused.
+        """
+        return None
+
+
+class AtomicJSONStorage(Storage):
+    """
+    A TinyDB storage that writes the whole JSON document to a temporary file and renames it over
+    the database file, so that readers never see a partially written document.
+    """
+
+    def __init__(self, path: str, **kwargs) -> None:
+        """
+        Initializes an atomic JSON storage.
+
+        Args:
+            path (str): Path to the JSON file.
+            **kwargs: Any other arguments accepted by json.dumps.
+        """
+        self.path = path
+        self.kwargs = kwargs
+
+    def read(self) -> Union[dict, None]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                contents = f.read()
+        except FileNotFoundError:
+            return None
+
+        return json.loads(contents) if contents else None
+
+    def write(self, data: dict) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=directory, delete=False
+        ) as f:
+            f.write(json.dumps(data, **self.kwargs))
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Temporary files are only readable by their owner, so the file gets the mode it would get otherwise.
+        os.chmod(f.name, self.__get_file_mode())
+        os.replace(f.name, self.path)
+
+    def __get_file_mode(self) -> int:
+        """
+        Get the permissions of the database file, or the default permissions of new files if it does not exist.
+
+        Returns:
+            int: The permission bits.
+        """
+        try:
+            return S_IMODE(os.stat(self.path).st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+
+            return 0o666 & ~umask
+
+
+class TinyDbDirectoryStore(DirectoryStore):
+    """
+    A directory store backed by a TinyDB JSON file. Suited to small projects, and shared with the
+    settings saved by the Streamlit client.
+
+    Writes of many entries are applied to the document in memory and flushed with a single
+    atomic write, instead of rewriting the whole file once per entry.
+    """
+
+    def __init__(self, database_path: str) -> None:
+        """
+        Initializes a TinyDB directory store.
+
+        Args:
+            database_path (str): Path to the TinyDB JSON file.
+        """
+        self.__database_path = database_path
+
+    def __get_storage(self) -> AtomicJSONStorage:
+        """
+        Get the storage of the database file, formatted the same way as the rest of the project.
+
+        Returns:
+            AtomicJSONStorage: The storage.
+        """
+        return AtomicJSONStorage(self.__database_path, sort_keys=True, indent=4)
+
+    def __read_table(self) -> tuple[dict, dict, dict[tuple[str, str], str]]:
+        """
+        Read the whole database document and index the directory entries of its default table.
+
+        Returns:
+            dict: The database document.
+            dict: The default table of the document, keyed by document id.
+            dict: The document ids of the directory entries, keyed by type and name.
+        """
+        data = self.__get_storage().read() or {}
+        table = data.setdefault(TinyDB.default_table_name, {})
+        doc_ids = {
+            (document.get("type"), document["name"]): doc_id
+            for doc_id, document in table.items()
+            if "name" in document
+        }
+
+        return data, table, doc_ids
+
+    def __get_new_doc_ids(self, table: dict) -> Iterator[str]:
+        """
+        Generate the ids of new documents in a table, following TinyDB's numbering.
+
+        Args:
+            table (dict): The table, keyed by document id.
+
+        Returns:
+            Iterator[str]: The unused document ids, in increasing order.
+        """
+        return map(str, count(max(map(int, table), default=0) + 1))
+
+    def get(self, name: str, entry_type: str = "model") -> Union[dict, None]:
+        db = TinyDB(self.__database_path, storage=AtomicJSONStorage)
+        Entry = Query()  # pylint: disable=invalid-name
+
+        entry = db.get((Entry.type == entry_type) & (Entry.name == name))
+
+        return dict(entry) if entry is not None else None
+
+    def search(self, entry_type: str) -> list[dict]:
+        db = TinyDB(self.__database_path, storage=AtomicJSONStorage)
+        Entry = Query()  # pylint: disable=invalid-name
+
+        return [dict(entry) for entry in db.search(Entry.type == entry_type)]
+
+    def upsert_many(self, entries: list[dict]) -> None:
+        data, table, doc_ids = self.__read_table()
+        new_doc_ids = self.__get_new_doc_ids(table)
+
+        for entry in entries:
+            key = (entry["type"], entry["name"])
+
+            if key in doc_ids:
+                table[doc_ids[key]].update(entry)
+            else:
+                doc_ids[key] = next(new_doc_ids)
+                table[doc_ids[key]] = dict(entry)
+
+        self.__get_storage().write(data)
+
+    def replace_many(self, entries: list[dict], removed_entries: list[dict]) -> None:
+        data, table, doc_ids = self.__read_table()
+
+        for entry in removed_entries:
+            doc_id = doc_ids.pop((entry["type"], entry["name"]), None)
+
+            if doc_id is not None:
+                del table[doc_id]
+
+        new_doc_ids = self.__get_new_doc_ids(table)
+
+        for entry in entries:
+            key = (entry["type"], entry["name"])
+
+            if key not in doc_ids:
+                doc_ids[key] = next(new_doc_ids)
+            table[doc_ids[key]] = dict(entry)
+
+        self.__get_storage().write(data)
+
+    def get_version(self) -> Union[Hashable, None]:
+        try:
+            stat = os.stat(self.__database_path)
+        except FileNotFoundError:
+            return None
+
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class SqliteDirectoryStore(DirectoryStore):
+    """
+    A directory store backed by a SQLite database, with indexes on the name, type and path of
+    every entry. Writes of many entries run in a single transaction.
+
+    Methods:
+        migrate_from_tinydb: Copy the model and source entries of a TinyDB directory file.
+    """
+
+    def __init__(self, database_path: str) -> None:
+        """
+        Initializes a SQLite directory store, creating the database if it does not exist.
+
+        Args:
+            database_path (str): Path to the SQLite database file.
+        """
+        self.__connection = sqlite3.connect(database_path, check_same_thread=False)
+
+        with self.__connection:
+            self.__connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS directory (
+                    id INTEGER PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    path TEXT,
+                    document TEXT NOT NULL,
+                    UNIQUE (type, name)
+                );
+                CREATE INDEX IF NOT EXISTS directory_name ON directory (name);
+                CREATE INDEX IF NOT EXISTS directory_type ON directory (type);
+                CREATE INDEX IF NOT EXISTS directory_path ON directory (path);
+                """
+            )
+
+    def __get_row(self, entry: dict) -> tuple:
+        """
+        Convert an entry to a row of the directory table.
+
+        Args:
+            entry (dict): The entry.
+
+        Returns:
+            tuple: The type, name, path and JSON document of the entry.
+        """
+        return (
+            entry["type"],
+            entry["name"],
+            entry.get("absolute_path", entry.get("yaml_path")),
+            json.dumps(entry),
+        )
+
+    def __get_existing(self, entries: list[dict]) -> dict[tuple[str, str], dict]:
+        """
+        Load the stored versions of a list of entries.
+
+        Args:
+            entries (list[dict]): The entries to look up.
+
+        Returns:
+            dict: The stored entries keyed by type and name.
+        """
+        existing = {}
+
+        for start in range(0, len(entries), SQLITE_BATCH_SIZE):
+            end = start + SQLITE_BATCH_SIZE
+            batch = entries[start:end]
+            conditions = " OR ".join(["(type = ? AND name = ?)"] * len(batch))
+            parameters = [value for e in batch for value in (e["type"], e["name"])]
+
+            for entry_type, name, document in self.__connection.execute(
+                f"SELECT type, name, document FROM directory WHERE {conditions}",
+                parameters,
+            ):
+                existing[(entry_type, name)] = json.loads(document)
+
+        return existing
+
+    def __write_rows(self, entries: list[dict]) -> None:
+        """
+        Insert or overwrite entries, keeping the position of the existing ones.
+
+        Args:
+            entries (list[dict]): The entries to write.
+        """
+        self.__connection.executemany(
+            """
+            INSERT INTO directory (type, name, path, document) VALUES (?, ?, ?, ?)
+            ON CONFLICT (type, name) DO UPDATE SET path = excluded.path, document = excluded.document
+            """,
+            map(self.__get_row, entries),
+        )
+
+    def get(self, name: str, entry_type: str = "model") -> Union[dict, None]:
+        row = self.__connection.execute(
+            "SELECT document FROM directory WHERE type = ? AND name = ?",
+            (entry_type, name),
+        ).fetchone()
+
+        return json.loads(row[0]) if row is not None else None
+
+    def search(self, entry_type: str) -> list[dict]:
+        return [
+            json.loads(document)
+            for (document,) in self.__connection.execute(
+                "SELECT document FROM directory WHERE type = ? ORDER BY id",
+                (entry_type,),
+            )
+        ]
+
+    def upsert_many(self, entries: list[dict]) -> None:
+        with self.__connection:
+            existing = self.__get_existing(entries)
+
+            self.__write_rows(
+                [
+                    {**existing.get((entry["type"], entry["name"]), {}), **entry}
+                    for entry in entries
+                ]
+            )
+
+    def replace_many(self, entries: list[dict], removed_entries: list[dict]) -> None:
+        with self.__connection:
+            self.__connection.executemany(
+                "DELETE FROM directory WHERE type = ? AND name = ?",
+                [(entry["type"], entry["name"]) for entry in removed_entries],
+            )
+            self.__write_rows(entries)
+
+    def get_version(self) -> Union[Hashable, None]:
+        # data_version changes on commits by other connections, total_changes on our own.
+        (data_version,) = self.__connection.execute("PRAGMA data_version").fetchone()
+
+        return (data_version, self.__connection.total_changes)
+
+    def migrate_from_tinydb(self, tinydb_path: str) -> int:
+        """
+        Copy the model and source entries of a TinyDB directory file into this store.
+
+        Args:
+            tinydb_path (str): Path to the TinyDB JSON file.
+
+        Returns:
+            int: The number of migrated entries.
+        """
+        source_store = TinyDbDirectoryStore(tinydb_path)
+        entries = [
+            entry
+            for entry_type in ["model", "source"]
+            for entry in source_store.search(entry_type)
+            if "name" in entry
+        ]
+
+        self.upsert_many(entries)
+
+        return len(entries)
+
+
+def get_directory_store(
+    database_path: str, storage_backend: Union[str, DirectoryStore] = None
+) -> DirectoryStore:
+    """
+    Get the directory store for a database path.
+
+    Args:
+        database_path (str): Path to the database file.
+        storage_backend (str | DirectoryStore, optional): "tinydb", "sqlite" or a directory store object.
+            Defaults to "sqlite" for paths ending in .db, .sqlite or .sqlite3, and "tinydb" otherwise.
+
+    Returns:
+        DirectoryStore: The directory store.
+    """
+    if isinstance(storage_backend, DirectoryStore):
+        return storage_backend
+
+    if storage_backend is None:
+        storage_backend = (
+            "sqlite"
+            if os.path.splitext(database_path)[1] in SQLITE_EXTENSIONS
+            else "tinydb"
+        )
+
+    if storage_backend == "tinydb":
+        return TinyDbDirectoryStore(database_path)
+
+    if storage_backend == "sqlite":
+        return SqliteDirectoryStore(database_path)
+
+    raise Exception(f"Unknown storage backend: {storage_backend}")
+
+
+def diff_directories(previous_directory: dict, directory: dict):
+    """
+    Find the directory entries that need to be written or removed. Entries without a name, like the
+    documentation of a model whose SQL file is gone, are not stored, so they count as removed.
+
+    Args:
+        previous_directory (dict): The directory saved by the last parse.
+        directory (dict): The newly parsed directory.
+
+    Returns:
+        list: The entries that were added or changed.
+        list: The entries that no longer exist.
+    """
+    changed_entries = []
+    removed_entries = []
+
+    for entry_type in ["models", "sources"]:
+        entries = directory[entry_type]
+        previous_entries = previous_directory[entry_type]
+
+        for name, entry in entries.items():
+            if "name" in entry and entry != previous_entries.get(name):
+                changed_entries.append(entry)
+
+        for name, entry in previous_entries.items():
+            if "name" not in entries.get(name, {}):
+                removed_entries.append(entry)
+
+    return changed_entries, removed_entries
+
+
+def keep_preserved_fields(entry: dict, stored_entry: dict) -> dict:
+    """
+    Copy the fields that parsing does not produce from a stored directory entry to a newly parsed entry.
+
+    Args:
+        entry (dict): The newly parsed entry.
+        stored_entry (dict): The stored entry, or None if there is none.
+
+    Returns:
+        dict: The parsed entry, with the preserved fields of the stored entry that it does not set.
+    """
+    return {
+        **{
+            field: stored_entry[field]
+            for field in PRESERVED_FIELDS
+            if field in (stored_entry or {})
+        },
+        **entry,
+    }
@@ -1,21 +1,13 @@
 import json
 import os
 
-import yaml
 from openai import OpenAI
 
 from dbt_llm_tools.dbt_project import DbtProject
 from dbt_llm_tools.instructions import INTERPRET_MODEL_INSTRUCTIONS
+from dbt_llm_tools.tracing import Tracer, get_tracer
 from dbt_llm_tools.types import DbtModelDict, DbtModelDirectoryEntry, PromptMessage
-
-
-class MyDumper(yaml.Dumper):  # pylint: disable=too-many-ancestors
-    """
-    A custom yaml dumper that indents the yaml output like dbt does.
-    """
-
-    def increase_indent(self, flow=False, indentless=False):
-        return super().increase_indent(flow, False)
+from dbt_llm_tools.yaml_io import dump_yaml, load_yaml
 
 
 class DocumentationGenerator:
@@ -29,6 +21,8 @@ class DocumentationGenerator:
         openai_api_key: str,
         language_model: str = "gpt-4o",
         database_path: str = "./directory.json",
+        *,
+        tracer: Tracer = None,
     ) -> None:
         """
         Initializes a Documentation Generator object.
@@ -40,6 +34,8 @@ class DocumentationGenerator:
             Defaults to "gpt-4o".
             database_path (str, optional): Path to the directory file that stores the parsed dbt project.
             Defaults to "./directory.json".
+            tracer (Tracer, optional): The tracer that records the time and tokens spent interpreting models.
+            Defaults to the tracer returned by get_tracer().
 
         Attributes:
             dbt_project (DbtProject): A DbtProject object representing the dbt project.
@@ -48,8 +44,11 @@ class DocumentationGenerator:
             interpret_model: Interpret a dbt model using the language model.
             generate_documentation: Generate documentation for a dbt model.
         """
+        self.__tracer = tracer or get_tracer()
         self.dbt_project = DbtProject(
-            dbt_project_root=dbt_project_root, database_path=database_path
+            dbt_project_root=dbt_project_root,
+            database_path=database_path,
+            tracer=self.__tracer,
         )
 
         self.__language_model = language_model
@@ -90,7 +89,7 @@ class DocumentationGenerator:
                 )
 
             with open(model["yaml_path"], "r", encoding="utf-8") as infile:
-                existing_yaml = yaml.load(infile, Loader=yaml.FullLoader)
+                existing_yaml = load_yaml(infile)
                 existing_models = existing_yaml.get("models", [])
 
                 search_idx = -1
@@ -113,10 +112,10 @@ class DocumentationGenerator:
             yaml_content = {"version": 2, "models": [model["interpretation"]]}
 
         with open(yaml_path, "w", encoding="utf-8") as outfile:
-            yaml.dump(
+            dump_yaml(
                 yaml_content,
                 outfile,
-                Dumper=MyDumper,
+                dbt_style=True,
                 default_flow_style=False,
                 sort_keys=False,
             )
@@ -135,6 +134,7 @@ class DocumentationGenerator:
 
         prompt = []
         refs = model.get("refs", [])
+        sql_contents = self.dbt_project.get_sql_contents(model)
 
         prompt.append(self.__get_system_prompt(INTERPRET_MODEL_INSTRUCTIONS))
 
@@ -143,7 +143,7 @@ class DocumentationGenerator:
                 f"""
                 The model you are interpreting is called {model["name"]}  following is the Jinja SQL code for the model:
 
-                {model.get("sql_contents")}
+                {sql_contents}
                 """
             )
         )
@@ -172,10 +172,16 @@ class DocumentationGenerator:
                     )
                 )
 
-        completion = self.__client.chat.completions.create(
-            model=self.__language_model,
-            messages=prompt,
-        )
+        with self.__tracer.span(
+            "documentation_generator.interpret_model",
+            model=model["name"],
+            language_model=self.__language_model,
+        ) as span:
+            completion = self.__client.chat.completions.create(
+                model=self.__language_model,
+                messages=prompt,
+            )
+            span.add_token_usage(getattr(completion, "usage", None))
 
         response = (
             completion.choices[0]
@@ -196,16 +202,20 @@ class DocumentationGenerator:
             write_documentation_to_yaml (bool, optional): Whether to save the documentation to a yaml file.
             Defaults to False.
         """
-        model = self.dbt_project.get_single_model(model_name)
+        with self.__tracer.span(
+            "documentation_generator.generate_documentation", model=model_name
+        ) as span:
+            model = self.dbt_project.get_single_model(model_name)
 
-        for dep in model.get("deps", []):
-            dep_model = self.dbt_project.get_single_model(dep)
+            for dep in model.get("deps", []):
+                dep_model = self.dbt_project.get_single_model(dep)
 
-            if dep_model.get("interpretation") is None:
-                dep_model["interpretation"] = self.interpret_model(dep_model)
-                self.dbt_project.update_model_directory(dep_model)
+                if dep_model.get("interpretation") is None:
+                    dep_model["interpretation"] = self.interpret_model(dep_model)
+                    self.dbt_project.update_model_directory(dep_model)
+                    span.add_count("interpreted_dependencies")
 
-        interpretation = self.interpret_model(model)
+            interpretation = self.interpret_model(model)
 
         model["interpretation"] = interpretation
 
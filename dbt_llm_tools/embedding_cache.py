@@ -0,0 +1,96 @@
+import hashlib
+import sqlite3
+from array import array
+
+SQLITE_BATCH_SIZE = 500
+
+
+def get_text_hash(text: str) -> str:
+    """
+    Get the hash that identifies an embedded text in the embedding cache.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: The sha256 hex digest of the text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    An on-disk cache of embeddings keyed by embedding model and text hash, so that texts that did not
+    change are never sent to the embedding model again. Embeddings are stored as float32 arrays in a
+    SQLite database, which takes 4 bytes per dimension.
+
+    Methods:
+        get_many: Get the cached embeddings of texts.
+        put_many: Cache the embeddings of texts.
+    """
+
+    def __init__(self, cache_path: str) -> None:
+        """
+        Initializes an embedding cache, creating the database if it does not exist.
+
+        Args:
+            cache_path (str): Path to the SQLite database file of the cache.
+        """
+        self.__connection = sqlite3.connect(cache_path, check_same_thread=False)
+
+        with self.__connection:
+            self.__connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+                """
+            )
+
+    def get_many(self, model: str, text_hashes: list[str]) -> dict[str, list[float]]:
+        """
+        Get the cached embeddings of texts.
+
+        Args:
+            model (str): The name of the embedding model.
+            text_hashes (list[str]): The hashes of the texts, from get_text_hash.
+
+        Returns:
+            dict: The embeddings that are cached, keyed by text hash.
+        """
+        embeddings = {}
+        text_hashes = list(dict.fromkeys(text_hashes))
+
+        for start in range(0, len(text_hashes), SQLITE_BATCH_SIZE):
+            end = start + SQLITE_BATCH_SIZE
+            batch = text_hashes[start:end]
+            placeholders = ", ".join(["?"] * len(batch))
+
+            for text_hash, blob in self.__connection.execute(
+                "SELECT text_hash, embedding FROM embeddings "
+                f"WHERE model = ? AND text_hash IN ({placeholders})",
+                [model, *batch],
+            ):
+                embeddings[text_hash] = array("f", blob).tolist()
+
+        return embeddings
+
+    def put_many(self, model: str, embeddings: dict[str, list[float]]) -> None:
+        """
+        Cache the embeddings of texts, in a single transaction.
+
+        Args:
+            model (str): The name of the embedding model.
+            embeddings (dict): The embeddings keyed by text hash.
+        """
+        with self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, embedding) VALUES (?, ?, ?)",
+                (
+                    (model, text_hash, array("f", embedding).tobytes())
+                    for text_hash, embedding in embeddings.items()
+                ),
+            )
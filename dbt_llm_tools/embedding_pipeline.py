@@ -0,0 +1,202 @@
+import contextvars
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
+
+import openai
+
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text without a tokenizer. English text and SQL average about four bytes
+    per token, so counting three bytes per token leaves a margin below the real token limits.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+class EmbeddingPipeline:
+    """
+    Embeds large lists of documents in batches bounded by token count and size, sending several batches
+    at once and retrying failed batches with exponential backoff. Finished batches are handed back as soon
+    as they are embedded, so that they can be stored while the next batches are still being embedded.
+
+    Methods:
+        get_batches: Split documents into batches bounded by token count and size.
+        embed: Embed a few documents in a single batch, with retries.
+        run: Embed documents and hand back every finished batch.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_batch_tokens: int = 50000,
+        max_batch_size: int = 500,
+        concurrency: int = 4,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        token_counter: Callable[[str], int] = estimate_tokens,
+    ) -> None:
+        """
+        Initializes an embedding pipeline.
+
+        Args:
+            max_batch_tokens (int, optional): The maximum number of tokens of a batch. Documents longer than this
+                are sent in a batch of their own. Defaults to 50000.
+            max_batch_size (int, optional): The maximum number of documents of a batch. Defaults to 500.
+            concurrency (int, optional): The maximum number of batches embedded at the same time. Defaults to 4.
+            max_retries (int, optional): The number of times a batch is retried after a connection error,
+                a rate limit or a server error. Defaults to 5.
+            backoff (float, optional): The number of seconds to wait before the first retry, doubled for every
+                following retry and randomized by up to 50%. Defaults to 1.
+            token_counter (Callable, optional): A function that counts the tokens of a text, e.g. one based on
+                the tiktoken encoding of the embedding model. Defaults to an estimate based on the text length.
+        """
+        if max_batch_tokens < 1 or max_batch_size < 1 or concurrency < 1:
+            raise Exception(
+                "The batch limits and the concurrency must be positive integers"
+            )
+
+        self.__max_batch_tokens = max_batch_tokens
+        self.__max_batch_size = max_batch_size
+        self.__concurrency = concurrency
+        self.__max_retries = max_retries
+        self.__backoff = backoff
+        self.__token_counter = token_counter
+
+    def get_batches(self, documents: list[str]) -> list[list[int]]:
+        """
+        Split documents into batches bounded by token count and size, keeping the documents in order.
+
+        Args:
+            documents (list[str]): The documents.
+
+        Returns:
+            list[list[int]]: The positions of the documents of every batch.
+        """
+        batches = []
+        batch = []
+        batch_tokens = 0
+
+        for position, document in enumerate(documents):
+            tokens = self.__token_counter(document)
+
+            if batch and (
+                batch_tokens + tokens > self.__max_batch_tokens
+                or len(batch) == self.__max_batch_size
+            ):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+
+            batch.append(position)
+            batch_tokens += tokens
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    def __embed_batch(
+        self, embed: Callable[[list[str]], list[list[float]]], documents: list[str]
+    ) -> tuple[list[list[float]], int]:
+        """
+        Embed a batch of documents, retrying with exponential backoff when the error is retryable.
+
+        Args:
+            embed (Callable): The function that embeds a list of documents.
+            documents (list[str]): The documents of the batch.
+
+        Returns:
+            list[list[float]]: The embedding of every document.
+            int: The number of retries.
+        """
+        for attempt in range(self.__max_retries + 1):
+            try:
+                return embed(documents), attempt
+            except RETRYABLE_ERRORS:
+                if attempt == self.__max_retries:
+                    raise
+
+                time.sleep(self.__backoff * 2**attempt * random.uniform(0.5, 1.0))
+
+        raise Exception("Unreachable")  # pragma: no cover
+
+    def embed(
+        self, embed: Callable[[list[str]], list[list[float]]], documents: list[str]
+    ) -> list[list[float]]:
+        """
+        Embed a few documents in a single batch in the calling thread, with retries. Meant for queries.
+
+        Args:
+            embed (Callable): The function that embeds a list of documents.
+            documents (list[str]): The documents.
+
+        Returns:
+            list[list[float]]: The embedding of every document.
+        """
+        return self.__embed_batch(embed, documents)[0]
+
+    def run(
+        self,
+        embed: Callable[[list[str]], list[list[float]]],
+        documents: list[str],
+        on_batch: Callable[[list[int], list[list[float]]], None],
+    ) -> dict[str, int]:
+        """
+        Embed documents and hand back every finished batch. Batches are embedded in worker threads,
+        in the tracing context of the caller, and handed back in the calling thread in the order they finish.
+        If a batch fails after all its retries, the batches that have not started are cancelled
+        and the error is raised.
+
+        Args:
+            embed (Callable): The function that embeds a list of documents, e.g. an embedding function.
+            documents (list[str]): The documents to embed.
+            on_batch (Callable): A function called with the positions and the embeddings of the documents
+                of every finished batch.
+
+        Returns:
+            dict: The number of "batches" and "retries".
+        """
+        batches = self.get_batches(documents)
+        retries = 0
+
+        with ThreadPoolExecutor(max_workers=self.__concurrency) as executor:
+            pending = {
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self.__embed_batch,
+                    embed,
+                    [documents[position] for position in batch],
+                ): batch
+                for batch in batches
+            }
+
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        embeddings, batch_retries = future.result()
+                        retries += batch_retries
+                        on_batch(pending.pop(future), embeddings)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        return {"batches": len(batches), "retries": retries}
@@ -0,0 +1,221 @@
+import hashlib
+import math
+import re
+from typing import Protocol
+
+from openai import OpenAI
+
+from dbt_llm_tools.tracing import CURRENT_SPAN, Tracer
+
+TOKEN_EXPRESSION = re.compile(r"\w+")
+
+Documents = list[str]
+Embeddings = list[list[float]]
+
+
+class EmbeddingFunction(Protocol):
+    """
+    The interface of embedding functions, which is the same as the interface of the chromadb embedding
+    functions, so that those can be used as well. Defined here so that chromadb is only imported when used.
+    Embedding functions can also have a cache_id attribute, see get_embedding_cache_id.
+    """
+
+    def __call__(
+        self, input: Documents
+    ) -> Embeddings:  # pylint: disable=redefined-builtin
+        ...
+
+
+def get_embedding_cache_id(embedding_fn: EmbeddingFunction) -> str:
+    """
+    Get the id that the embeddings of an embedding function are cached under. Embedding functions can
+    supply their own id with a cache_id attribute, which must differ between configurations that produce
+    different embeddings. Otherwise the module and name of their class are used.
+
+    Args:
+        embedding_fn (EmbeddingFunction): The embedding function.
+
+    Returns:
+        str: The cache id of the embedding function.
+    """
+    cache_id = getattr(embedding_fn, "cache_id", None)
+
+    if cache_id is not None:
+        return cache_id
+
+    embedding_fn_class = type(embedding_fn)
+
+    return f"{embedding_fn_class.__module__}.{embedding_fn_class.__qualname__}"
+
+
+class HashEmbeddingFunction(EmbeddingFunction):
+    """
+    A deterministic embedding function that runs locally, without a model or network access.
+    Every word of a document is hashed to a signed position of the embedding, so documents that
+    share words end up close to each other. Meant for tests and benchmarks, not for retrieval quality.
+    """
+
+    def __init__(self, dimensions: int = 256) -> None:
+        """
+        Initializes a hash embedding function.
+
+        Args:
+            dimensions (int, optional): The number of dimensions of the embeddings. Defaults to 256.
+        """
+        self.__dimensions = dimensions
+
+    @property
+    def cache_id(self) -> str:
+        """
+        The id that the embeddings are cached under, which depends on the number of dimensions.
+        """
+        return f"{type(self).__module__}.{type(self).__qualname__}:{self.__dimensions}"
+
+    def __call__(
+        self, input: Documents
+    ) -> Embeddings:  # pylint: disable=redefined-builtin
+        """
+        Embed documents.
+
+        Args:
+            input (list[str]): The documents to embed.
+
+        Returns:
+            list[list[float]]: The embedding of every document, normalized to unit length.
+        """
+        embeddings = []
+        token_positions: dict[str, tuple[int, float]] = {}
+
+        for document in input:
+            embedding = [0.0] * self.__dimensions
+
+            for token in TOKEN_EXPRESSION.findall(document.lower()):
+                if token not in token_positions:
+                    value = int.from_bytes(
+                        hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(),
+                        "little",
+                    )
+                    token_positions[token] = (
+                        value % self.__dimensions,
+                        1.0 if value >> 63 else -1.0,
+                    )
+
+                position, sign = token_positions[token]
+                embedding[position] += sign
+
+            norm = math.sqrt(sum(value * value for value in embedding)) or 1.0
+            embeddings.append([value / norm for value in embedding])
+
+        return embeddings
+
+
+class OpenAIEmbeddingFunction(EmbeddingFunction):
+    """
+    Embeds documents with the OpenAI embeddings API, or with any server that implements it. Every call sends
+    a single request without retries, which are left to the embedding pipeline, and adds the token usage of
+    the request to the current tracing span.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "text-embedding-3-large",
+        api_base: str = None,
+        timeout: float = 60.0,
+    ) -> None:
+        """
+        Initializes an OpenAI embedding function.
+
+        Args:
+            api_key (str): Your OpenAI API key.
+            model_name (str, optional): The name of the OpenAI embedding model. Defaults to "text-embedding-3-large".
+            api_base (str, optional): The base URL of the API, e.g. "http://localhost:8000/v1" for a local server.
+                Defaults to the OpenAI API.
+            timeout (float, optional): The number of seconds to wait for a response. Defaults to 60.
+        """
+        self.__client = OpenAI(
+            api_key=api_key, base_url=api_base, max_retries=0, timeout=timeout
+        )
+        self.__model_name = model_name
+        self.__api_base = api_base
+
+    @property
+    def cache_id(self) -> str:
+        """
+        The id that the embeddings are cached under: the model name, followed by the base URL of the API
+        when it is not the OpenAI API.
+        """
+        if self.__api_base is None:
+            return self.__model_name
+
+        return f"{self.__model_name}@{self.__api_base}"
+
+    def __call__(
+        self, input: Documents
+    ) -> Embeddings:  # pylint: disable=redefined-builtin
+        """
+        Embed documents.
+
+        Args:
+            input (list[str]): The documents to embed.
+
+        Returns:
+            list[list[float]]: The embedding of every document, in the order of the documents.
+        """
+        response = self.__client.embeddings.create(
+            model=self.__model_name, input=list(input), encoding_format="float"
+        )
+        span = CURRENT_SPAN.get()
+
+        if span is not None:
+            span.add_token_usage(response.usage)
+
+        return [
+            item.embedding
+            for item in sorted(response.data, key=lambda item: item.index)
+        ]
+
+
+class TracedEmbeddingFunction(EmbeddingFunction):
+    """
+    Wraps an embedding function to record every call as a "vector_store.embed" span,
+    with the number of embedded documents and characters.
+    """
+
+    def __init__(self, embedding_fn: EmbeddingFunction, tracer: Tracer) -> None:
+        """
+        Initializes a traced embedding function.
+
+        Args:
+            embedding_fn (EmbeddingFunction): The embedding function to wrap.
+            tracer (Tracer): The tracer that records the calls.
+        """
+        self.__embedding_fn = embedding_fn
+        self.__tracer = tracer
+
+    @property
+    def cache_id(self) -> str:
+        """
+        The cache id of the wrapped embedding function.
+        """
+        return get_embedding_cache_id(self.__embedding_fn)
+
+    def __call__(
+        self, input: Documents
+    ) -> Embeddings:  # pylint: disable=redefined-builtin
+        """
+        Embed documents.
+
+        Args:
+            input (list[str]): The documents to embed.
+
+        Returns:
+            list[list[float]]: The embedding of every document.
+        """
+        with self.__tracer.span(
+            "vector_store.embed", embedding_fn=type(self.__embedding_fn).__name__
+        ) as span:
+            span.add_count("documents", len(input))
+            span.add_count("characters", sum(len(document) for document in input))
+
+            return self.__embedding_fn(input)
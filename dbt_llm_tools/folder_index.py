@@ -0,0 +1,148 @@
+import os
+
+
+class FolderIndexNode:  # pylint: disable=too-few-public-methods
+    """
+    A node of a folder index, holding one path component.
+    """
+
+    __slots__ = ("children", "entries")
+
+    def __init__(self) -> None:
+        self.children: dict[str, FolderIndexNode] = {}
+        self.entries: list[int] = []
+
+
+class FolderIndex:
+    """
+    A trie over the path components of the files of a dbt project, used to find the entries that
+    live in a set of folders.
+
+    Every suffix of the components of a path is inserted, so a folder matches a path whenever its
+    components appear in the path as a contiguous run: "staging" and "models/staging" both match
+    "models/staging/stg_orders.sql", while "models/stag" does not. Whole paths are also inserted in
+    a second trie, for the anchored searches that only match folders from the project root, like
+    dbt's path: selector does.
+
+    Methods:
+        find: Get the positions of the entries that live in any of a list of folders.
+    """
+
+    def __init__(self, project_root: str, entry_paths: list[list[str]]) -> None:
+        """
+        Initializes a folder index.
+
+        Args:
+            project_root (str): The root of the dbt project. Paths inside it are indexed relative to it.
+            entry_paths (list[list[str]]): The file paths of every entry, e.g. the SQL and yaml files of a model.
+                Entries are identified by their position in this list.
+        """
+        self.__project_root = os.path.abspath(project_root)
+        self.__root = FolderIndexNode()
+        self.__anchored_root = FolderIndexNode()
+        self.__size = len(entry_paths)
+
+        positions_by_path: dict[str, list[int]] = {}
+
+        for position, paths in enumerate(entry_paths):
+            for path in dict.fromkeys(paths):
+                positions_by_path.setdefault(path, []).append(position)
+
+        for path, positions in positions_by_path.items():
+            self.__insert(self.__get_components(path), positions)
+
+    def __get_components(self, path: str) -> list[str]:
+        """
+        Split a path into its components, relative to the project root when it is inside it.
+
+        Args:
+            path (str): The path to split.
+
+        Returns:
+            list[str]: The components of the path.
+        """
+        path = os.path.normpath(path)
+
+        if os.path.isabs(path):
+            relative_path = os.path.relpath(path, self.__project_root)
+
+            if relative_path != os.pardir and not relative_path.startswith(
+                os.pardir + os.sep
+            ):
+                path = relative_path
+
+        return [
+            component
+            for component in path.replace(os.sep, "/").split("/")
+            if component not in ("", os.curdir)
+        ]
+
+    def __insert(self, components: list[str], positions: list[int]) -> None:
+        """
+        Insert every suffix of the components of a path, and the whole path in the anchored trie.
+
+        Args:
+            components (list[str]): The components of the path.
+            positions (list[int]): The positions of the entries the path belongs to.
+        """
+        suffixes = [(self.__root, start) for start in range(len(components))]
+
+        for root, start in [(self.__anchored_root, 0)] + suffixes:
+            node = root
+
+            for component in components[start:]:
+                node = node.children.setdefault(component, FolderIndexNode())
+
+            node.entries.extend(positions)
+
+    def __find_folder(self, folder: str, anchored: bool) -> set[int]:
+        """
+        Get the positions of the entries that live in a folder.
+
+        Args:
+            folder (str): The folder, relative to the project root.
+            anchored (bool): Whether the folder must start at the project root.
+
+        Returns:
+            set[int]: The positions of the entries.
+        """
+        root = self.__anchored_root if anchored else self.__root
+        node = root
+
+        for component in self.__get_components(folder):
+            node = node.children.get(component)
+
+            if node is None:
+                return set()
+
+        if node is root:
+            return set(range(self.__size))
+
+        positions = set()
+        nodes = [node]
+
+        while nodes:
+            node = nodes.pop()
+            positions.update(node.entries)
+            nodes.extend(node.children.values())
+
+        return positions
+
+    def find(self, folders: list[str], anchored: bool = False) -> set[int]:
+        """
+        Get the positions of the entries that live in any of a list of folders.
+
+        Args:
+            folders (list[str]): The folders, relative to the project root.
+            anchored (bool, optional): Only match the folders that start at the project root,
+                e.g. "models/staging" but not "staging". Defaults to False.
+
+        Returns:
+            set[int]: The positions of the entries.
+        """
+        positions = set()
+
+        for folder in folders:
+            positions |= self.__find_folder(folder, anchored)
+
+        return positions
@@ -0,0 +1,241 @@
+import math
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+
+TOKEN_EXPRESSION = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split a text into lowercase words for the lexical index. Identifiers like "customer_ltv" are kept whole,
+    so that exact model and column names match best, and are also split into their parts.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list[str]: The tokens of the text.
+    """
+    tokens = []
+
+    for token in TOKEN_EXPRESSION.findall(text.lower()):
+        tokens.append(token)
+
+        if "_" in token:
+            tokens.extend(part for part in token.split("_") if part)
+
+    return tokens
+
+
+class BM25Index:  # pylint: disable=too-many-instance-attributes
+    """
+    An in-memory inverted index that ranks documents with Okapi BM25, so that queries that name a model
+    or a column find it without calling an embedding model. Searching only visits the postings of the
+    query tokens, which are scored with NumPy. Tokens found in most documents, like "table" or "the", get a
+    small but positive inverse document frequency, so they still count without outweighing rarer tokens.
+
+    Every document gets a slot, which is reused after the document is removed. The postings of a token map
+    slots to token counts, and are converted to arrays the first time they are searched after a change.
+
+    Methods:
+        add_many: Index documents, replacing the documents with the same ids.
+        remove_many: Remove documents from the index.
+        search: Find the documents that best match a query.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        """
+        Initializes a BM25 index.
+
+        Args:
+            k1 (float, optional): How quickly the score of a token saturates with its frequency. Defaults to 1.2.
+            b (float, optional): How much the score is normalized by the document length. Defaults to 0.75.
+        """
+        self.__k1 = k1
+        self.__b = b
+        self.__slots: dict[str, int] = {}
+        self.__slot_ids: list[str] = []
+        self.__free_slots: list[int] = []
+        self.__document_tokens: list[Counter] = []
+        self.__document_lengths: list[int] = []
+        self.__total_length = 0
+        self.__postings: dict[str, dict[int, int]] = {}
+        self.__posting_arrays: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.__length_norms: np.ndarray = None
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__slots)
+
+    def add_many(self, ids: list[str], documents: list[str]) -> None:
+        """
+        Index documents, replacing the documents with the same ids.
+
+        Args:
+            ids (list[str]): The ids of the documents.
+            documents (list[str]): The texts of the documents.
+        """
+        with self.__lock:
+            self.__remove_many(ids)
+
+            for document_id, document in zip(ids, documents):
+                tokens = tokenize(document)
+                token_counts = Counter(tokens)
+
+                if self.__free_slots:
+                    slot = self.__free_slots.pop()
+                    self.__slot_ids[slot] = document_id
+                    self.__document_tokens[slot] = token_counts
+                    self.__document_lengths[slot] = len(tokens)
+                else:
+                    slot = len(self.__slot_ids)
+                    self.__slot_ids.append(document_id)
+                    self.__document_tokens.append(token_counts)
+                    self.__document_lengths.append(len(tokens))
+
+                for token, count in token_counts.items():
+                    self.__postings.setdefault(token, {})[slot] = count
+                    self.__posting_arrays.pop(token, None)
+
+                self.__slots[document_id] = slot
+                self.__total_length += len(tokens)
+
+            self.__length_norms = None
+
+    def remove_many(self, ids: list[str]) -> None:
+        """
+        Remove documents from the index. Ids that are not indexed are ignored.
+
+        Args:
+            ids (list[str]): The ids of the documents.
+        """
+        with self.__lock:
+            self.__remove_many(ids)
+
+    def __remove_many(self, ids: list[str]) -> None:
+        """
+        Remove documents from the index, while holding the lock.
+
+        Args:
+            ids (list[str]): The ids of the documents.
+        """
+        for document_id in ids:
+            slot = self.__slots.pop(document_id, None)
+
+            if slot is None:
+                continue
+
+            for token in self.__document_tokens[slot]:
+                postings = self.__postings[token]
+                del postings[slot]
+                self.__posting_arrays.pop(token, None)
+
+                if not postings:
+                    del self.__postings[token]
+
+            self.__total_length -= self.__document_lengths[slot]
+            self.__document_tokens[slot] = Counter()
+            self.__document_lengths[slot] = 0
+            self.__free_slots.append(slot)
+            self.__length_norms = None
+
+    def __get_length_norms(self) -> np.ndarray:
+        """
+        Get the part of the BM25 denominator that depends on the document length, computed once after every change.
+
+        Returns:
+            np.ndarray: The length norm of the document of every slot.
+        """
+        if self.__length_norms is None:
+            average_length = self.__total_length / len(self.__slots)
+            self.__length_norms = self.__k1 * (
+                1
+                - self.__b
+                + self.__b
+                * np.asarray(self.__document_lengths, dtype=np.float64)
+                / average_length
+            )
+
+        return self.__length_norms
+
+    def __get_posting_arrays(self, token: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the postings of a token as arrays, converted once after every change.
+
+        Args:
+            token (str): The token.
+
+        Returns:
+            np.ndarray: The slots of the documents that contain the token.
+            np.ndarray: The number of times the token appears in each of them.
+        """
+        posting_arrays = self.__posting_arrays.get(token)
+
+        if posting_arrays is None:
+            postings = self.__postings[token]
+            posting_arrays = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings)),
+            )
+            self.__posting_arrays[token] = posting_arrays
+
+        return posting_arrays
+
+    def search(self, query: str, n_results: int = 10) -> list[tuple[str, float]]:
+        """
+        Find the documents that best match a query.
+
+        Args:
+            query (str): The query.
+            n_results (int, optional): The maximum number of documents to return. Defaults to 10.
+
+        Returns:
+            list[tuple[str, float]]: The id and BM25 score of the documents that contain a query token,
+            best first, with ties ordered by id.
+        """
+        with self.__lock:
+            return self.__search(query, n_results)
+
+    def __search(self, query: str, n_results: int) -> list[tuple[str, float]]:
+        """
+        Find the documents that best match a query, while holding the lock.
+
+        Args:
+            query (str): The query.
+            n_results (int): The maximum number of documents to return.
+
+        Returns:
+            list[tuple[str, float]]: The id and BM25 score of the best documents.
+        """
+        document_count = len(self.__slots)
+        query_tokens = [
+            token for token in set(tokenize(query)) if token in self.__postings
+        ]
+
+        if not query_tokens or n_results < 1:
+            return []
+
+        length_norms = self.__get_length_norms()
+        scores = np.zeros(len(self.__slot_ids))
+
+        for token in query_tokens:
+            slots, counts = self.__get_posting_arrays(token)
+            idf = math.log(1 + (document_count - len(slots) + 0.5) / (len(slots) + 0.5))
+            scores[slots] += (
+                idf * counts * (self.__k1 + 1) / (counts + length_norms[slots])
+            )
+
+        matches = np.flatnonzero(scores)
+
+        if len(matches) > n_results:
+            matches = matches[np.argpartition(-scores[matches], n_results - 1)][
+                :n_results
+            ]
+
+        return sorted(
+            ((self.__slot_ids[slot], float(scores[slot])) for slot in matches),
+            key=lambda item: (-item[1], item[0]),
+        )
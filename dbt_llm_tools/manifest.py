@@ -0,0 +1,316 @@
+import json
+import os
+from typing import Any, Iterator, TextIO
+
+MANIFEST_READ_CHUNK_SIZE = 1024 * 1024
+
+
+class JsonStreamReader:
+    """
+    A streaming reader for large JSON documents such as dbt's manifest.json.
+
+    The document is read in chunks and only one value is decoded at a time, so memory use is bounded by
+    the size of the largest value that is read rather than by the size of the whole document.
+
+    Methods:
+        iter_object: Iterate over the keys of the JSON object at the current position.
+        read_value: Decode the JSON value at the current position.
+        skip_value: Skip over the JSON value at the current position.
+    """
+
+    def __init__(
+        self, stream: TextIO, chunk_size: int = MANIFEST_READ_CHUNK_SIZE
+    ) -> None:
+        """
+        Initializes a streaming JSON reader.
+
+        Args:
+            stream (TextIO): An open text file containing the JSON document.
+            chunk_size (int, optional): The number of characters to read at a time. Defaults to 1MB.
+        """
+        self.__stream = stream
+        self.__chunk_size = chunk_size
+        self.__decoder = json.JSONDecoder()
+        self.__buffer = ""
+        self.__position = 0
+        self.__eof = False
+
+    def __fill(self) -> bool:
+        """
+        Drop the consumed part of the buffer and read the next chunk of the document.
+
+        Returns:
+            bool: False if the end of the document was already reached.
+        """
+        if self.__eof:
+            return False
+
+        consumed = self.__position
+        chunk = self.__stream.read(self.__chunk_size)
+        self.__buffer = self.__buffer[consumed:] + chunk
+        self.__position = 0
+        self.__eof = chunk == ""
+
+        return True
+
+    def __peek(self) -> str:
+        """
+        Skip whitespace and return the next character without consuming it.
+
+        Returns:
+            str: The next character, or an empty string at the end of the document.
+        """
+        while True:
+            while (
+                self.__position < len(self.__buffer)
+                and self.__buffer[self.__position].isspace()
+            ):
+                self.__position += 1
+
+            if self.__position < len(self.__buffer):
+                return self.__buffer[self.__position]
+
+            if not self.__fill():
+                return ""
+
+    def __expect(self, characters: str) -> str:
+        """
+        Consume the next character, which must be one of the given characters.
+
+        Args:
+            characters (str): The allowed characters.
+
+        Returns:
+            str: The consumed character.
+        """
+        character = self.__peek()
+
+        if character == "" or character not in characters:
+            raise ValueError(
+                f"Expected one of {characters!r} in JSON document, found {character!r}"
+            )
+
+        self.__position += 1
+
+        return character
+
+    def read_value(self) -> Any:
+        """
+        Decode the JSON value at the current position.
+
+        Returns:
+            Any: The decoded value.
+        """
+        self.__peek()
+
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__position)
+            except json.JSONDecodeError:
+                if not self.__fill():
+                    raise
+                continue
+
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self.__buffer) and self.__fill():
+                continue
+
+            self.__position = end
+
+            return value
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Iterate over the keys of the JSON object at the current position. After each key is
+        yielded, the caller must consume its value with read_value, skip_value or iter_object.
+
+        Yields:
+            str: The keys of the object, in document order.
+        """
+        self.__expect("{")
+
+        if self.__peek() == "}":
+            self.__position += 1
+            return
+
+        while True:
+            key = self.read_value()
+            self.__expect(":")
+
+            yield key
+
+            if self.__expect(",}") == "}":
+                return
+
+    def skip_value(self) -> None:
+        """
+        Skip over the JSON value at the current position. Objects and arrays are skipped one item
+        at a time so that large collections are never decoded as a whole.
+        """
+        character = self.__peek()
+
+        if character == "{":
+            for _ in self.iter_object():
+                self.read_value()
+        elif character == "[":
+            self.__position += 1
+
+            if self.__peek() == "]":
+                self.__position += 1
+                return
+
+            while True:
+                self.read_value()
+
+                if self.__expect(",]") == "]":
+                    return
+        else:
+            self.read_value()
+
+
+def iter_manifest_resources(
+    manifest_path: str, sections: tuple[str, ...] = ("nodes", "sources")
+) -> Iterator[tuple[str, str, dict]]:
+    """
+    Stream the resources of a dbt manifest.json file one at a time.
+
+    Args:
+        manifest_path (str): The path to the manifest.json file.
+        sections (tuple, optional): The top-level sections of the manifest to read.
+            Defaults to ("nodes", "sources").
+
+    Yields:
+        tuple: The section name, the unique id of the resource and the resource itself.
+    """
+    with open(manifest_path, encoding="utf-8") as f:
+        reader = JsonStreamReader(f)
+
+        for section in reader.iter_object():
+            if section not in sections:
+                reader.skip_value()
+                continue
+
+            for unique_id in reader.iter_object():
+                yield section, unique_id, reader.read_value()
+
+
+def get_manifest_documentation(node: dict) -> dict:
+    """
+    Convert the documentation of a manifest node to the format used in dbt yaml files.
+
+    Args:
+        node (dict): A model, source table or column from the manifest.
+
+    Returns:
+        dict: The documentation of the node.
+    """
+    documentation = {"name": node["name"]}
+
+    if node.get("description"):
+        documentation["description"] = node["description"]
+
+    columns = [
+        get_manifest_documentation(column)
+        for column in (node.get("columns") or {}).values()
+    ]
+    if columns:
+        documentation["columns"] = columns
+
+    if node.get("tags"):
+        documentation["config"] = {"tags": node["tags"]}
+
+    return documentation
+
+
+def parse_manifest_model(project_root: str, node: dict) -> dict:
+    """
+    Convert a model node from the manifest to a directory entry.
+
+    Args:
+        project_root (str): The root of the dbt project.
+        node (dict): The model node.
+
+    Returns:
+        dict: The directory entry of the model.
+    """
+    absolute_path = os.path.join(project_root, node["original_file_path"])
+    refs = [
+        (
+            ".".join(filter(None, [ref.get("package"), ref["name"]]))
+            if isinstance(ref, dict)
+            else ".".join(ref)
+        )
+        for ref in node.get("refs", [])
+    ]
+
+    model = {
+        "type": "model",
+        "absolute_path": absolute_path,
+        "relative_path": absolute_path.replace(project_root, ""),
+        "name": node["name"],
+        "refs": list(dict.fromkeys(refs)),
+        "sources": [
+            {"name": source[0], "table": source[1]}
+            for source in node.get("sources", [])
+        ],
+        "sql_contents": node.get("raw_code", node.get("raw_sql", "")),
+    }
+
+    if node.get("patch_path"):
+        model["yaml_path"] = os.path.join(
+            project_root, node["patch_path"].split("://", 1)[-1]
+        )
+        model["documentation"] = get_manifest_documentation(node)
+
+    return model
+
+
+def read_manifest(project_root: str, project_name: str, manifest_path: str):
+    """
+    Read the models and sources of a dbt project from a manifest.json file, one node at a time.
+
+    Args:
+        project_root (str): The root of the dbt project.
+        project_name (str): The name of the dbt project. Nodes of other packages are skipped.
+            If None, every node is read.
+        manifest_path (str): The path to the manifest.json file.
+
+    Returns:
+        dict: The directory entries of the models, keyed by name.
+        dict: The directory entries of the sources, keyed by name.
+        dict: The names of the models with an alias, keyed by alias.
+    """
+    models = {}
+    sources = {}
+    aliases = {}
+
+    for _, _, node in iter_manifest_resources(manifest_path):
+        if project_name is not None and node.get("package_name") not in [
+            None,
+            project_name,
+        ]:
+            continue
+
+        if node.get("resource_type") == "model":
+            models[node["name"]] = parse_manifest_model(project_root, node)
+
+            if (node.get("config") or {}).get("alias"):
+                aliases[node["config"]["alias"]] = node["name"]
+
+        elif node.get("resource_type") == "source":
+            source = sources.setdefault(
+                node["source_name"],
+                {
+                    "name": node["source_name"],
+                    "tables": [],
+                    "type": "source",
+                    "yaml_path": os.path.join(project_root, node["original_file_path"]),
+                },
+            )
+
+            if node.get("source_description"):
+                source["description"] = node["source_description"]
+
+            source["tables"].append(get_manifest_documentation(node))
+
+    return models, sources, aliases
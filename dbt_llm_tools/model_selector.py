@@ -0,0 +1,146 @@
+import fnmatch
+import re
+from typing import Union
+
+from dbt_llm_tools.dependency_graph import DependencyGraph
+from dbt_llm_tools.folder_index import FolderIndex
+
+SELECTOR_ATOM_EXPRESSION = re.compile(r"^(?:(\d*)\+)?(.+?)(?:\+(\d*))?$")
+SELECTOR_METHODS = ("tag", "path")
+
+
+def get_model_tags(model: dict) -> list[str]:
+    """
+    Get the tags of a model, set either in its yaml config or in the config() block of its SQL file.
+
+    Args:
+        model (dict): The directory entry of the model.
+
+    Returns:
+        list[str]: The tags of the model.
+    """
+    tags = []
+
+    for config in [(model.get("documentation") or {}).get("config") or {}, model]:
+        config_tags = config.get("tags") or []
+        tags.extend([config_tags] if isinstance(config_tags, str) else config_tags)
+
+    return list(dict.fromkeys(tags))
+
+
+class ModelSelector:
+    """
+    Evaluates dbt node selectors against in-memory indexes of the models of a project.
+
+    Supported selectors are model names with * wildcards, "tag:<tag>" and "path:<folder>", each optionally
+    prefixed with "+" or "<n>+" to add upstream models and suffixed with "+" or "+<n>" to add downstream models.
+    Selectors separated by spaces are combined as a union, and selectors joined by commas as an intersection.
+
+    Methods:
+        select: Get the names of the models matched by a selector.
+    """
+
+    def __init__(
+        self, models: list[dict], graph: DependencyGraph, folder_index: FolderIndex
+    ) -> None:
+        """
+        Initializes a model selector.
+
+        Args:
+            models (list[dict]): The directory entries of the models.
+            graph (DependencyGraph): The ref graph of the models.
+            folder_index (FolderIndex): The folder index of the models, by position in the list of models.
+        """
+        self.__model_names = [model["name"] for model in models]
+        self.__known_names = set(self.__model_names)
+        self.__graph = graph
+        self.__folder_index = folder_index
+
+        self.__tag_index: dict[str, set[str]] = {}
+        for model in models:
+            for tag in get_model_tags(model):
+                self.__tag_index.setdefault(tag, set()).add(model["name"])
+
+    def __match_method(self, method: Union[str, None], value: str) -> set[str]:
+        """
+        Get the models matched by a selector method, before graph operators are applied.
+
+        Args:
+            method (str): The selector method, or None to match model names.
+            value (str): The value of the selector.
+
+        Returns:
+            set[str]: The names of the matched models.
+        """
+        if method == "tag":
+            return set(self.__tag_index.get(value, set()))
+
+        if method == "path":
+            return {
+                self.__model_names[position]
+                for position in self.__folder_index.find([value], anchored=True)
+            }
+
+        if any(character in value for character in "*?["):
+            return set(fnmatch.filter(self.__model_names, value))
+
+        return {value} if value in self.__known_names else set()
+
+    def __select_atom(self, atom: str) -> set[str]:
+        """
+        Get the models matched by a single selector, including the models added by graph operators.
+
+        Args:
+            atom (str): The selector, e.g. "2+tag:finance+".
+
+        Returns:
+            set[str]: The names of the matched models.
+        """
+        match = SELECTOR_ATOM_EXPRESSION.match(atom)
+
+        if match is None:
+            raise Exception(f"Invalid selector: {atom}")
+
+        upstream_depth, body, downstream_depth = match.groups()
+        method, value = body.split(":", 1) if ":" in body else (None, body)
+
+        if method is not None and method not in SELECTOR_METHODS:
+            raise Exception(f"Unsupported selector method: {method}")
+
+        selected = self.__match_method(method, value)
+
+        for name in list(selected):
+            if upstream_depth is not None:
+                depth = int(upstream_depth) if upstream_depth else None
+                selected.update(self.__graph.get_upstream(name, depth))
+
+            if downstream_depth is not None:
+                depth = int(downstream_depth) if downstream_depth else None
+                selected.update(self.__graph.get_downstream(name, depth))
+
+        return selected & self.__known_names
+
+    def select(self, selector: str) -> set[str]:
+        """
+        Get the names of the models matched by a selector.
+
+        Args:
+            selector (str): The selector, e.g. "+customers tag:finance,path:models/marts".
+
+        Returns:
+            set[str]: The names of the matched models.
+        """
+        selected = set()
+
+        for union_term in selector.split():
+            intersection = None
+
+            for atom in union_term.split(","):
+                matched = self.__select_atom(atom)
+                intersection = (
+                    matched if intersection is None else intersection & matched
+                )
+
+            selected |= intersection
+
+        return selected
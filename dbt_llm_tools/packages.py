@@ -0,0 +1,321 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from typing import Union
+from urllib.parse import quote
+
+from dbt_llm_tools.project_files import parse_project_files
+from dbt_llm_tools.yaml_io import load_yaml
+
+# Bumped whenever the format of the cached packages changes, so that caches written by older
+# versions are parsed again instead of being reused.
+PACKAGE_CACHE_FORMAT = 1
+
+
+def get_default_package_cache_path() -> str:
+    """
+    Get the default folder of the package cache, shared by all the projects of the current user.
+
+    Returns:
+        str: The path to the folder.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(cache_home, "dbt_llm_tools", "packages")
+
+
+def find_packages(project_root: str, packages_path: str) -> list[str]:
+    """
+    Find the dbt packages installed in a project.
+
+    Args:
+        project_root (str): The root of the dbt project.
+        packages_path (str): The folder the packages are installed in, relative to the project root.
+
+    Returns:
+        list[str]: The roots of the installed packages, sorted by path.
+    """
+    return sorted(
+        os.path.dirname(package_file)
+        for package_file in glob.glob(
+            os.path.join(project_root, packages_path, "*", "dbt_project.yml")
+        )
+    )
+
+
+def get_package_versions(models: dict[str, dict]) -> set[tuple[str, str]]:
+    """
+    Get the installed packages that the models of a directory come from.
+
+    Args:
+        models (dict): The models of the directory, keyed by name.
+
+    Returns:
+        set: The name, version and content hash of every package.
+    """
+    return {
+        (model["package_name"], model["package_version"], model.get("package_hash"))
+        for model in models.values()
+        if "package_name" in model
+    }
+
+
+class PackageCache:
+    """
+    A cache of parsed dbt packages keyed by package name and content hash, so that every version of a
+    package is parsed once and reused by every project and run that points the cache to the same folder.
+    Packages often keep the same version in their dbt_project.yml across releases, so the version
+    is not used as the key.
+    Cached packages hold paths relative to the package root, which makes them independent of where
+    the package is installed.
+
+    Methods:
+        load: Load a parsed package.
+        save: Save a parsed package.
+    """
+
+    def __init__(self, cache_path: str) -> None:
+        """
+        Initializes a package cache.
+
+        Args:
+            cache_path (str): Path to the folder of the cache.
+        """
+        self.__cache_path = cache_path
+
+    def __get_path(self, name: str, package_hash: str) -> str:
+        """
+        Get the path of the cache file of a package version.
+
+        Args:
+            name (str): The name of the package.
+            package_hash (str): The content hash of the package.
+
+        Returns:
+            str: The path to the cache file.
+        """
+        return os.path.join(
+            self.__cache_path,
+            quote(name, safe=""),
+            f"{quote(package_hash, safe='')}.json",
+        )
+
+    def load(self, name: str, package_hash: str) -> Union[dict, None]:
+        """
+        Load a parsed package.
+
+        Args:
+            name (str): The name of the package.
+            package_hash (str): The content hash of the package.
+
+        Returns:
+            dict: The parsed package, or None if it is not cached.
+        """
+        try:
+            with open(self.__get_path(name, package_hash), encoding="utf-8") as f:
+                cached_package = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if cached_package.get("format") != PACKAGE_CACHE_FORMAT:
+            return None
+
+        return cached_package["package"]
+
+    def save(self, name: str, package_hash: str, package: dict) -> None:
+        """
+        Save a parsed package. The cache file is replaced atomically, so that concurrent runs
+        never read a partially written file.
+
+        Args:
+            name (str): The name of the package.
+            package_hash (str): The content hash of the package.
+            package (dict): The parsed package.
+        """
+        cache_file = self.__get_path(name, package_hash)
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=os.path.dirname(cache_file), delete=False
+        ) as f:
+            json.dump({"format": PACKAGE_CACHE_FORMAT, "package": package}, f)
+
+        os.replace(f.name, cache_file)
+
+
+def _find_package_files(
+    package_root: str, model_paths: list[str]
+) -> dict[str, list[str]]:
+    """
+    Find the SQL and yaml files in the model paths of a package.
+
+    Args:
+        package_root (str): The root of the package.
+        model_paths (list): The model paths of the package.
+
+    Returns:
+        dict: The sorted paths of the files, keyed by file extension.
+    """
+    return {
+        file_extension: sorted(
+            file_path
+            for path in model_paths
+            for file_path in glob.glob(
+                os.path.join(package_root, path, "**", f"*.{file_extension}"),
+                recursive=True,
+            )
+        )
+        for file_extension in ["sql", "yml"]
+    }
+
+
+def _get_package_hash(package_root: str, file_paths: dict[str, list[str]]) -> str:
+    """
+    Get a hash of the contents of the dbt_project.yml and the model files of a package.
+
+    Args:
+        package_root (str): The root of the package.
+        file_paths (dict): The paths of the SQL and yaml files of the package, keyed by file extension.
+
+    Returns:
+        str: The SHA-256 hex digest of the paths and contents of the files.
+    """
+    package_hash = hashlib.sha256()
+
+    for file_path in [
+        os.path.join(package_root, "dbt_project.yml"),
+        *file_paths["sql"],
+        *file_paths["yml"],
+    ]:
+        with open(file_path, "rb") as f:
+            contents = f.read()
+
+        package_hash.update(os.path.relpath(file_path, package_root).encode("utf-8"))
+        package_hash.update(hashlib.sha256(contents).digest())
+
+    return package_hash.hexdigest()
+
+
+def _parse_package_files(
+    package_root: str,
+    package_name: str,
+    file_paths: dict[str, list[str]],
+    yaml_cache_path: str = None,
+) -> dict:
+    """
+    Parse the SQL and yaml files of a package, with paths relative to the package root.
+
+    Args:
+        package_root (str): The root of the package.
+        package_name (str): The name of the package.
+        file_paths (dict): The paths of the SQL and yaml files of the package, keyed by file extension.
+        yaml_cache_path (str, optional): Path to the folder of the yaml cache.
+
+    Returns:
+        dict: The "models" and "sources" of the package, keyed by namespaced name.
+    """
+    sql_models = {}
+
+    for _, model in parse_project_files(package_root, file_paths["sql"]):
+        sql_models.setdefault(model["name"], model)
+
+    models = {}
+    sources = {}
+
+    for name, model in sql_models.items():
+        model["name"] = f"{package_name}.{name}"
+        model["relative_path"] = os.path.relpath(
+            model.pop("absolute_path"), package_root
+        )
+        model["refs"] = [
+            f"{package_name}.{ref}" if ref in sql_models else ref
+            for ref in model["refs"]
+        ]
+        models[model["name"]] = model
+
+    for yaml_path, (record, _) in zip(
+        file_paths["yml"],
+        parse_project_files(package_root, file_paths["yml"], yaml_cache_path),
+    ):
+        yaml_path = os.path.relpath(yaml_path, package_root)
+
+        for name, documentation in record["models"].items():
+            if f"{package_name}.{name}" in models:
+                models[f"{package_name}.{name}"].update(
+                    {"yaml_path": yaml_path, "documentation": documentation}
+                )
+
+        for name, source in record["sources"].items():
+            sources[f"{package_name}.{name}"] = {
+                **source,
+                "type": "source",
+                "name": f"{package_name}.{name}",
+                "yaml_path": yaml_path,
+            }
+
+    return {"models": models, "sources": sources}
+
+
+def parse_package(
+    project_root: str,
+    package_root: str,
+    yaml_cache_path: str = None,
+    package_cache: PackageCache = None,
+) -> dict:
+    """
+    Parse an installed dbt package, or load it from the package cache. Models and sources are
+    namespaced with the name of the package, e.g. "dbt_utils.date_spine", and refs between the
+    models of the package point to the namespaced names.
+
+    Args:
+        project_root (str): The root of the dbt project the package is installed in.
+        package_root (str): The root of the package.
+        yaml_cache_path (str, optional): Path to the folder of the yaml cache.
+        package_cache (PackageCache, optional): The cache of parsed packages, keyed by the content hash
+            of the package files.
+
+    Returns:
+        dict: The "models" and "sources" of the package, keyed by namespaced name.
+    """
+    with open(os.path.join(package_root, "dbt_project.yml"), encoding="utf-8") as f:
+        package_config = load_yaml(f) or {}
+
+    package_name = package_config.get("name") or os.path.basename(package_root)
+    version = package_config.get("version")
+    version = str(version) if version is not None else None
+    file_paths = _find_package_files(
+        package_root, package_config.get("model-paths", ["models"])
+    )
+    package_hash = _get_package_hash(package_root, file_paths)
+
+    package = (
+        package_cache.load(package_name, package_hash)
+        if package_cache is not None
+        else None
+    )
+
+    if package is None:
+        package = _parse_package_files(
+            package_root, package_name, file_paths, yaml_cache_path
+        )
+
+        if package_cache is not None:
+            package_cache.save(package_name, package_hash, package)
+
+    for entry in [*package["models"].values(), *package["sources"].values()]:
+        entry["package_name"] = package_name
+        entry["package_version"] = version
+        entry["package_hash"] = package_hash
+
+        if "yaml_path" in entry:
+            entry["yaml_path"] = os.path.join(package_root, entry["yaml_path"])
+
+    for model in package["models"].values():
+        model["absolute_path"] = os.path.join(package_root, model["relative_path"])
+        model["relative_path"] = model["absolute_path"].replace(project_root, "")
+
+    return package
@@ -0,0 +1,406 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Union
+
+from dbt_llm_tools.sql_scanner import scan_sql
+from dbt_llm_tools.yaml_io import YamlCache, load_yaml
+
+PARSE_CHUNKS_PER_JOB = 4
+
+
+def get_model_name(sql_file: str) -> str:
+    """
+    Get the name of the model defined in a SQL file.
+
+    Args:
+        sql_file (str): The path to the SQL file.
+
+    Returns:
+        str: The name of the model.
+    """
+    return os.path.basename(sql_file).replace(".sql", "")
+
+
+def read_project_file(file_path: str) -> tuple[str, dict]:
+    """
+    Read a file and describe its current state for the file manifest.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        str: The contents of the file.
+        dict: The modification time, size and content hash of the file.
+    """
+    with open(file_path, "rb") as f:
+        raw_contents = f.read()
+
+    stat = os.stat(file_path)
+
+    return raw_contents.decode("utf-8"), {
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "hash": hashlib.sha256(raw_contents).hexdigest(),
+    }
+
+
+def parse_sql_file(project_root: str, sql_file: str, sql_contents: str) -> dict:
+    """
+    Parse a SQL file and return a dictionary with the file metadata.
+    Transitive dependencies are resolved later, once the whole ref graph is known.
+
+    Args:
+        project_root (str): The root of the dbt project.
+        sql_file (str): The path to the SQL file.
+        sql_contents (str): The contents of the SQL file.
+
+    Returns:
+        dict: A dictionary containing the parsed SQL file metadata. The "alias", "materialized" and "tags"
+        keys are only set when the model configures them in a config() block.
+    """
+    scan_result = scan_sql(sql_contents)
+
+    model = {
+        "type": "model",
+        "absolute_path": sql_file,
+        "relative_path": sql_file.replace(project_root, ""),
+        "name": get_model_name(sql_file),
+        "refs": list(
+            dict.fromkeys(
+                f"{ref['package']}.{ref['name']}" if ref["package"] else ref["name"]
+                for ref in scan_result["refs"]
+            )
+        ),
+        "sources": scan_result["sources"],
+        "sql_contents": sql_contents,
+    }
+
+    for key in ["alias", "materialized", "tags"]:
+        if scan_result[key]:
+            model[key] = scan_result[key]
+
+    return model
+
+
+def parse_yaml_file(
+    yaml_contents: str, content_hash: str = None, yaml_cache_path: str = None
+) -> dict:
+    """
+    Extract documentation from the contents of a single yaml file.
+
+    Args:
+        yaml_contents (str): The contents of the yaml file.
+        content_hash (str, optional): The hash of the yaml contents, used as the cache key.
+        yaml_cache_path (str, optional): Path to the folder of the yaml cache. The cache is
+            only used when both this and the content hash are given.
+
+    Returns:
+        dict: A dictionary with the documented "models" and "sources", keyed by name.
+    """
+    if yaml_cache_path is not None and content_hash is not None:
+        parsed_yaml = YamlCache(yaml_cache_path).load(yaml_contents, content_hash)
+    else:
+        parsed_yaml = load_yaml(yaml_contents)
+
+    if parsed_yaml is None:
+        return {"models": {}, "sources": {}}
+
+    return {
+        "models": {
+            model["name"]: model for model in parsed_yaml.get("models", []) or []
+        },
+        "sources": {
+            source["name"]: source for source in parsed_yaml.get("sources", []) or []
+        },
+    }
+
+
+def _add_timing(timings: Union[dict, None], key: str, start: float) -> float:
+    """
+    Add the time elapsed since a start time to a dictionary of timings.
+
+    Args:
+        timings (dict): The timings in seconds keyed by stage, or None to skip the measurement.
+        key (str): The stage.
+        start (float): The start time, from time.perf_counter().
+
+    Returns:
+        float: The current time, which can be used as the start time of the next stage.
+    """
+    now = time.perf_counter()
+
+    if timings is not None:
+        timings[key] = timings.get(key, 0) + now - start
+
+    return now
+
+
+def parse_project_file(
+    project_root: str, file_path: str, yaml_cache_path: str = None, timings: dict = None
+) -> tuple[dict, Union[dict, None]]:
+    """
+    Read and parse a single SQL or yaml file of a dbt project.
+
+    Args:
+        project_root (str): The root of the dbt project.
+        file_path (str): The path to the file.
+        yaml_cache_path (str, optional): Path to the folder of the yaml cache.
+        timings (dict, optional): A dictionary that the time spent reading files and parsing SQL
+            and yaml is added to, under the "read_seconds", "sql_parse_seconds" and "yaml_parse_seconds" keys.
+
+    Returns:
+        dict: The file manifest record of the file. Records of yaml files also hold the documented
+        models and sources, and records of SQL files hold the model alias.
+        dict: The parsed model for SQL files, None for yaml files.
+    """
+    start = time.perf_counter()
+    contents, record = read_project_file(file_path)
+    start = _add_timing(timings, "read_seconds", start)
+
+    if file_path.endswith(".sql"):
+        model = parse_sql_file(project_root, file_path, contents)
+        _add_timing(timings, "sql_parse_seconds", start)
+        record["alias"] = model.get("alias")
+        return record, model
+
+    record.update(parse_yaml_file(contents, record["hash"], yaml_cache_path))
+    _add_timing(timings, "yaml_parse_seconds", start)
+    return record, None
+
+
+def parse_project_files(
+    project_root: str,
+    file_paths: list[str],
+    yaml_cache_path: str = None,
+    timings: dict = None,
+) -> list[tuple[dict, Union[dict, None]]]:
+    """
+    Read and parse a chunk of files of a dbt project.
+
+    Args:
+        project_root (str): The root of the dbt project.
+        file_paths (list): The paths to the files.
+        yaml_cache_path (str, optional): Path to the folder of the yaml cache.
+        timings (dict, optional): A dictionary that the time spent in every stage is added to.
+
+    Returns:
+        list: The results of parse_project_file for every file, in the same order.
+    """
+    return [
+        parse_project_file(project_root, file_path, yaml_cache_path, timings)
+        for file_path in file_paths
+    ]
+
+
+def _parse_project_files_chunk(
+    project_root: str, file_paths: list[str], yaml_cache_path: str = None
+) -> tuple[list[tuple[dict, Union[dict, None]]], dict]:
+    """
+    Read and parse a chunk of files of a dbt project. Used as the unit of work of parallel parses,
+    which cannot share a timings dictionary with the main process.
+
+    Args:
+        project_root (str): The root of the dbt project.
+        file_paths (list): The paths to the files.
+        yaml_cache_path (str, optional): Path to the folder of the yaml cache.
+
+    Returns:
+        list: The results of parse_project_file for every file, in the same order.
+        dict: The time spent in every stage.
+    """
+    timings = {}
+
+    return (
+        parse_project_files(project_root, file_paths, yaml_cache_path, timings),
+        timings,
+    )
+
+
+def parse_project_files_in_pool(
+    project_root: str,
+    file_paths: list[str],
+    yaml_cache_path: str = None,
+    jobs: int = 1,
+    *,
+    timings: dict = None,
+) -> dict[str, tuple[dict, Union[dict, None]]]:
+    """
+    Read and parse a list of SQL and yaml files, optionally fanning the work out over a process pool.
+    The files are dealt out into interleaved chunks so that every worker process handles several
+    files per task, and the results are put back in the order of the given paths.
+
+    Args:
+        project_root (str): The root of the dbt project.
+        file_paths (list): The paths to the files.
+        yaml_cache_path (str, optional): Path to the folder of the yaml cache.
+        jobs (int, optional): The number of worker processes to use, -1 to use all available cores.
+            Defaults to 1, which parses the files in the current process.
+        timings (dict, optional): A dictionary that the time spent in every stage is added to,
+            summed over the worker processes.
+
+    Returns:
+        dict: The file manifest record and the parsed model of every file, keyed by file path
+        in the order of the given paths.
+    """
+    if jobs == -1:
+        jobs = os.cpu_count() or 1
+
+    if jobs < 1:
+        raise Exception("The number of parse jobs must be a positive integer or -1")
+
+    if jobs == 1 or len(file_paths) < 2:
+        return dict(
+            zip(
+                file_paths,
+                parse_project_files(project_root, file_paths, yaml_cache_path, timings),
+            )
+        )
+
+    chunk_count = min(len(file_paths), jobs * PARSE_CHUNKS_PER_JOB)
+    parsed_files = [None] * len(file_paths)
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(
+            partial(
+                _parse_project_files_chunk,
+                project_root,
+                yaml_cache_path=yaml_cache_path,
+            ),
+            [file_paths[i::chunk_count] for i in range(chunk_count)],
+        )
+
+        for i, (chunk_results, chunk_timings) in enumerate(results):
+            parsed_files[i::chunk_count] = chunk_results
+
+            if timings is not None:
+                for key, seconds in chunk_timings.items():
+                    timings[key] = timings.get(key, 0) + seconds
+
+    return dict(zip(file_paths, parsed_files))
+
+
+def get_alias_index(
+    file_records: dict[str, dict], model_path_index: dict[str, list[str]]
+) -> dict[str, str]:
+    """
+    Build the index from model aliases to model names, from the aliases set in the config() block
+    of the SQL files and in the config of the documented models, which take precedence.
+
+    Args:
+        file_records (dict): The file manifest records keyed by file path.
+        model_path_index (dict): The SQL files that define every model, keyed by model name.
+            Only the aliases of the first file of every model are used.
+
+    Returns:
+        dict: The model names keyed by alias.
+    """
+    alias_index = {}
+
+    for file_path, record in file_records.items():
+        model_name = get_model_name(file_path)
+
+        if (
+            file_path.endswith(".sql")
+            and record.get("alias") is not None
+            and model_path_index.get(model_name, [file_path])[0] == file_path
+        ):
+            alias_index[record["alias"]] = model_name
+
+    for record in file_records.values():
+        for name, model in record.get("models", {}).items():
+            alias = (model.get("config") or {}).get("alias")
+            if alias is not None:
+                alias_index[alias] = name
+
+    return alias_index
+
+
+def get_changed_aliases(
+    previous_alias_index: dict[str, str], alias_index: dict[str, str]
+) -> set[str]:
+    """
+    Find the aliases that were added, removed or moved to another model between two parses.
+
+    Args:
+        previous_alias_index (dict): The model names keyed by alias at the previous parse.
+        alias_index (dict): The model names keyed by alias at the current parse.
+
+    Returns:
+        set: The changed aliases, and the names of the models that they pointed to at the previous parse,
+        which are the refs that resolve differently.
+    """
+    changed_aliases = {
+        alias
+        for alias in previous_alias_index.keys() | alias_index.keys()
+        if previous_alias_index.get(alias) != alias_index.get(alias)
+    }
+
+    return changed_aliases | {
+        previous_alias_index[alias]
+        for alias in changed_aliases
+        if alias in previous_alias_index
+    }
+
+
+def find_changed_files(
+    project_root: str,
+    file_paths: list[str],
+    previous_records: dict[str, dict],
+    yaml_cache_path: str = None,
+    jobs: int = 1,
+    *,
+    timings: dict = None,
+):
+    """
+    Compare the files in the project with the file manifest written by the last parse, and
+    re-parse the files that changed. Files whose modification time or size changed are only
+    considered changed if their content hash changed too.
+
+    Args:
+        project_root (str): The root of the dbt project.
+        file_paths (list): The paths to the SQL and yaml files of the project.
+        previous_records (dict): The file manifest records written by the last parse.
+        yaml_cache_path (str, optional): Path to the folder of the yaml cache.
+        jobs (int, optional): The number of worker processes to use. Defaults to 1.
+        timings (dict, optional): A dictionary that the time spent in every stage is added to.
+
+    Returns:
+        dict: The current file manifest records keyed by file path.
+        dict: The parsed models of the added and changed SQL files keyed by file path.
+        set: The paths of the added, changed and deleted files.
+    """
+    file_records = {}
+    touched_files = []
+
+    for file_path in file_paths:
+        previous_record = previous_records.get(file_path)
+        stat = os.stat(file_path)
+
+        if (
+            previous_record is not None
+            and previous_record["mtime"] == stat.st_mtime
+            and previous_record["size"] == stat.st_size
+        ):
+            file_records[file_path] = previous_record
+        else:
+            touched_files.append(file_path)
+
+    parsed_models = {}
+    changed_files = set(previous_records) - set(file_records) - set(touched_files)
+
+    for file_path, (record, parsed_model) in parse_project_files_in_pool(
+        project_root, touched_files, yaml_cache_path, jobs, timings=timings
+    ).items():
+        file_records[file_path] = record
+        previous_record = previous_records.get(file_path)
+
+        if previous_record is None or previous_record["hash"] != record["hash"]:
+            changed_files.add(file_path)
+
+            if parsed_model is not None:
+                parsed_models[file_path] = parsed_model
+
+    return file_records, parsed_models, changed_files
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from typing import Callable, Union
+
+from dbt_llm_tools.dbt_model import DbtModel
+from dbt_llm_tools.dbt_project import DbtProject
+from dbt_llm_tools.vector_store import VectorStore
+
+WATCHED_FILE_EXTENSIONS = (".sql", ".yml")
+
+
+class ProjectWatcher:  # pylint: disable=too-many-instance-attributes
+    """
+    Keeps the directory of a dbt project, and optionally a vector store, in sync with the files of the project.
+
+    The model folders are polled for changes. Once a burst of edits has settled, the directory is updated
+    with an incremental parse and the vector store is synced with VectorStore.sync, which only embeds
+    the models whose content changed.
+
+    Methods:
+        poll: Check the model folders for changes and sync once they have settled.
+        sync: Update the directory and the vector store with the current state of the project.
+        run: Poll for changes until stopped.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        project: DbtProject,
+        vector_store: VectorStore = None,
+        *,
+        models: list[str] = None,
+        included_folders: list[str] = None,
+        excluded_folders: list[str] = None,
+        poll_interval: float = 1.0,
+        debounce: float = 0.5,
+        jobs: int = 1,
+    ) -> None:
+        """
+        Initializes a project watcher.
+
+        Args:
+            project (DbtProject): The dbt project to watch.
+            vector_store (VectorStore, optional): The vector store to keep in sync with the documented models.
+                Stored models that are gone from the project or do not match the filters are deleted.
+            models (list, optional): The names of the models to keep in the vector store.
+            included_folders (list, optional): The folders of the models to keep in the vector store.
+            excluded_folders (list, optional): The folders of the models to leave out of the vector store.
+            poll_interval (float, optional): The number of seconds between two checks for changes. Defaults to 1.
+            debounce (float, optional): The number of seconds without further changes to wait for before
+                syncing. Defaults to 0.5.
+            jobs (int, optional): The number of worker processes used to parse files. Defaults to 1.
+        """
+        self.__project = project
+        self.__vector_store = vector_store
+        self.__model_filters = (models, included_folders, excluded_folders)
+        self.__poll_interval = poll_interval
+        self.__debounce = debounce
+        self.__jobs = jobs
+
+        self.__snapshot = self.__take_snapshot()
+        self.__last_change: Union[float, None] = None
+
+    def __take_snapshot(self) -> dict[str, tuple[int, int]]:
+        """
+        Record the modification time and size of every SQL and yaml file in the model folders.
+
+        Returns:
+            dict: The modification time and size of every file, keyed by path.
+        """
+        snapshot = {}
+
+        for model_path in self.__project.get_model_paths():
+            for folder, _, file_names in os.walk(model_path):
+                for file_name in file_names:
+                    if not file_name.endswith(WATCHED_FILE_EXTENSIONS):
+                        continue
+
+                    file_path = os.path.join(folder, file_name)
+
+                    try:
+                        stat = os.stat(file_path)
+                    except FileNotFoundError:
+                        continue
+
+                    snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+
+        return snapshot
+
+    def __get_prompt_models(self) -> list[DbtModel]:
+        """
+        Get the documented models that belong in the vector store.
+
+        Returns:
+            list[DbtModel]: The models.
+        """
+        return [
+            DbtModel(model["documentation"])
+            for model in self.__project.get_models(*self.__model_filters)
+            if model.get("documentation") is not None
+        ]
+
+    def sync(self) -> dict[str, int]:
+        """
+        Update the directory with an incremental parse, then sync the vector store with the documented models.
+
+        Returns:
+            dict: The number of models that were "added", "updated", "unchanged" and "deleted" in the vector store,
+            all 0 if there is no vector store.
+        """
+        self.__project.parse(incremental=True, jobs=self.__jobs)
+
+        if self.__vector_store is None:
+            return {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+
+        return self.__vector_store.sync(self.__get_prompt_models())
+
+    def poll(self) -> Union[dict[str, int], None]:
+        """
+        Check the model folders for changes. Changes are synced once no further change has been seen
+        for the debounce period, so that a burst of edits leads to a single sync.
+
+        Returns:
+            dict: The result of the sync, or None if nothing was synced.
+        """
+        snapshot = self.__take_snapshot()
+        now = time.monotonic()
+
+        if snapshot != self.__snapshot:
+            self.__snapshot = snapshot
+            self.__last_change = now
+            return None
+
+        if self.__last_change is None or now - self.__last_change < self.__debounce:
+            return None
+
+        self.__last_change = None
+
+        return self.sync()
+
+    def run(
+        self,
+        stop_event: threading.Event = None,
+        on_sync: Callable[[dict[str, int]], None] = None,
+    ) -> None:
+        """
+        Sync the project, then poll for changes until stopped.
+
+        Args:
+            stop_event (threading.Event, optional): An event that stops the watcher when set.
+                Runs until interrupted if not given.
+            on_sync (Callable, optional): A function called with the result of every sync.
+        """
+        stop_event = stop_event or threading.Event()
+        result = self.sync()
+
+        while True:
+            if on_sync is not None and result is not None:
+                on_sync(result)
+
+            if stop_event.wait(self.__poll_interval):
+                return
+
+            result = self.poll()
@@ -0,0 +1,133 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+_COLLECTION_VERSIONS: dict[Hashable, int] = {}
+_VERSION_COUNTER = itertools.count(1)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for use in a cache key, so that queries that only differ by whitespace share an entry.
+
+    Args:
+        query (str): The query.
+
+    Returns:
+        str: The query without leading, trailing and repeated whitespace.
+    """
+    return " ".join(query.split())
+
+
+class LRUCache:
+    """
+    A thread-safe in-memory cache that evicts the least recently used entry once it is full, and entries that
+    are older than their time to live.
+
+    Methods:
+        get: Get a cached value.
+        put: Cache a value.
+        clear: Remove all the entries.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initializes an LRU cache.
+
+        Args:
+            max_size (int, optional): The maximum number of entries, 0 to disable the cache. Defaults to 1024.
+            ttl (float, optional): The number of seconds an entry stays valid after it was cached.
+                Defaults to no limit.
+            clock (Callable, optional): The function that returns the current time in seconds.
+                Defaults to time.monotonic.
+        """
+        self.__max_size = max_size
+        self.__ttl = ttl
+        self.__clock = clock
+        self.__entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value and mark it as recently used.
+
+        Args:
+            key (Hashable): The key of the value.
+            default (Any, optional): The value returned when the key is not cached or has expired.
+
+        Returns:
+            Any: The cached value, or the default.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is None:
+                return default
+
+            if self.__ttl is not None and self.__clock() - entry[0] > self.__ttl:
+                del self.__entries[key]
+                return default
+
+            self.__entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Cache a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key (Hashable): The key of the value.
+            value (Any): The value.
+        """
+        if self.__max_size < 1:
+            return
+
+        with self.__lock:
+            self.__entries[key] = (self.__clock(), value)
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove all the entries.
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+
+def get_collection_version(collection_key: Hashable) -> int:
+    """
+    Get the version of a collection, which changes every time the collection is written to in this process.
+
+    Args:
+        collection_key (Hashable): The key that identifies the collection, e.g. its path and name.
+
+    Returns:
+        int: The version of the collection, 0 if it was never written to.
+    """
+    return _COLLECTION_VERSIONS.get(collection_key, 0)
+
+
+def bump_collection_version(collection_key: Hashable) -> None:
+    """
+    Give a collection a new version, so that the results cached for its previous versions are not used anymore.
+
+    Args:
+        collection_key (Hashable): The key that identifies the collection, e.g. its path and name.
+    """
+    _COLLECTION_VERSIONS[collection_key] = next(_VERSION_COUNTER)
+
+
+QUERY_EMBEDDING_CACHE = LRUCache(max_size=1024, ttl=3600)
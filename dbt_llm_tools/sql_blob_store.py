@@ -0,0 +1,236 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Union
+
+
+def get_sql_hash(sql_contents: str) -> str:
+    """
+    Get the content hash of the SQL code of a model.
+
+    Args:
+        sql_contents (str): The SQL code.
+
+    Returns:
+        str: The SHA-256 hex digest of the code.
+    """
+    return hashlib.sha256(sql_contents.encode("utf-8")).hexdigest()
+
+
+class SqlBlobStore:
+    """
+    A content-addressed store for the SQL code of the models, kept out of the directory so that
+    loading the directory does not load the code of the whole project.
+
+    The code is appended to a single pack file, where every blob is a "<hash> <length>" header line
+    followed by the UTF-8 encoded code. Blobs are written once per distinct content, and directory
+    entries only hold the hash and the offset of their blob. Every blob is appended with a single
+    write, so that processes can append to the same pack file at the same time.
+
+    Methods:
+        put_many: Store pieces of SQL code and get the hash and offset of each.
+        get: Read a piece of SQL code by hash and offset.
+        compact: Rewrite the pack file with only the blobs that are still used.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes a SQL blob store. The pack file is created on the first write.
+
+        Args:
+            path (str): Path to the pack file.
+        """
+        self.__path = path
+        self.__offsets: dict[str, int] = {}
+        self.__indexed_size = 0
+        self.__indexed_inode = None
+
+    def __encode_blob(self, sql_contents: str) -> tuple[str, bytes]:
+        """
+        Encode a piece of SQL code as a blob of the pack file.
+
+        Args:
+            sql_contents (str): The SQL code.
+
+        Returns:
+            str: The hash of the code.
+            bytes: The header and the code.
+        """
+        sql_hash = get_sql_hash(sql_contents)
+        data = sql_contents.encode("utf-8")
+
+        return sql_hash, f"{sql_hash} {len(data)}\n".encode("ascii") + data + b"\n"
+
+    def __read_header(self, f, offset: int) -> Union[tuple[str, int], None]:
+        """
+        Read the header of the blob at an offset of the pack file.
+
+        Args:
+            f (file): The pack file, opened in binary mode.
+            offset (int): The offset of the blob.
+
+        Returns:
+            str: The hash of the blob.
+            int: The length of the blob in bytes.
+            Returns None if there is no valid header at the offset.
+        """
+        f.seek(offset)
+        header = f.readline().split()
+
+        if len(header) != 2 or not header[1].isdigit():
+            return None
+
+        return header[0].decode("ascii"), int(header[1])
+
+    def __update_index(self) -> None:
+        """
+        Index the offsets of the blobs appended to the pack file since it was last indexed,
+        including the ones written by other processes.
+        """
+        if not os.path.isfile(self.__path):
+            self.__offsets = {}
+            self.__indexed_size = 0
+            return
+
+        with open(self.__path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            if size < self.__indexed_size or stat.st_ino != self.__indexed_inode:
+                self.__offsets = {}
+                self.__indexed_size = 0
+                self.__indexed_inode = stat.st_ino
+
+            while self.__indexed_size < size:
+                header = self.__read_header(f, self.__indexed_size)
+                if header is None:
+                    break
+
+                sql_hash, length = header
+                self.__offsets.setdefault(sql_hash, self.__indexed_size)
+                self.__indexed_size = f.tell() + length + 1
+
+    def put_many(self, sql_contents: list[str]) -> list[tuple[str, int]]:
+        """
+        Store pieces of SQL code, skipping the ones that are already stored.
+
+        Args:
+            sql_contents (list[str]): The SQL code to store.
+
+        Returns:
+            list[tuple[str, int]]: The hash and offset of the blob of every piece of code, in order.
+        """
+        locations = []
+        os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+
+        # Unbuffered writes to a file opened in append mode land at the end of the file, even when
+        # other processes append to it at the same time, so offsets are only known after the writes.
+        with open(self.__path, "ab", buffering=0) as f:
+            self.__update_index()
+
+            for contents in sql_contents:
+                sql_hash, blob = self.__encode_blob(contents)
+
+                if sql_hash not in self.__offsets:
+                    if f.write(blob) != len(blob):
+                        raise Exception(f"Could not append SQL code to {self.__path}")
+
+                    end = f.tell()
+                    self.__offsets[sql_hash] = end - len(blob)
+
+                    if self.__indexed_size == end - len(blob):
+                        self.__indexed_size = end
+
+                locations.append((sql_hash, self.__offsets[sql_hash]))
+
+        return locations
+
+    def __read_blob(self, sql_hash: str, offset: int) -> Union[str, None]:
+        """
+        Read the blob at an offset of the pack file, if it has the expected hash.
+
+        Args:
+            sql_hash (str): The expected hash of the blob.
+            offset (int): The offset of the blob.
+
+        Returns:
+            str: The SQL code, or None if there is no blob with the expected hash at the offset.
+        """
+        try:
+            with open(self.__path, "rb") as f:
+                header = self.__read_header(f, offset)
+
+                if header is None or header[0] != sql_hash:
+                    return None
+
+                return f.read(header[1]).decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def get(self, sql_hash: str, offset: int = None) -> str:
+        """
+        Read a piece of SQL code. The offset is only a hint: if the blob at the offset does not have
+        the expected hash, the blob is looked up by hash.
+
+        Args:
+            sql_hash (str): The hash of the code.
+            offset (int, optional): The offset of the blob in the pack file.
+
+        Returns:
+            str: The SQL code.
+        """
+        sql_contents = (
+            self.__read_blob(sql_hash, offset) if offset is not None else None
+        )
+
+        if sql_contents is None:
+            self.__update_index()
+
+            if sql_hash in self.__offsets:
+                sql_contents = self.__read_blob(sql_hash, self.__offsets[sql_hash])
+
+        if sql_contents is None:
+            raise Exception(f"SQL code with hash {sql_hash} not found in {self.__path}")
+
+        return sql_contents
+
+    def compact(self, sql_hashes: set[str]) -> dict[str, int]:
+        """
+        Rewrite the pack file with only the given blobs, dropping the code that is no longer used.
+        The new pack file replaces the old one atomically, and blobs stored by other processes
+        during the compaction are lost.
+
+        Args:
+            sql_hashes (set[str]): The hashes of the blobs to keep.
+
+        Returns:
+            dict[str, int]: The new offset of every kept blob, keyed by hash. Hashes that are not
+            in the store are left out.
+        """
+        if not os.path.isfile(self.__path):
+            return {}
+
+        self.__update_index()
+        offsets = {}
+
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(self.__path) or ".", delete=False
+        ) as f:
+            for sql_hash in sorted(
+                sql_hashes & self.__offsets.keys(), key=self.__offsets.get
+            ):
+                sql_contents = self.__read_blob(sql_hash, self.__offsets[sql_hash])
+
+                if sql_contents is not None:
+                    offsets[sql_hash] = f.tell()
+                    f.write(self.__encode_blob(sql_contents)[1])
+
+        shutil.copymode(self.__path, f.name)
+        os.replace(f.name, self.__path)
+
+        stat = os.stat(self.__path)
+        self.__offsets = dict(offsets)
+        self.__indexed_size = stat.st_size
+        self.__indexed_inode = stat.st_ino
+
+        return offsets
@@ -0,0 +1,309 @@
+import ast
+import re
+from typing import Any, Union
+
+STRING_LITERAL = r"'[^'\\]*'|\"[^\"\\]*\""
+KEYWORD_VALUE = rf"{STRING_LITERAL}|\[\s*(?:(?:{STRING_LITERAL})\s*,?\s*)*\]|[\w.]+"
+KEYWORD_ARGUMENT = rf"\w+\s*=\s*(?:{KEYWORD_VALUE})"
+
+# Every token starts with a "{", so that the regular expression engine can jump between candidates.
+# Blocks that hold a single ref() or source() call with string arguments, by far the most common kind,
+# and blocks that hold a single config() call with keyword arguments are read by the expression itself.
+JINJA_TOKEN_EXPRESSION = re.compile(
+    r"\{(?:"
+    r"\{-?\s*(?P<call>ref|source)\s*\(\s*(['\"])(?P<first>[^'\"\\]*)\2"
+    r"\s*(?:,\s*(['\"])(?P<second>[^'\"\\]*)\4\s*)?\)\s*-?\}"
+    rf"|\{{-?\s*config\s*\(\s*(?P<config>{KEYWORD_ARGUMENT}(?:\s*,\s*{KEYWORD_ARGUMENT})*)\s*,?\s*\)\s*-?\}}"
+    r"|#.*?#"
+    r"|(?P<block>\{.*?\}|%.*?%)"
+    r")\}",
+    re.S,
+)
+RAW_BLOCK_EXPRESSION = re.compile(
+    r"\{%-?\s*raw\s*-?%\}.*?(?:\{%-?\s*endraw\s*-?%\}|$)", re.S
+)
+JINJA_CALL_EXPRESSION = re.compile(r"(?<![\w.])(ref|source|config)\s*\(")
+STRING_ARGUMENTS_EXPRESSION = re.compile(
+    r"\s*(['\"])([^'\"\\]*)\1\s*(?:,\s*(['\"])([^'\"\\]*)\3\s*)?\)"
+)
+KEYWORD_ARGUMENT_EXPRESSION = re.compile(
+    r"\s*(\w+)\s*=\s*('[^'\\]*'|\"[^\"\\]*\"|\[[^\[\]()'\"]*(?:(?:'[^'\\]*'|\"[^\"\\]*\")[^\[\]()'\"]*)*\]|[\w.]+)"
+    r"\s*(,|\))"
+)
+CONFIG_ARGUMENT_EXPRESSION = re.compile(rf"(\w+)\s*=\s*({KEYWORD_VALUE})")
+STRING_LITERAL_EXPRESSION = re.compile(r"'([^'\\]*)'|\"([^\"\\]*)\"")
+SCANNED_CONFIG_KEYS = ["tags", "materialized", "alias"]
+JINJA_CONSTANTS = {"true": True, "false": False, "none": None}
+
+
+def _find_closing_parenthesis(text: str, start: int) -> Union[int, None]:
+    """
+    Find the parenthesis that closes the argument list starting at a position, skipping over strings.
+
+    Args:
+        text (str): The text to search.
+        start (int): The position right after the opening parenthesis.
+
+    Returns:
+        int: The position of the closing parenthesis, or None if the argument list is not closed.
+    """
+    depth = 1
+    quote = None
+    position = start
+
+    while position < len(text):
+        character = text[position]
+
+        if quote is not None:
+            if character == "\\":
+                position += 1
+            elif character == quote:
+                quote = None
+        elif character in "'\"":
+            quote = character
+        elif character in "([{":
+            depth += 1
+        elif character in ")]}":
+            depth -= 1
+            if depth == 0:
+                return position
+
+        position += 1
+
+    return None
+
+
+def _get_literal(node: ast.AST) -> Any:
+    """
+    Evaluate a literal argument of a Jinja call, accepting Jinja's lowercase constants.
+
+    Args:
+        node (ast.AST): The expression of the argument.
+
+    Returns:
+        Any: The value of the argument, or None if it is not a literal.
+    """
+    if isinstance(node, ast.Name):
+        return JINJA_CONSTANTS.get(node.id)
+
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+
+def _get_keyword_value(value: str) -> Any:
+    """
+    Evaluate the value of a keyword argument matched by KEYWORD_VALUE.
+
+    Args:
+        value (str): The source of the value.
+
+    Returns:
+        Any: The string or list of strings, or None for plain values such as numbers and booleans.
+    """
+    if value[0] in "'\"":
+        return value[1:-1]
+
+    if value[0] == "[":
+        return [
+            single or double
+            for single, double in STRING_LITERAL_EXPRESSION.findall(value)
+        ]
+
+    return None
+
+
+def _parse_keyword_arguments(
+    block: str, start: int
+) -> Union[tuple[dict[str, Any], int], None]:
+    """
+    Parse an argument list made only of keyword arguments with string, list of strings or plain
+    values, such as a typical config() call, without going through the Python parser.
+
+    Args:
+        block (str): The contents of the Jinja block.
+        start (int): The position right after the opening parenthesis of the call.
+
+    Returns:
+        dict: The keyword arguments. Plain values such as numbers and booleans are returned as None.
+        int: The position right after the closing parenthesis.
+        Returns None if the argument list has any other form.
+    """
+    keywords = {}
+    position = start
+
+    while (argument := KEYWORD_ARGUMENT_EXPRESSION.match(block, position)) is not None:
+        key, value, separator = argument.groups()
+        position = argument.end()
+        keywords[key] = _get_keyword_value(value)
+
+        if separator == ")":
+            return keywords, position
+
+    return None
+
+
+def _parse_arguments(block: str, start: int) -> tuple[list[Any], dict[str, Any], int]:
+    """
+    Parse the arguments of a Jinja call as Python literals.
+
+    Args:
+        block (str): The contents of the Jinja block.
+        start (int): The position right after the opening parenthesis of the call.
+
+    Returns:
+        list: The positional arguments.
+        dict: The keyword arguments.
+        int: The position right after the closing parenthesis.
+    """
+    simple_arguments = STRING_ARGUMENTS_EXPRESSION.match(block, start)
+
+    if simple_arguments is not None:
+        arguments = [simple_arguments.group(2)]
+        if simple_arguments.group(4) is not None:
+            arguments.append(simple_arguments.group(4))
+        return arguments, {}, simple_arguments.end()
+
+    keyword_arguments = _parse_keyword_arguments(block, start)
+
+    if keyword_arguments is not None:
+        return [], *keyword_arguments
+
+    end = _find_closing_parenthesis(block, start)
+
+    if end is None:
+        return [], {}, len(block)
+
+    try:
+        call = ast.parse(f"f({block[start:end]})", mode="eval").body
+    except SyntaxError:
+        return [], {}, end + 1
+
+    return (
+        [_get_literal(argument) for argument in call.args],
+        {
+            keyword.arg: _get_literal(keyword.value)
+            for keyword in call.keywords
+            if keyword.arg is not None
+        },
+        end + 1,
+    )
+
+
+def _add_config(result: dict, keywords: dict[str, Any]) -> None:
+    """
+    Add the keyword arguments of a config() call to a scan result.
+
+    Args:
+        result (dict): The scan result to update.
+        keywords (dict): The keyword arguments of the call.
+    """
+    tags = keywords.get("tags") or []
+    tags = [tags] if isinstance(tags, str) else tags
+    result["tags"].extend(tag for tag in tags if isinstance(tag, str))
+
+    for key in ["materialized", "alias"]:
+        if isinstance(keywords.get(key), str):
+            result[key] = keywords[key]
+
+
+def _add_call(
+    result: dict, function: str, strings: list[str], keywords: dict[str, Any]
+) -> None:
+    """
+    Add a ref(), source() or config() call to a scan result.
+
+    Args:
+        result (dict): The scan result to update.
+        function (str): The name of the called function.
+        strings (list[str]): The positional string arguments of the call.
+        keywords (dict): The keyword arguments of the call.
+    """
+    if function == "ref" and len(strings) in (1, 2):
+        result["refs"].append(
+            {"package": strings[0] if len(strings) == 2 else None, "name": strings[-1]}
+        )
+
+    elif function == "source" and len(strings) == 2:
+        result["sources"].append({"name": strings[0], "table": strings[1]})
+
+    elif function == "config":
+        _add_config(result, keywords)
+
+
+def _scan_jinja_block(block: str, result: dict) -> None:
+    """
+    Add the ref(), source() and config() calls of a Jinja block to a scan result.
+
+    Args:
+        block (str): The contents of the Jinja block.
+        result (dict): The scan result to update.
+    """
+    position = 0
+
+    while (call := JINJA_CALL_EXPRESSION.search(block, position)) is not None:
+        arguments, keywords, position = _parse_arguments(block, call.end())
+        strings = [argument for argument in arguments if isinstance(argument, str)]
+
+        _add_call(result, call.group(1), strings, keywords)
+
+
+def scan_sql(sql_contents: str) -> dict:
+    """
+    Extract the refs, sources and config of a dbt SQL file in a single pass over its contents.
+    Calls are only read from Jinja blocks, and Jinja comments and raw blocks are skipped. Blocks inside
+    SQL comments are read like dbt renders them, so that "-- depends_on: {{ ref('model') }}" hints count.
+
+    Args:
+        sql_contents (str): The contents of the SQL file.
+
+    Returns:
+        dict: The "refs" as package and name pairs, the "sources" as name and table pairs, the "tags" set in
+        config() blocks, and the "materialized" and "alias" configs, which are None if they are not set.
+    """
+    result = {
+        "refs": [],
+        "sources": [],
+        "tags": [],
+        "materialized": None,
+        "alias": None,
+    }
+
+    if "{" not in sql_contents:
+        return result
+
+    if "endraw" in sql_contents:
+        sql_contents = RAW_BLOCK_EXPRESSION.sub("", sql_contents)
+
+    refs = result["refs"]
+
+    # findall builds the groups of every token in C, which is much faster than creating match objects.
+    for call, _, first, _, second, config, block in JINJA_TOKEN_EXPRESSION.findall(
+        sql_contents
+    ):
+        if call == "ref":
+            refs.append(
+                {"package": first, "name": second}
+                if second
+                else {"package": None, "name": first}
+            )
+        elif call == "source":
+            if second:
+                result["sources"].append({"name": first, "table": second})
+        elif config:
+            keywords = dict(CONFIG_ARGUMENT_EXPRESSION.findall(config))
+            _add_config(
+                result,
+                {
+                    key: _get_keyword_value(keywords[key])
+                    for key in SCANNED_CONFIG_KEYS
+                    if key in keywords
+                },
+            )
+        elif block:
+            _scan_jinja_block(block[1:-1], result)
+
+    result["tags"] = list(dict.fromkeys(result["tags"]))
+
+    return result
@@ -0,0 +1,355 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator, Union
+
+CURRENT_SPAN: contextvars.ContextVar[Union["Span", None]] = contextvars.ContextVar(
+    "dbt_llm_tools_current_span", default=None
+)
+TOKEN_USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+class Span:  # pylint: disable=too-many-instance-attributes
+    """
+    A named and timed operation, with the attributes that describe it and the counts that add up while it runs,
+    such as the number of parsed files or the tokens used by a completion.
+
+    Methods:
+        set_attribute: Set an attribute of the span.
+        add_count: Add to a count of the span.
+        add_token_usage: Add the token usage of a language model response to the counts of the span.
+        to_dict: Get the span as a JSON serializable dictionary.
+    """
+
+    def __init__(
+        self, name: str, attributes: dict = None, parent: "Span" = None
+    ) -> None:
+        """
+        Initializes a span and starts its clock.
+
+        Args:
+            name (str): The name of the operation, e.g. "dbt_project.parse".
+            attributes (dict, optional): The attributes of the span.
+            parent (Span, optional): The span this span runs in.
+        """
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.counts: dict[str, Union[int, float]] = {}
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.start_time = time.time()
+        self.duration: Union[float, None] = None
+        self.error: Union[str, None] = None
+        self.__start = time.perf_counter()
+
+    def end(self) -> None:
+        """
+        Stop the clock of the span.
+        """
+        self.duration = time.perf_counter() - self.__start
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        Set an attribute of the span.
+
+        Args:
+            key (str): The name of the attribute.
+            value (Any): The value of the attribute.
+        """
+        self.attributes[key] = value
+
+    def add_count(self, key: str, value: Union[int, float] = 1) -> None:
+        """
+        Add to a count of the span.
+
+        Args:
+            key (str): The name of the count.
+            value (int | float, optional): The amount to add. Defaults to 1.
+        """
+        self.counts[key] = self.counts.get(key, 0) + value
+
+    def add_token_usage(self, usage: Any) -> None:
+        """
+        Add the token usage of a language model response to the counts of the span.
+
+        Args:
+            usage (Any): The usage of the response, as an object or a dictionary with prompt_tokens,
+                completion_tokens and total_tokens. Ignored if it is None.
+        """
+        if usage is None:
+            return
+
+        for field in TOKEN_USAGE_FIELDS:
+            value = (
+                usage.get(field)
+                if isinstance(usage, dict)
+                else getattr(usage, field, None)
+            )
+
+            if value is not None:
+                self.add_count(field, value)
+
+    def to_dict(self) -> dict:
+        """
+        Get the span as a JSON serializable dictionary.
+
+        Returns:
+            dict: The name, ids, start time, duration, attributes, counts and error of the span.
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent is not None else None,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "counts": self.counts,
+            "error": self.error,
+        }
+
+
+class SpanExporter:
+    """
+    Base class for the exporters that receive the spans of a tracer.
+
+    Methods:
+        on_start: Called when a span starts.
+        on_end: Called when a span ends, with its duration set.
+    """
+
+    def on_start(self, span: Span) -> None:
+        """
+        Called when a span starts.
+
+        Args:
+            span (Span): The span.
+        """
+
+    def on_end(self, span: Span) -> None:
+        """
+        Called when a span ends, with its duration set.
+
+        Args:
+            span (Span): The span.
+        """
+        raise NotImplementedError
+
+
+class LoggingSpanExporter(SpanExporter):
+    """
+    Logs every span when it ends.
+    """
+
+    def __init__(
+        self, logger: logging.Logger = None, level: int = logging.INFO
+    ) -> None:
+        """
+        Initializes a logging span exporter.
+
+        Args:
+            logger (logging.Logger, optional): The logger to use. Defaults to the "dbt_llm_tools.tracing" logger.
+            level (int, optional): The level of the log records. Defaults to logging.INFO.
+        """
+        self.__logger = logger or logging.getLogger(__name__)
+        self.__level = level
+
+    def on_end(self, span: Span) -> None:
+        self.__logger.log(
+            self.__level,
+            "%s took %.1f ms %s",
+            span.name,
+            span.duration * 1000,
+            json.dumps({**span.attributes, **span.counts}, default=str),
+        )
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """
+    Appends every span to a JSON lines file when it ends, one JSON object per line.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes a JSON lines span exporter.
+
+        Args:
+            path (str): Path to the JSON lines file.
+        """
+        self.__path = path
+        self.__lock = threading.Lock()
+
+    def on_end(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+
+        with self.__lock, open(self.__path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class OpenTelemetrySpanExporter(SpanExporter):
+    """
+    Forwards every span to OpenTelemetry, keeping the nesting of the spans. Requires the
+    opentelemetry-api package, and an OpenTelemetry SDK to send the spans anywhere.
+    """
+
+    def __init__(self, tracer_provider: Any = None) -> None:
+        """
+        Initializes an OpenTelemetry span exporter.
+
+        Args:
+            tracer_provider (TracerProvider, optional): The OpenTelemetry tracer provider.
+                Defaults to the global tracer provider.
+        """
+        try:
+            from opentelemetry import trace  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise Exception(
+                "The OpenTelemetry exporter requires the opentelemetry-api package"
+            ) from error
+
+        self.__trace = trace
+        self.__tracer = trace.get_tracer(
+            "dbt_llm_tools", tracer_provider=tracer_provider
+        )
+        self.__open_spans: dict[str, Any] = {}
+        self.__lock = threading.Lock()
+
+    def __get_attributes(self, span: Span) -> dict:
+        """
+        Convert the attributes and counts of a span to OpenTelemetry attributes, which only accept
+        strings, booleans, numbers and lists of those.
+
+        Args:
+            span (Span): The span.
+
+        Returns:
+            dict: The OpenTelemetry attributes.
+        """
+        attributes = {
+            **span.attributes,
+            **{f"count.{key}": value for key, value in span.counts.items()},
+        }
+
+        return {
+            key: (
+                value
+                if isinstance(value, (str, bool, int, float))
+                else json.dumps(value, default=str)
+            )
+            for key, value in attributes.items()
+            if value is not None
+        }
+
+    def on_start(self, span: Span) -> None:
+        with self.__lock:
+            parent = (
+                self.__open_spans.get(span.parent.span_id)
+                if span.parent is not None
+                else None
+            )
+
+        otel_span = self.__tracer.start_span(
+            span.name,
+            context=(
+                self.__trace.set_span_in_context(parent) if parent is not None else None
+            ),
+            start_time=int(span.start_time * 1e9),
+        )
+
+        with self.__lock:
+            self.__open_spans[span.span_id] = otel_span
+
+    def on_end(self, span: Span) -> None:
+        with self.__lock:
+            otel_span = self.__open_spans.pop(span.span_id, None)
+
+        if otel_span is None:
+            return
+
+        otel_span.set_attributes(self.__get_attributes(span))
+
+        if span.error is not None:
+            otel_span.set_status(
+                self.__trace.Status(self.__trace.StatusCode.ERROR, span.error)
+            )
+
+        otel_span.end(end_time=int((span.start_time + span.duration) * 1e9))
+
+
+class Tracer:
+    """
+    Records spans and hands them to exporters. Spans opened while another span is open, in the same thread
+    or asyncio task, become its children. A tracer without exporters only measures spans and drops them.
+
+    Methods:
+        add_exporter: Add an exporter for the spans.
+        span: Open a span for the duration of a with block.
+    """
+
+    def __init__(self, exporters: list[SpanExporter] = None) -> None:
+        """
+        Initializes a tracer.
+
+        Args:
+            exporters (list[SpanExporter], optional): The exporters of the spans.
+        """
+        self.__exporters = list(exporters or [])
+
+    def add_exporter(self, exporter: SpanExporter) -> None:
+        """
+        Add an exporter for the spans.
+
+        Args:
+            exporter (SpanExporter): The exporter.
+        """
+        self.__exporters.append(exporter)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """
+        Open a span for the duration of a with block. Errors raised in the block are recorded
+        on the span and raised again.
+
+        Args:
+            name (str): The name of the operation.
+            **attributes: The attributes of the span.
+
+        Returns:
+            Iterator[Span]: The span.
+        """
+        span = Span(name, attributes, CURRENT_SPAN.get())
+        token = CURRENT_SPAN.set(span)
+
+        for exporter in self.__exporters:
+            exporter.on_start(span)
+
+        try:
+            yield span
+        except BaseException as error:
+            span.error = repr(error)
+            raise
+        finally:
+            span.end()
+            CURRENT_SPAN.reset(token)
+
+            for exporter in self.__exporters:
+                exporter.on_end(span)
+
+
+DEFAULT_TRACER = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """
+    Get the tracer used by the classes that are not given one. It has no exporters until some are added,
+    e.g. with get_tracer().add_exporter(LoggingSpanExporter()).
+
+    Returns:
+        Tracer: The default tracer.
+    """
+    return DEFAULT_TRACER
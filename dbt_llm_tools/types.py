@@ -36,7 +36,8 @@ class DbtModelDirectoryEntry(TypedDict):
     refs: list[str]
     deps: list[str]
     sources: list[str]
-    sql_contents: str
+    sql_hash: str
+    sql_offset: int
     documentation: DbtModelDict
     interpretation: DbtModelDict
 
@@ -67,4 +68,5 @@ class ParsedSearchResult(TypedDict):
     id: str
     document: str
     metadata: dict
-    distance: float
+    distance: Union[float, None]
+    score: NotRequired[float]
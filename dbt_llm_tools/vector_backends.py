@@ -0,0 +1,566 @@
+import json
+import os
+import sqlite3
+import tempfile
+from typing import Any, Union
+
+import numpy as np
+
+from dbt_llm_tools.types import ParsedSearchResult
+
+SQLITE_BATCH_SIZE = 500
+MIN_CAPACITY = 64
+MAX_DISTANCE_MATRIX_SIZE = 2**24
+
+
+class VectorBackend:
+    """
+    Base class for the storage backends of a vector store. Every document has an id, a text, a metadata
+    dictionary and an embedding, and nearest neighbours are found by squared euclidean distance.
+
+    Methods:
+        upsert: Insert documents, or replace the documents with the same ids.
+        get: Get documents by id.
+        delete: Delete documents by id.
+        query: Find the nearest neighbours of query embeddings.
+        reset: Delete all the documents.
+        get_client: Get the client of the underlying database.
+    """
+
+    def upsert(
+        self,
+        ids: list[str],
+        documents: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict],
+    ) -> None:
+        """
+        Insert documents, or replace the documents with the same ids.
+
+        Args:
+            ids (list[str]): The ids of the documents.
+            documents (list[str]): The texts of the documents.
+            embeddings (list[list[float]]): The embeddings of the documents.
+            metadatas (list[dict]): The metadata of the documents.
+        """
+        raise NotImplementedError
+
+    def get(self, ids: list[str] = None) -> dict[str, list]:
+        """
+        Get documents by id.
+
+        Args:
+            ids (list[str], optional): The ids of the documents. Defaults to all the documents,
+                while an empty list gets no documents.
+
+        Returns:
+            dict: The "ids", "documents" and "metadatas" of the documents that exist.
+        """
+        raise NotImplementedError
+
+    def delete(self, ids: list[str]) -> None:
+        """
+        Delete documents by id.
+
+        Args:
+            ids (list[str]): The ids of the documents.
+        """
+        raise NotImplementedError
+
+    def query(
+        self, query_embeddings: list[list[float]], n_results: int
+    ) -> list[list[ParsedSearchResult]]:
+        """
+        Find the nearest neighbours of query embeddings.
+
+        Args:
+            query_embeddings (list[list[float]]): The embeddings of the queries.
+            n_results (int): The number of nearest neighbours to be returned per query.
+
+        Returns:
+            list[list[ParsedSearchResult]]: The nearest documents of every query, closest first.
+        """
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        """
+        Delete all the documents.
+        """
+        raise NotImplementedError
+
+    def get_client(self) -> Any:
+        """
+        Get the client of the underlying database.
+
+        Returns:
+            Any: The client, or None if the backend does not use one.
+        """
+        return None
+
+
+class ChromaVectorBackend(VectorBackend):
+    """
+    A vector backend backed by a persistent ChromaDB collection, searched with an HNSW index.
+    """
+
+    def __init__(
+        self,
+        vector_db_path: str,
+        collection_name: str = "model_documentation",
+        distance_fn: str = "l2",
+    ) -> None:
+        """
+        Initializes a ChromaDB vector backend. chromadb is only imported here, because importing it is slow.
+
+        Args:
+            vector_db_path (str): Path to the directory of the persistent database.
+            collection_name (str, optional): The name of the collection. Defaults to "model_documentation".
+            distance_fn (str, optional): The distance function to be used for nearest neighbour search.
+                Defaults to "l2".
+        """
+        import chromadb  # pylint: disable=import-outside-toplevel
+
+        os.makedirs(vector_db_path, exist_ok=True)
+        self.__client = chromadb.PersistentClient(vector_db_path)
+        self.__collection_name = collection_name
+        self.__distance_fn = distance_fn
+        self.__collection = self.__create_collection()
+
+    def __create_collection(self) -> Any:
+        """
+        Create the collection if it does not exist.
+
+        Returns:
+            chromadb.Collection: The collection.
+        """
+        return self.__client.get_or_create_collection(
+            name=self.__collection_name,
+            metadata={"hnsw:space": self.__distance_fn},
+            embedding_function=None,
+        )
+
+    def upsert(
+        self,
+        ids: list[str],
+        documents: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict],
+    ) -> None:
+        self.__collection.upsert(
+            ids=ids, documents=documents, embeddings=embeddings, metadatas=metadatas
+        )
+
+    def get(self, ids: list[str] = None) -> dict[str, list]:
+        if ids is not None and len(ids) == 0:
+            # ChromaDB returns the whole collection for an empty list of ids.
+            return {"ids": [], "documents": [], "metadatas": []}
+
+        stored_documents = self.__collection.get(
+            ids=ids, include=["documents", "metadatas"]
+        )
+
+        return {
+            "ids": stored_documents["ids"],
+            "documents": stored_documents["documents"],
+            "metadatas": stored_documents["metadatas"],
+        }
+
+    def delete(self, ids: list[str]) -> None:
+        if len(ids) > 0:
+            self.__collection.delete(ids=ids)
+
+    def query(
+        self, query_embeddings: list[list[float]], n_results: int
+    ) -> list[list[ParsedSearchResult]]:
+        search_results = self.__collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            include=["documents", "distances", "metadatas"],
+        )
+
+        return [
+            [
+                {
+                    "id": search_results["ids"][index][i],
+                    "metadata": search_results["metadatas"][index][i],
+                    "document": search_results["documents"][index][i],
+                    "distance": search_results["distances"][index][i],
+                }
+                for i in range(len(search_results["ids"][index]))
+            ]
+            for index in range(len(query_embeddings))
+        ]
+
+    def reset(self) -> None:
+        self.__client.delete_collection(self.__collection_name)
+        self.__collection = self.__create_collection()
+
+    def get_client(self) -> Any:
+        return self.__client
+
+
+class NumpyVectorBackend(VectorBackend):  # pylint: disable=too-many-instance-attributes
+    """
+    A vector backend that searches all the embeddings exactly, with one matrix-vector product per query.
+    Embeddings are kept in a float32 .npy file that is memory-mapped, so that opening the backend does not
+    read them, and the texts and metadata of the documents are kept in a SQLite database.
+
+    The embeddings file has spare rows that are filled by later upserts, and doubles in size when it is full,
+    so upserting in batches does not rewrite it every time. Deleted documents are replaced by the last document.
+    Suited to projects of up to tens of thousands of models, with a single writer at a time.
+    """
+
+    def __init__(self, vector_db_path: str) -> None:
+        """
+        Initializes a NumPy vector backend.
+
+        Args:
+            vector_db_path (str): Path to the directory of the embeddings file and the database.
+        """
+        os.makedirs(vector_db_path, exist_ok=True)
+        self.__embeddings_path = os.path.join(vector_db_path, "embeddings.npy")
+        self.__connection = sqlite3.connect(
+            os.path.join(vector_db_path, "documents.sqlite"), check_same_thread=False
+        )
+
+        with self.__connection:
+            self.__connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    id TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    document TEXT,
+                    metadata TEXT,
+                    squared_norm REAL NOT NULL
+                )
+                """
+            )
+
+        self.__data_version = None
+        self.__ids: list[str] = []
+        self.__positions: dict[str, int] = {}
+        self.__squared_norms = np.zeros(0, dtype=np.float32)
+        self.__embeddings: Union[np.memmap, None] = None
+        self.__refresh()
+
+    def __refresh(self) -> None:
+        """
+        Load the ids and squared norms of the documents, and map the embeddings file, unless they were loaded
+        since the last time another connection wrote to the database.
+        """
+        data_version = self.__connection.execute("PRAGMA data_version").fetchone()[0]
+
+        if data_version == self.__data_version:
+            return
+
+        rows = self.__connection.execute(
+            "SELECT id, squared_norm FROM documents ORDER BY position"
+        ).fetchall()
+        self.__ids = [row[0] for row in rows]
+        self.__positions = {
+            model_id: position for position, model_id in enumerate(self.__ids)
+        }
+        self.__embeddings = (
+            np.load(self.__embeddings_path, mmap_mode="r+")
+            if os.path.exists(self.__embeddings_path)
+            else None
+        )
+        capacity = 0 if self.__embeddings is None else self.__embeddings.shape[0]
+        self.__squared_norms = np.zeros(max(capacity, len(rows)), dtype=np.float32)
+        self.__squared_norms[: len(rows)] = [row[1] for row in rows]
+        self.__data_version = data_version
+
+    def __reserve(self, count: int, dimensions: int) -> None:
+        """
+        Make room for a number of embeddings, writing the embeddings to a file twice as large if they do not fit.
+
+        Args:
+            count (int): The number of embeddings that must fit.
+            dimensions (int): The number of dimensions of the embeddings.
+        """
+        if self.__embeddings is not None:
+            if self.__embeddings.shape[1] != dimensions:
+                raise Exception(
+                    f"Expected embeddings with {self.__embeddings.shape[1]} dimensions, got {dimensions}"
+                )
+
+            if count <= self.__embeddings.shape[0]:
+                return
+
+        capacity = 0 if self.__embeddings is None else self.__embeddings.shape[0]
+        capacity = max(count, 2 * capacity, MIN_CAPACITY)
+
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(self.__embeddings_path), suffix=".npy", delete=False
+        ) as f:
+            temporary_path = f.name
+
+        embeddings = np.lib.format.open_memmap(
+            temporary_path, mode="w+", dtype=np.float32, shape=(capacity, dimensions)
+        )
+
+        if self.__embeddings is not None:
+            embeddings[: len(self.__ids)] = self.__embeddings[: len(self.__ids)]
+
+        embeddings.flush()
+        del embeddings
+        os.replace(temporary_path, self.__embeddings_path)
+
+        self.__embeddings = np.load(self.__embeddings_path, mmap_mode="r+")
+        squared_norms = np.zeros(capacity, dtype=np.float32)
+        squared_norms[: len(self.__ids)] = self.__squared_norms[: len(self.__ids)]
+        self.__squared_norms = squared_norms
+
+    def upsert(
+        self,
+        ids: list[str],
+        documents: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict],
+    ) -> None:
+        latest_indexes = {model_id: index for index, model_id in enumerate(ids)}
+        indexes = list(latest_indexes.values())
+
+        if not indexes:
+            return
+
+        vectors = np.asarray([embeddings[index] for index in indexes], dtype=np.float32)
+        squared_norms = np.einsum("ij,ij->i", vectors, vectors)
+
+        self.__refresh()
+        self.__reserve(
+            len(self.__ids) + len(set(latest_indexes) - set(self.__positions)),
+            vectors.shape[1],
+        )
+
+        positions = []
+
+        for model_id in latest_indexes:
+            if model_id not in self.__positions:
+                self.__positions[model_id] = len(self.__ids)
+                self.__ids.append(model_id)
+
+            positions.append(self.__positions[model_id])
+
+        self.__embeddings[positions] = vectors
+        self.__embeddings.flush()
+        self.__squared_norms[positions] = squared_norms
+
+        with self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO documents (id, position, document, metadata, squared_norm) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        ids[index],
+                        position,
+                        documents[index],
+                        json.dumps(metadatas[index]),
+                        float(squared_norm),
+                    )
+                    for index, position, squared_norm in zip(
+                        indexes, positions, squared_norms
+                    )
+                ),
+            )
+
+    def __get_rows(self, ids: list[str]) -> dict[str, tuple[str, dict]]:
+        """
+        Get the texts and metadata of documents from the database.
+
+        Args:
+            ids (list[str]): The ids of the documents.
+
+        Returns:
+            dict: The text and metadata of the documents that exist, keyed by id.
+        """
+        rows = {}
+
+        for start in range(0, len(ids), SQLITE_BATCH_SIZE):
+            end = start + SQLITE_BATCH_SIZE
+            batch = ids[start:end]
+            placeholders = ", ".join(["?"] * len(batch))
+
+            for model_id, document, metadata in self.__connection.execute(
+                f"SELECT id, document, metadata FROM documents WHERE id IN ({placeholders})",
+                batch,
+            ):
+                rows[model_id] = (document, json.loads(metadata))
+
+        return rows
+
+    def get(self, ids: list[str] = None) -> dict[str, list]:
+        self.__refresh()
+
+        ids = [
+            model_id
+            for model_id in (self.__ids if ids is None else ids)
+            if model_id in self.__positions
+        ]
+        rows = self.__get_rows(ids)
+
+        return {
+            "ids": ids,
+            "documents": [rows[model_id][0] for model_id in ids],
+            "metadatas": [rows[model_id][1] for model_id in ids],
+        }
+
+    def delete(self, ids: list[str]) -> None:
+        self.__refresh()
+
+        with self.__connection:
+            for model_id in ids:
+                position = self.__positions.pop(model_id, None)
+
+                if position is None:
+                    continue
+
+                self.__connection.execute(
+                    "DELETE FROM documents WHERE id = ?", (model_id,)
+                )
+                last_id = self.__ids.pop()
+
+                if last_id != model_id:
+                    last_position = len(self.__ids)
+                    self.__embeddings[position] = self.__embeddings[last_position]
+                    self.__squared_norms[position] = self.__squared_norms[last_position]
+                    self.__ids[position] = last_id
+                    self.__positions[last_id] = position
+                    self.__connection.execute(
+                        "UPDATE documents SET position = ? WHERE id = ?",
+                        (position, last_id),
+                    )
+
+            if self.__embeddings is not None:
+                self.__embeddings.flush()
+
+    def __search_batch(
+        self,
+        queries: np.ndarray,
+        embeddings: np.ndarray,
+        squared_norms: np.ndarray,
+        n_results: int,
+    ) -> list[tuple[list[int], list[float]]]:
+        """
+        Find the nearest embeddings of a batch of queries, with one matrix product and a partial sort.
+
+        Args:
+            queries (np.ndarray): The embeddings of the queries.
+            embeddings (np.ndarray): The embeddings of the documents.
+            squared_norms (np.ndarray): The squared norms of the embeddings of the documents.
+            n_results (int): The number of nearest neighbours to be returned per query.
+
+        Returns:
+            list: The positions and the squared euclidean distances of the nearest embeddings of every query,
+            closest first.
+        """
+        distances = (
+            squared_norms[np.newaxis, :]
+            - 2 * (queries @ embeddings.T)
+            + np.einsum("ij,ij->i", queries, queries)[:, np.newaxis]
+        )
+        np.maximum(distances, 0, out=distances)
+
+        if n_results < len(embeddings):
+            candidates = np.argpartition(distances, n_results - 1, axis=1)[
+                :, :n_results
+            ]
+        else:
+            candidates = np.broadcast_to(np.arange(len(embeddings)), distances.shape)
+
+        candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+        order = np.argsort(candidate_distances, axis=1, kind="stable")
+
+        return list(
+            zip(
+                np.take_along_axis(candidates, order, axis=1).tolist(),
+                np.take_along_axis(candidate_distances, order, axis=1).tolist(),
+            )
+        )
+
+    def query(
+        self, query_embeddings: list[list[float]], n_results: int
+    ) -> list[list[ParsedSearchResult]]:
+        self.__refresh()
+
+        count = len(self.__ids)
+        n_results = min(n_results, count)
+
+        if n_results < 1:
+            return [[] for _ in query_embeddings]
+
+        embeddings = np.asarray(self.__embeddings[:count])
+        squared_norms = self.__squared_norms[:count]
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        batch_size = max(1, MAX_DISTANCE_MATRIX_SIZE // count)
+        nearest = []
+
+        for start in range(0, len(queries), batch_size):
+            end = start + batch_size
+            nearest.extend(
+                self.__search_batch(
+                    queries[start:end], embeddings, squared_norms, n_results
+                )
+            )
+
+        rows = self.__get_rows(
+            list(
+                {
+                    self.__ids[position]
+                    for positions, _ in nearest
+                    for position in positions
+                }
+            )
+        )
+
+        return [
+            [
+                {
+                    "id": self.__ids[position],
+                    "metadata": rows[self.__ids[position]][1],
+                    "document": rows[self.__ids[position]][0],
+                    "distance": distance,
+                }
+                for position, distance in zip(positions, distances)
+            ]
+            for positions, distances in nearest
+        ]
+
+    def reset(self) -> None:
+        with self.__connection:
+            self.__connection.execute("DELETE FROM documents")
+
+        self.__embeddings = None
+
+        if os.path.exists(self.__embeddings_path):
+            os.remove(self.__embeddings_path)
+
+        self.__ids = []
+        self.__positions = {}
+        self.__squared_norms = np.zeros(0, dtype=np.float32)
+
+
+def get_vector_backend(
+    vector_db_path: str, storage_backend: Union[str, VectorBackend] = None
+) -> VectorBackend:
+    """
+    Get the vector backend for a database path.
+
+    Args:
+        vector_db_path (str): Path to the directory of the persistent database.
+        storage_backend (str | VectorBackend, optional): "chroma", "numpy" or a vector backend object.
+            Defaults to "chroma".
+
+    Returns:
+        VectorBackend: The vector backend.
+    """
+    if isinstance(storage_backend, VectorBackend):
+        return storage_backend
+
+    if storage_backend is None or storage_backend == "chroma":
+        return ChromaVectorBackend(vector_db_path)
+
+    if storage_backend == "numpy":
+        return NumpyVectorBackend(vector_db_path)
+
+    raise Exception(f"Unknown storage backend: {storage_backend}")
@@ -1,20 +1,76 @@
 import os
+import copy
 import json
-
-import chromadb
-from chromadb.utils import embedding_functions
+from array import array
+from typing import Any, Union
 
 from dbt_llm_tools.dbt_model import DbtModel
+from dbt_llm_tools.embedding_cache import EmbeddingCache, get_text_hash
+from dbt_llm_tools.embedding_pipeline import EmbeddingPipeline
+from dbt_llm_tools.embeddings import (
+    EmbeddingFunction,
+    OpenAIEmbeddingFunction,
+    TracedEmbeddingFunction,
+    get_embedding_cache_id,
+)
+from dbt_llm_tools.lexical_index import BM25Index
+from dbt_llm_tools.query_cache import (
+    QUERY_EMBEDDING_CACHE,
+    LRUCache,
+    bump_collection_version,
+    get_collection_version,
+    normalize_query,
+)
+from dbt_llm_tools.tracing import Span, Tracer, get_tracer
 from dbt_llm_tools.types import ParsedSearchResult
+from dbt_llm_tools.vector_backends import VectorBackend, get_vector_backend
+
+UPSERT_BATCH_SIZE = 5000
+QUERY_BATCH_SIZE = 1000
+HYBRID_CANDIDATE_COUNT = 20
+RRF_K = 60
+QUERY_MODES = ["vector", "hybrid"]
+
+# The lexical indexes of the collections, keyed by collection and version, shared by all the vector stores
+# of the process so that they are built once and then updated with every write.
+LEXICAL_INDEXES = LRUCache(max_size=16)
+
+
+def _fuse_rankings(
+    rankings: list[list[str]], n_results: int
+) -> list[tuple[str, float]]:
+    """
+    Fuse rankings with reciprocal rank fusion, which scores every id with the sum of 1 / (RRF_K + rank)
+    over the rankings it appears in, so that ids ranked well by any ranking come first.
+
+    Args:
+        rankings (list[list[str]]): The ids of every ranking, best first.
+        n_results (int): The number of ids to be returned.
+
+    Returns:
+        list[tuple[str, float]]: The best ids and their fused scores, best first, with ties ordered by id.
+    """
+    scores = {}
 
+    for ranking in rankings:
+        for rank, model_id in enumerate(ranking, start=1):
+            scores[model_id] = scores.get(model_id, 0.0) + 1 / (RRF_K + rank)
 
-class VectorStore:
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:n_results]
+
+
+class VectorStore:  # pylint: disable=too-many-instance-attributes
     """
     A class representing a vector store for dbt models.
 
     Methods:
         get_client: Returns the client object for the vector store.
         upsert_models: Upsert the models into the vector store.
+        sync: Upsert the new and changed models and delete the models that are gone.
+        delete_models: Delete models from the vector store.
+        get_models: Get the models from the vector store.
+        query_collection: Query the collection for the k nearest neighbours to the query.
+        query_collection_many: Query the collection for the k nearest neighbours to each of many queries.
         reset_collection: Clear the collection of all documents.
     """
 
@@ -24,6 +80,15 @@ class VectorStore:
         embedding_model_name: str = "text-embedding-3-large",
         vector_db_path: str = ".local_storage/chroma.db",
         test_mode: bool = False,
+        embedding_fn: EmbeddingFunction = None,
+        *,
+        tracer: Tracer = None,
+        embedding_cache_path: str = None,
+        api_base: str = None,
+        embedding_pipeline: EmbeddingPipeline = None,
+        query_embedding_cache: LRUCache = None,
+        result_cache: LRUCache = None,
+        storage_backend: Union[str, VectorBackend] = None,
     ) -> None:
         """
         Initializes a vector store for dbt models.
@@ -33,25 +98,66 @@ class VectorStore:
             embedding_model_name (str, optional): The name of the OpenAI embedding model to be used.
             db_persist_path (str, optional): The path to the persistent database file. Defaults to "./chroma.db".
             test_mode (bool, optional): Whether the vector store is being used in test mode. Defaults to False.
+            embedding_fn (EmbeddingFunction, optional): An embedding function to use instead of the OpenAI
+                embedding model, e.g. a HashEmbeddingFunction for tests and benchmarks that run offline.
+            tracer (Tracer, optional): The tracer that records the time spent embedding, upserting and querying.
+                Defaults to the tracer returned by get_tracer().
+            embedding_cache_path (str, optional): Path to the SQLite file that caches the embeddings of upserted
+                models by embedding model and text hash, which can be shared by several vector stores.
+                Defaults to an "embedding_cache.sqlite" file next to the persistent database. Embeddings are
+                cached under the cache id of the embedding function, see get_embedding_cache_id.
+            api_base (str, optional): The base URL of the OpenAI compatible embeddings API, e.g. a local server.
+                Defaults to the OpenAI API.
+            embedding_pipeline (EmbeddingPipeline, optional): The pipeline that batches, parallelizes and retries
+                the embedding calls. Defaults to an EmbeddingPipeline with its default limits.
+            query_embedding_cache (LRUCache, optional): The in-memory cache of query embeddings, keyed by
+                the cache id of the embedding function and normalized query. Defaults to a cache of 1024
+                queries that expire after an hour, shared by all the vector stores of the process.
+            result_cache (LRUCache, optional): An in-memory cache of query results, keyed by query embedding,
+                number of results and collection version, so that repeated queries skip the nearest neighbour
+                search. Every write to the collection through a vector store of this process invalidates it.
+                Defaults to no result cache.
+            storage_backend (str | VectorBackend, optional): Where the documents and embeddings are stored:
+                "chroma" for a ChromaDB collection, "numpy" for a memory-mapped NumPy file searched exactly,
+                which starts faster and does not import chromadb, or a custom VectorBackend object.
+                Defaults to "chroma".
         """
         if not isinstance(vector_db_path, str) or vector_db_path == "":
             raise Exception("Please provide a valid path for the persistent database.")
 
-        os.makedirs(vector_db_path, exist_ok=True)
-        self.__client = chromadb.PersistentClient(vector_db_path)
-        self.__collection_name = "model_documentation"
+        self.__collection_key = (os.path.abspath(vector_db_path), "model_documentation")
 
         self.__openai_api_key = openai_api_key
+        self.__api_base = api_base
+        self.__tracer = tracer or get_tracer()
+        self.__embedding_pipeline = embedding_pipeline or EmbeddingPipeline()
+        self.__query_embedding_cache = (
+            query_embedding_cache
+            if query_embedding_cache is not None
+            else QUERY_EMBEDDING_CACHE
+        )
+        self.__result_cache = result_cache
 
-        self.__embedding_fn = self.__get_embedding_fn(
-            embedding_model_name, test_mode=test_mode
+        self.__embedding_fn = TracedEmbeddingFunction(
+            embedding_fn
+            or self.__get_embedding_fn(embedding_model_name, test_mode=test_mode),
+            self.__tracer,
         )
+        self.__embedding_cache_id = get_embedding_cache_id(self.__embedding_fn)
+
+        if embedding_cache_path is None:
+            embedding_cache_path = os.path.join(
+                os.path.dirname(os.path.normpath(vector_db_path)),
+                "embedding_cache.sqlite",
+            )
+        os.makedirs(os.path.dirname(embedding_cache_path) or ".", exist_ok=True)
+        self.__embedding_cache = EmbeddingCache(embedding_cache_path)
 
-        self.__collection = self.__create_collection()
+        self.__backend = get_vector_backend(vector_db_path, storage_backend)
 
     def __get_embedding_fn(
         self, embedding_model_name: str, test_mode: bool = False
-    ) -> embedding_functions.OpenAIEmbeddingFunction:
+    ) -> EmbeddingFunction:
         """
         Get the embedding function for the vector store.
 
@@ -60,31 +166,398 @@ class VectorStore:
             test_mode (bool, optional): Whether the vector store is being used in test mode. Defaults to False.
 
         Returns:
-            embedding_functions.OpenAIEmbeddingFunction: The embedding function for the vector store.
+            EmbeddingFunction: The embedding function for the vector store.
         """
         if test_mode:
+            from chromadb.utils import (  # pylint: disable=import-outside-toplevel
+                embedding_functions,
+            )
+
             return embedding_functions.DefaultEmbeddingFunction()
 
-        return embedding_functions.OpenAIEmbeddingFunction(
-            api_key=self.__openai_api_key, model_name=embedding_model_name
+        return OpenAIEmbeddingFunction(
+            api_key=self.__openai_api_key,
+            model_name=embedding_model_name,
+            api_base=self.__api_base,
+        )
+
+    def __get_documents(self, models: list[DbtModel]) -> dict[str, tuple[str, dict]]:
+        """
+        Get the documents and metadata that represent models in the collection.
+
+        Args:
+            models (list[DbtModel]): The dbt model objects.
+
+        Returns:
+            dict: The prompt text and metadata of every model, keyed by model name. The metadata holds the
+            tags of the model and a hash of the whole content, which tells whether a stored document is outdated.
+        """
+        documents = {}
+
+        for model in models:
+            if not isinstance(model, DbtModel):
+                raise Exception("Please provide a list of valid dbt model objects.")
+
+            model_text = model.as_prompt_text()
+            tags = json.dumps(model.tags)
+
+            documents[model.name] = (
+                model_text,
+                {
+                    "tags": tags,
+                    "content_hash": get_text_hash(f"{tags}\n{model_text}"),
+                },
+            )
+
+        return documents
+
+    def __upsert_documents(
+        self, documents: dict[str, tuple[str, dict]], span: Span
+    ) -> None:
+        """
+        Embed and upsert documents into the collection. Documents whose embedding is in the embedding cache
+        are upserted first, then the other documents are upserted batch by batch as soon as the embedding
+        pipeline has embedded them.
+
+        Args:
+            documents (dict): The prompt text and metadata of every model, keyed by model name.
+            span (Span): The span that the number of upserted models, embeddings and batches is added to.
+        """
+        ids = list(documents)
+        model_texts = [model_text for model_text, _ in documents.values()]
+        text_hashes = [get_text_hash(model_text) for model_text in model_texts]
+        cached_embeddings = self.__embedding_cache.get_many(
+            self.__embedding_cache_id, text_hashes
         )
+        missing_positions = [
+            position
+            for position, text_hash in enumerate(text_hashes)
+            if text_hash not in cached_embeddings
+        ]
+
+        def upsert(positions: list[int], embeddings: list[list[float]]) -> None:
+            self.__backend.upsert(
+                documents=[model_texts[position] for position in positions],
+                embeddings=embeddings,
+                metadatas=[documents[ids[position]][1] for position in positions],
+                ids=[ids[position] for position in positions],
+            )
+            self.__record_write(
+                upserted_documents={
+                    ids[position]: model_texts[position] for position in positions
+                }
+            )
+
+        def on_batch(batch: list[int], embeddings: list[list[float]]) -> None:
+            positions = [missing_positions[position] for position in batch]
+            self.__embedding_cache.put_many(
+                self.__embedding_cache_id,
+                {
+                    text_hashes[position]: embedding
+                    for position, embedding in zip(positions, embeddings)
+                },
+            )
+            upsert(positions, embeddings)
+
+        cached_positions = [
+            position
+            for position, text_hash in enumerate(text_hashes)
+            if text_hash in cached_embeddings
+        ]
+
+        for start in range(0, len(cached_positions), UPSERT_BATCH_SIZE):
+            end = start + UPSERT_BATCH_SIZE
+            positions = cached_positions[start:end]
+            upsert(
+                positions,
+                [cached_embeddings[text_hashes[position]] for position in positions],
+            )
+
+        if missing_positions:
+            pipeline_counts = self.__embedding_pipeline.run(
+                self.__embedding_fn,
+                [model_texts[position] for position in missing_positions],
+                on_batch,
+            )
+            span.add_count("embedding_batches", pipeline_counts["batches"])
+            span.add_count("embedding_retries", pipeline_counts["retries"])
 
-    def __create_collection(self, distance_fn: str = "l2") -> chromadb.Collection:
+        span.add_count("models", len(ids))
+        span.add_count("cached_embeddings", len(cached_positions))
+        span.add_count("computed_embeddings", len(missing_positions))
+
+    def __record_write(
+        self, upserted_documents: dict[str, str] = None, deleted_ids: list[str] = None
+    ) -> None:
         """
-        Create a new collection in the vector store.
+        Give the collection a new version after a write, so that the results cached for the previous version
+        are not used anymore, and apply the write to the lexical index of the collection if it was built.
+        The lexical index is dropped when the collection is reset, and rebuilt when it is next needed.
 
         Args:
-            distance_fn (str, optional): The distance function to be used for nearest neighbour search.
-                Defaults to "l2".
+            upserted_documents (dict, optional): The texts of the upserted documents, keyed by model name.
+            deleted_ids (list[str], optional): The ids of the deleted documents.
+        """
+        lexical_index = LEXICAL_INDEXES.get(
+            (self.__collection_key, get_collection_version(self.__collection_key))
+        )
+        bump_collection_version(self.__collection_key)
+
+        if lexical_index is None or (
+            upserted_documents is None and deleted_ids is None
+        ):
+            return
+
+        lexical_index.add_many(
+            list(upserted_documents or {}), list((upserted_documents or {}).values())
+        )
+        lexical_index.remove_many(deleted_ids or [])
+        LEXICAL_INDEXES.put(
+            (self.__collection_key, get_collection_version(self.__collection_key)),
+            lexical_index,
+        )
+
+    def __get_lexical_index(self) -> BM25Index:
+        """
+        Get the lexical index of the collection, building it from the stored documents if needed.
 
         Returns:
-            chromadb.Collection: The newly created collection.
+            BM25Index: The lexical index of the current version of the collection.
         """
-        return self.__client.get_or_create_collection(
-            name=self.__collection_name,
-            metadata={"hnsw:space": distance_fn},
-            embedding_function=self.__embedding_fn,
+        index_key = (
+            self.__collection_key,
+            get_collection_version(self.__collection_key),
         )
+        lexical_index = LEXICAL_INDEXES.get(index_key)
+
+        if lexical_index is None:
+            stored_documents = self.__backend.get()
+            lexical_index = BM25Index()
+            lexical_index.add_many(
+                stored_documents["ids"], stored_documents["documents"]
+            )
+            LEXICAL_INDEXES.put(index_key, lexical_index)
+
+        return lexical_index
+
+    def __fuse(
+        self,
+        queries: list[str],
+        vector_results: list[list[ParsedSearchResult]],
+        n_results: int,
+    ) -> list[list[ParsedSearchResult]]:
+        """
+        Fuse the vector search results of queries with the results of the lexical index by reciprocal rank fusion.
+
+        Args:
+            queries (list[str]): The queries.
+            vector_results (list[list[ParsedSearchResult]]): The vector search results of every query.
+            n_results (int): The number of results to be returned per query.
+
+        Returns:
+            list[list[ParsedSearchResult]]: The fused results of every query, with their fusion "score".
+            Models that were only found by the lexical index have no "distance".
+        """
+        lexical_index = self.__get_lexical_index()
+        fused_rankings = []
+        known_results = {}
+
+        for query, results in zip(queries, vector_results):
+            known_results.update((result["id"], result) for result in results)
+            lexical_results = lexical_index.search(
+                query, max(n_results, HYBRID_CANDIDATE_COUNT)
+            )
+            fused_rankings.append(
+                _fuse_rankings(
+                    [
+                        [result["id"] for result in results],
+                        [model_id for model_id, _ in lexical_results],
+                    ],
+                    n_results,
+                )
+            )
+
+        missing_ids = list(
+            {
+                model_id
+                for ranking in fused_rankings
+                for model_id, _ in ranking
+                if model_id not in known_results
+            }
+        )
+
+        if missing_ids:
+            stored_documents = self.__backend.get(missing_ids)
+
+            for model_id, document, metadata in zip(
+                stored_documents["ids"],
+                stored_documents["documents"],
+                stored_documents["metadatas"],
+            ):
+                known_results.setdefault(
+                    model_id,
+                    {
+                        "id": model_id,
+                        "metadata": metadata,
+                        "document": document,
+                        "distance": None,
+                    },
+                )
+
+        return [
+            [
+                {**known_results[model_id], "score": score}
+                for model_id, score in ranking
+                if model_id in known_results
+            ]
+            for ranking in fused_rankings
+        ]
+
+    def __query(
+        self, queries: list[str], n_results: int, mode: str, span_name: str
+    ) -> list[list[ParsedSearchResult]]:
+        """
+        Search the collection for queries, by embedding distance or with hybrid retrieval.
+
+        Args:
+            queries (list[str]): The queries.
+            n_results (int): The number of results to be returned per query.
+            mode (str): "vector" or "hybrid".
+            span_name (str): The name of the span that records the search.
+
+        Returns:
+            list[list[ParsedSearchResult]]: The parsed search results of every query.
+        """
+        if mode not in QUERY_MODES:
+            raise Exception(f"Unknown query mode: {mode}")
+
+        with self.__tracer.span(span_name, n_results=n_results, mode=mode) as span:
+            span.add_count("queries", len(queries))
+            query_embeddings = self.__get_query_embeddings(queries, span)
+
+            if mode == "vector":
+                return self.__search(query_embeddings, n_results, span)
+
+            return self.__fuse(
+                queries,
+                self.__search(
+                    query_embeddings, max(n_results, HYBRID_CANDIDATE_COUNT), span
+                ),
+                n_results,
+            )
+
+    def __get_query_embeddings(
+        self, queries: list[str], span: Span
+    ) -> list[list[float]]:
+        """
+        Get the embeddings of queries from the query embedding cache, and embed the other queries in batches.
+
+        Args:
+            queries (list[str]): The queries.
+            span (Span): The span that query embedding cache hits and embedding batches are counted on.
+
+        Returns:
+            list[list[float]]: The embedding of every query.
+        """
+        cache_keys = [
+            (self.__embedding_cache_id, normalize_query(query)) for query in queries
+        ]
+        query_embeddings = {}
+        missing_queries = {}
+
+        for query, cache_key in zip(queries, cache_keys):
+            if cache_key in query_embeddings or cache_key in missing_queries:
+                continue
+
+            query_embedding = self.__query_embedding_cache.get(cache_key)
+
+            if query_embedding is None:
+                missing_queries[cache_key] = query
+            else:
+                query_embeddings[cache_key] = query_embedding
+                span.add_count("query_embedding_cache_hits")
+
+        missing_keys = list(missing_queries)
+
+        def on_batch(batch: list[int], embeddings: list[list[float]]) -> None:
+            for position, embedding in zip(batch, embeddings):
+                cache_key = missing_keys[position]
+                query_embeddings[cache_key] = [float(value) for value in embedding]
+                self.__query_embedding_cache.put(cache_key, query_embeddings[cache_key])
+
+        if len(missing_keys) == 1:
+            on_batch(
+                [0],
+                self.__embedding_pipeline.embed(
+                    self.__embedding_fn, list(missing_queries.values())
+                ),
+            )
+        elif missing_keys:
+            pipeline_counts = self.__embedding_pipeline.run(
+                self.__embedding_fn, list(missing_queries.values()), on_batch
+            )
+            span.add_count("embedding_batches", pipeline_counts["batches"])
+            span.add_count("embedding_retries", pipeline_counts["retries"])
+
+        return [query_embeddings[cache_key] for cache_key in cache_keys]
+
+    def __search(
+        self, query_embeddings: list[list[float]], n_results: int, span: Span
+    ) -> list[list[ParsedSearchResult]]:
+        """
+        Find the nearest neighbours of query embeddings, taking the results from the result cache when possible
+        and searching the collection once per batch of QUERY_BATCH_SIZE embeddings otherwise.
+
+        Args:
+            query_embeddings (list[list[float]]): The embeddings of the queries.
+            n_results (int): The number of nearest neighbours to be returned per query.
+            span (Span): The span that result cache hits and searches are counted on.
+
+        Returns:
+            list[list[ParsedSearchResult]]: The parsed search results of every query.
+        """
+        result_keys = [
+            (
+                self.__collection_key,
+                get_collection_version(self.__collection_key),
+                array("f", query_embedding).tobytes(),
+                n_results,
+            )
+            for query_embedding in query_embeddings
+        ]
+        closest_models = [None] * len(query_embeddings)
+
+        if self.__result_cache is not None:
+            for position, result_key in enumerate(result_keys):
+                cached_results = self.__result_cache.get(result_key)
+
+                if cached_results is not None:
+                    closest_models[position] = copy.deepcopy(cached_results)
+                    span.add_count("result_cache_hits")
+
+        missing_positions = [
+            position
+            for position, results in enumerate(closest_models)
+            if results is None
+        ]
+
+        for start in range(0, len(missing_positions), QUERY_BATCH_SIZE):
+            end = start + QUERY_BATCH_SIZE
+            positions = missing_positions[start:end]
+            search_results = self.__backend.query(
+                [query_embeddings[position] for position in positions], n_results
+            )
+            span.add_count("searches")
+
+            for position, results in zip(positions, search_results):
+                closest_models[position] = results
+
+                if self.__result_cache is not None:
+                    self.__result_cache.put(
+                        result_keys[position], copy.deepcopy(closest_models[position])
+                    )
+
+        return closest_models
 
     def set_embedding_fn(self, embedding_model_name: str) -> None:
         """
@@ -93,23 +566,28 @@ class VectorStore:
         Args:
             embedding_model_name (str): The name of the OpenAI embedding model to be used.
         """
-        self.__embedding_fn = self.__get_embedding_fn(embedding_model_name)
+        self.__embedding_fn = TracedEmbeddingFunction(
+            self.__get_embedding_fn(embedding_model_name), self.__tracer
+        )
+        self.__embedding_cache_id = get_embedding_cache_id(self.__embedding_fn)
 
-    def get_client(self) -> chromadb.PersistentClient:
+    def get_client(self) -> Any:
         """
         Returns the client object for the vector store.
 
         Returns:
-            chromadb.PersistentClient: The client object for the vector store.
+            chromadb.PersistentClient: The client object for the vector store, or None if the storage backend
+            does not use a client.
         """
-        return self.__client
+        return self.__backend.get_client()
 
     def upsert_models(
         self,
         models: list[DbtModel],
     ) -> None:
         """
-        Upsert the models into the vector store.
+        Upsert the models into the vector store. Models whose text was embedded before with the same embedding
+        model reuse the embedding from the embedding cache instead of calling the embedding function.
 
         Args:
             models (list[DbtModel]): A list of dbt model objects to be upserted into the vector store.
@@ -117,27 +595,77 @@ class VectorStore:
         Returns:
             None
         """
-        documents = []
-        metadatas = []
-        ids = []
+        documents = self.__get_documents(models)
 
-        for model in models:
-            if not isinstance(model, DbtModel):
-                raise Exception("Please provide a list of valid dbt model objects.")
+        with self.__tracer.span("vector_store.upsert_models") as span:
+            return self.__upsert_documents(documents, span)
 
-            model_text = model.as_prompt_text()
+    def sync(
+        self, models: list[DbtModel], *, delete_missing: bool = True
+    ) -> dict[str, int]:
+        """
+        Make the vector store hold exactly the given models. The content hash stored with every document is
+        compared with the incoming models, so that only new and changed models are embedded and upserted,
+        and the models that are not given anymore are deleted in a single call.
 
-            documents.append(model_text)
-            metadatas.append(
-                {
-                    "tags": json.dumps(model.tags),
-                }
-            )
-            ids.append(model.name)
+        Args:
+            models (list[DbtModel]): The dbt model objects that the vector store should hold.
+            delete_missing (bool, optional): Whether to delete the stored models that are not given.
+                Set it to False to only add and update models, e.g. when loading a selection of the project.
+                Defaults to True.
 
-        return self.__collection.upsert(
-            documents=documents, metadatas=metadatas, ids=ids
-        )
+        Returns:
+            dict: The number of models that were "added", "updated", "unchanged" and "deleted".
+        """
+        documents = self.__get_documents(models)
+
+        with self.__tracer.span("vector_store.sync") as span:
+            stored_documents = self.__backend.get()
+            stored_hashes = {
+                model_id: (metadata or {}).get("content_hash")
+                for model_id, metadata in zip(
+                    stored_documents["ids"], stored_documents["metadatas"]
+                )
+            }
+            changed_documents = {
+                model_id: document
+                for model_id, document in documents.items()
+                if stored_hashes.get(model_id) != document[1]["content_hash"]
+            }
+            deleted_ids = [
+                model_id
+                for model_id in stored_hashes
+                if delete_missing and model_id not in documents
+            ]
+
+            if changed_documents:
+                self.__upsert_documents(changed_documents, span)
+            self.delete_models(deleted_ids)
+
+            added_count = len(set(changed_documents) - set(stored_hashes))
+            counts = {
+                "added": added_count,
+                "updated": len(changed_documents) - added_count,
+                "unchanged": len(documents) - len(changed_documents),
+                "deleted": len(deleted_ids),
+            }
+            span.counts.update(counts)
+
+        return counts
+
+    def delete_models(self, model_ids: list[str]) -> None:
+        """
+        Delete models from the vector store.
+
+        Args:
+            model_ids (list[str]): The ids of the models to be deleted.
+
+        Returns:
+            None
+        """
+        if len(model_ids) > 0:
+            self.__backend.delete(model_ids)
+            self.__record_write(deleted_ids=model_ids)
 
     def get_models(self, model_ids: list[str] = None) -> list[DbtModel]:
         """
@@ -150,7 +678,7 @@ class VectorStore:
             list[DbtModel]: A list of dbt model objects retrieved from the vector store.
         """
         models = []
-        raw_models = self.__collection.get(ids=model_ids)
+        raw_models = self.__backend.get(model_ids)
 
         for i in range(len(raw_models["ids"])):
             models.append(
@@ -163,7 +691,7 @@ class VectorStore:
         return models
 
     def query_collection(
-        self, query: str, n_results: int = 3
+        self, query: str, n_results: int = 3, mode: str = "vector"
     ) -> list[ParsedSearchResult]:
         """
         Query the collection for the k nearest neighbours to the query.
@@ -171,32 +699,49 @@ class VectorStore:
         Args:
             query (str): The query to be used for nearest neighbour search.
             n_results (int, optional): The number of nearest neighbours to be returned. Defaults to 3.
+            mode (str, optional): "vector" to rank the models by embedding distance, or "hybrid" to fuse that
+                ranking with a BM25 ranking of the words of the models, which finds exact model and column
+                names that the embeddings miss. Defaults to "vector".
 
         Returns:
             list[ParsedSearchResult]: A list of parsed search results.
         """
-        closest_models = []
-
         if not isinstance(query, str) or query == "":
             raise Exception("Please provide a valid query.")
 
-        search_results = self.__collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            include=["documents", "distances", "metadatas"],
+        search_results = self.__query(
+            [query], n_results, mode, "vector_store.query_collection"
         )
 
-        for i in range(len(search_results["ids"][0])):
-            closest_models.append(
-                {
-                    "id": search_results["ids"][0][i],
-                    "metadata": search_results["metadatas"][0][i],
-                    "document": search_results["documents"][0][i],
-                    "distance": search_results["distances"][0][i],
-                }
-            )
+        return search_results[0]
 
-        return closest_models
+    def query_collection_many(
+        self, queries: list[str], n_results: int = 3, mode: str = "vector"
+    ) -> list[list[ParsedSearchResult]]:
+        """
+        Query the collection for the k nearest neighbours to each of many queries. The queries are embedded
+        in batches by the embedding pipeline and searched with one collection query per batch, which is much
+        faster than calling query_collection for every query.
+
+        Args:
+            queries (list[str]): The queries to be used for nearest neighbour search.
+            n_results (int, optional): The number of nearest neighbours to be returned per query. Defaults to 3.
+            mode (str, optional): "vector" or "hybrid", as in query_collection. Defaults to "vector".
+
+        Returns:
+            list[list[ParsedSearchResult]]: A list of parsed search results for every query, in the same order.
+        """
+        if not isinstance(queries, list) or any(
+            not isinstance(query, str) or query == "" for query in queries
+        ):
+            raise Exception("Please provide a list of valid queries.")
+
+        if not queries:
+            return []
+
+        return self.__query(
+            queries, n_results, mode, "vector_store.query_collection_many"
+        )
 
     def reset_collection(self) -> None:
         """
@@ -205,5 +750,5 @@ class VectorStore:
         Returns:
             None
         """
-        self.__client.delete_collection(self.__collection_name)
-        self.__collection = self.__create_collection()
+        self.__backend.reset()
+        self.__record_write()
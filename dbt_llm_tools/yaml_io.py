@@ -0,0 +1,154 @@
+import json
+import os
+import tempfile
+from typing import Any, Union
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover - depends on how PyYAML was built
+    from yaml import SafeDumper, SafeLoader
+
+
+class DbtYamlDumper(yaml.SafeDumper):  # pylint: disable=too-many-ancestors
+    """
+    A custom yaml dumper that indents the yaml output like dbt does.
+
+    This dumper is always pure Python, since the libyaml emitter cannot indent block sequences.
+    """
+
+    def increase_indent(self, flow=False, indentless=False):
+        return super().increase_indent(flow, False)
+
+
+def load_yaml(stream) -> Any:
+    """
+    Load a yaml document with the libyaml based loader when it is available.
+
+    Args:
+        stream (str | file): The yaml document or an open file containing it.
+
+    Returns:
+        Any: The parsed yaml document.
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def dump_yaml(
+    data: Any, stream=None, dbt_style: bool = False, **kwargs
+) -> Union[str, None]:
+    """
+    Dump data to yaml with the libyaml based dumper when it is available.
+
+    Args:
+        data (Any): The data to dump.
+        stream (file, optional): An open file to write to. Returns the yaml as a string if not given.
+        dbt_style (bool, optional): Whether to indent lists the way dbt does. Defaults to False.
+        **kwargs: Any other arguments accepted by yaml.dump.
+
+    Returns:
+        str: The yaml document if no stream was given.
+    """
+    return yaml.dump(
+        data, stream, Dumper=DbtYamlDumper if dbt_style else SafeDumper, **kwargs
+    )
+
+
+class YamlCache:
+    """
+    An on-disk cache of parsed yaml documents, keyed by the hash of their contents.
+
+    Methods:
+        load: Load a yaml document, using the cached result if the same contents were parsed before.
+        prune: Remove the cached documents of the contents that are not in use anymore.
+    """
+
+    def __init__(self, cache_path: str) -> None:
+        """
+        Initializes a yaml cache.
+
+        Args:
+            cache_path (str): Path to the folder that stores the cached documents.
+        """
+        self.cache_path = cache_path
+        os.makedirs(cache_path, exist_ok=True)
+
+    def __get_cache_file(self, content_hash: str) -> str:
+        """
+        Get the path of the cache file for a content hash.
+
+        Args:
+            content_hash (str): The hash of the yaml contents.
+
+        Returns:
+            str: The path of the cache file.
+        """
+        return os.path.join(self.cache_path, f"{content_hash}.json")
+
+    def load(self, yaml_contents: str, content_hash: str) -> Any:
+        """
+        Load a yaml document, using the cached result if the same contents were parsed before.
+        Documents that do not survive a round trip through JSON are parsed every time.
+
+        Args:
+            yaml_contents (str): The contents of the yaml file.
+            content_hash (str): The hash of the yaml contents.
+
+        Returns:
+            Any: The parsed yaml document.
+        """
+        cache_file = self.__get_cache_file(content_hash)
+
+        try:
+            with open(cache_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        parsed_yaml = load_yaml(yaml_contents)
+
+        try:
+            serialized = json.dumps(parsed_yaml)
+        except (TypeError, ValueError):
+            return parsed_yaml
+
+        if json.loads(serialized) != parsed_yaml:
+            return parsed_yaml
+
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.cache_path, delete=False
+        ) as f:
+            f.write(serialized)
+
+        os.replace(f.name, cache_file)
+
+        return parsed_yaml
+
+    def prune(self, content_hashes: set[str]) -> int:
+        """
+        Remove the cached documents of the contents that are not in use anymore, e.g. of yaml files
+        that were changed or deleted since they were cached.
+
+        Args:
+            content_hashes (set[str]): The hashes of the contents whose documents are kept.
+
+        Returns:
+            int: The number of removed documents.
+        """
+        removed_count = 0
+
+        for file_name in os.listdir(self.cache_path):
+            content_hash, extension = os.path.splitext(file_name)
+
+            if extension != ".json" or content_hash in content_hashes:
+                continue
+
+            try:
+                os.remove(os.path.join(self.cache_path, file_name))
+                removed_count += 1
+            except FileNotFoundError:
+                pass
+
+        return removed_count
@@ -0,0 +1,3 @@
+select *
+from {{ ref('customers') }}
+join {{ ref('orders') }} using (customer_id)
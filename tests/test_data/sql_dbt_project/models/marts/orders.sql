@@ -0,0 +1 @@
+select * from {{ ref('stg_orders') }}
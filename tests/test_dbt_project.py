@@ -1,11 +1,16 @@
 import os
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 
-from dbt_llm_tools import DbtProject
+from dbt_llm_tools import DbtProject, TinyDbDirectoryStore
 
 HERE = os.path.abspath(os.path.dirname(__file__))
 VALID_PROJECT_PATH = os.path.join(HERE, "test_data/valid_dbt_project")
+# A stored directory of the models documented in VALID_PROJECT_PATH, which tests copy before using.
 DATABASE_PATH = os.path.join(HERE, "test_data/directory.json")
+SQL_PROJECT_PATH = os.path.join(HERE, "test_data/sql_dbt_project")
 
 
 class DbtProjectTestCase(unittest.TestCase):
@@ -24,10 +29,11 @@ class DbtProjectTestCase(unittest.TestCase):
         """
         Test for the case when the class is constructed with a valid project root.
         """
-        project = DbtProject(
-            VALID_PROJECT_PATH,
-            database_path=DATABASE_PATH,
-        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project = DbtProject(
+                VALID_PROJECT_PATH,
+                database_path=os.path.join(tmp_dir, "directory.json"),
+            )
 
         self.assertIsInstance(project, DbtProject)
 
@@ -35,13 +41,12 @@ class DbtProjectTestCase(unittest.TestCase):
         """
         Test for the case when we want to get all the models in the project.
         """
-        project = DbtProject(
-            VALID_PROJECT_PATH,
-            database_path=DATABASE_PATH,
-        )
-        project.parse()
-
-        models = project.get_models()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project = DbtProject(
+                VALID_PROJECT_PATH,
+                database_path=shutil.copy(DATABASE_PATH, tmp_dir),
+            )
+            models = project.get_models()
 
         self.assertEqual(len(models), 5)
 
@@ -49,15 +54,14 @@ class DbtProjectTestCase(unittest.TestCase):
         """
         Test for the case when we want to get all the models in one/many specific folder(s).
         """
-        project = DbtProject(
-            VALID_PROJECT_PATH,
-            database_path=DATABASE_PATH,
-        )
-        project.parse()
-
-        models = project.get_models(
-            included_folders=["models/staging", "models/intermediate"]
-        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project = DbtProject(
+                VALID_PROJECT_PATH,
+                database_path=shutil.copy(DATABASE_PATH, tmp_dir),
+            )
+            models = project.get_models(
+                included_folders=["models/staging", "models/intermediate"]
+            )
 
         self.assertEqual(len(models), 3)
 
@@ -73,13 +77,12 @@ class DbtProjectTestCase(unittest.TestCase):
         Test for the case when we want to get all the models in the project,
         except for those in one/many specific folder(s).
         """
-        project = DbtProject(
-            VALID_PROJECT_PATH,
-            database_path=DATABASE_PATH,
-        )
-        project.parse()
-
-        models = project.get_models(excluded_folders=["models/intermediate"])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project = DbtProject(
+                VALID_PROJECT_PATH,
+                database_path=shutil.copy(DATABASE_PATH, tmp_dir),
+            )
+            models = project.get_models(excluded_folders=["models/intermediate"])
 
         self.assertEqual(len(models), 4)
         # for _, model in enumerate(models):
@@ -89,17 +92,512 @@ class DbtProjectTestCase(unittest.TestCase):
         """
         Test for the case when we want to get only specific models by name.
         """
-        project = DbtProject(
-            VALID_PROJECT_PATH,
-            database_path=DATABASE_PATH,
-        )
-        project.parse()
-        models = project.get_models(models=["staging_1", "staging_2"])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project = DbtProject(
+                VALID_PROJECT_PATH,
+                database_path=shutil.copy(DATABASE_PATH, tmp_dir),
+            )
+            models = project.get_models(models=["staging_1", "staging_2"])
 
         self.assertEqual(len(models), 2)
         self.assertEqual(models[0]["name"], "staging_1")
         self.assertEqual(models[1]["name"], "staging_2")
 
+    def test_parse_resolves_transitive_dependencies(self):
+        """
+        Test for the case when models depend on each other through several levels of refs.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project = DbtProject(
+                SQL_PROJECT_PATH,
+                database_path=os.path.join(tmp_dir, "directory.json"),
+            )
+            directory = project.parse()
+
+        models = directory["models"]
+
+        self.assertEqual(models["customers"]["refs"], ["stg_customers", "stg_orders"])
+        self.assertEqual(models["stg_orders"]["deps"], [])
+        self.assertEqual(
+            set(models["customer_orders"]["deps"]),
+            {"customers", "orders", "stg_customers", "stg_orders"},
+        )
+        self.assertLess(
+            models["customer_orders"]["deps"].index("stg_orders"),
+            models["customer_orders"]["deps"].index("orders"),
+        )
+
+    def test_parse_resolves_aliases_and_duplicate_names(self):
+        """
+        Test for the case when refs point to a model alias and two folders define the same model name.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files = {
+                "dbt_project.yml": 'name: "aliased"\nmodel-paths: ["models", "other_models"]\n',
+                "models/base.sql": "{{ config(alias='base_alias') }}\nselect 1",
+                "models/child.sql": "select * from {{ ref('base_alias') }}",
+                "other_models/child.sql": "select 2",
+            }
+            for file_name, contents in files.items():
+                os.makedirs(
+                    os.path.dirname(os.path.join(tmp_dir, file_name)), exist_ok=True
+                )
+                with open(os.path.join(tmp_dir, file_name), "w", encoding="utf-8") as f:
+                    f.write(contents)
+
+            project = DbtProject(
+                tmp_dir, database_path=os.path.join(tmp_dir, "directory.json")
+            )
+            models = project.parse()["models"]
+
+        self.assertEqual(models["child"]["refs"], ["base"])
+        self.assertEqual(models["child"]["deps"], ["base"])
+        self.assertTrue(models["child"]["absolute_path"].endswith("models/child.sql"))
+        self.assertNotIn("other_models", models["child"]["absolute_path"])
+
+    def test_parse_namespaces_installed_packages(self):
+        """
+        Test for the case when models ref the models of a package installed in dbt_packages.
+        Packages are parsed again when their files change, even if their version does not.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files = {
+                "dbt_project.yml": 'name: "shop"\n',
+                "models/orders.sql": "select * from {{ ref('utils', 'calendar') }}, {{ ref('dates') }}",
+                "models/dates.sql": "select 2",
+                "models/customers.sql": "select * from {{ ref('shop', 'orders') }}, {{ ref('calendar') }}",
+                "dbt_packages/utils/dbt_project.yml": 'name: "utils"\nversion: "1.2.0"\n',
+                "dbt_packages/utils/models/dates.sql": "select 1",
+                "dbt_packages/utils/models/calendar.sql": "select * from {{ ref('dates') }}",
+                "dbt_packages/utils/models/schema.yml": "models:\n  - name: calendar\n    description: Days\n",
+            }
+            for file_name, contents in files.items():
+                os.makedirs(
+                    os.path.dirname(os.path.join(tmp_dir, file_name)), exist_ok=True
+                )
+                with open(os.path.join(tmp_dir, file_name), "w", encoding="utf-8") as f:
+                    f.write(contents)
+
+            package_cache_path = os.path.join(tmp_dir, "package_cache")
+            models = DbtProject(
+                tmp_dir,
+                database_path=os.path.join(tmp_dir, "db.json"),
+                package_cache_path=package_cache_path,
+            ).parse()["models"]
+
+            with mock.patch(
+                "dbt_llm_tools.packages._parse_package_files"
+            ) as parse_package_files:
+                cached_project = DbtProject(
+                    tmp_dir,
+                    database_path=os.path.join(tmp_dir, "cached.json"),
+                    package_cache_path=package_cache_path,
+                )
+                cached_project.parse()
+
+            self.assertEqual(parse_package_files.call_count, 0)
+            self.assertEqual(
+                cached_project.get_single_model("utils.calendar"),
+                models["utils.calendar"],
+            )
+
+            with open(
+                os.path.join(tmp_dir, "dbt_packages/utils/models/dates.sql"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write("select * from {{ ref('calendar') }}")
+            cached_project.parse()
+
+            self.assertEqual(
+                cached_project.get_single_model("utils.dates")["refs"],
+                ["utils.calendar"],
+            )
+
+        self.assertEqual(models["orders"]["refs"], ["utils.calendar", "dates"])
+        self.assertEqual(models["customers"]["refs"], ["orders", "utils.calendar"])
+        self.assertEqual(
+            models["customers"]["deps"],
+            ["utils.dates", "utils.calendar", "dates", "orders"],
+        )
+        self.assertEqual(models["utils.calendar"]["refs"], ["utils.dates"])
+        self.assertEqual(models["utils.calendar"]["package_name"], "utils")
+        self.assertEqual(
+            models["utils.calendar"]["documentation"]["description"], "Days"
+        )
+        self.assertTrue(
+            models["utils.calendar"]["absolute_path"].endswith(
+                "dbt_packages/utils/models/calendar.sql"
+            )
+        )
+
+    def test_incremental_parse_only_updates_changed_files(self):
+        """
+        Test for the case when files are changed, added and deleted between two parses.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project_root = os.path.join(tmp_dir, "project")
+            shutil.copytree(SQL_PROJECT_PATH, project_root)
+            database_path = os.path.join(tmp_dir, "directory.json")
+
+            project = DbtProject(project_root, database_path=database_path)
+            project.parse()
+
+            marts = os.path.join(project_root, "models", "marts")
+            with open(os.path.join(marts, "customers.sql"), "w", encoding="utf-8") as f:
+                f.write("select * from {{ ref('stg_customers') }}")
+            with open(os.path.join(marts, "payments.sql"), "w", encoding="utf-8") as f:
+                f.write("select * from {{ ref('orders') }}")
+            os.remove(os.path.join(marts, "customer_orders.sql"))
+
+            incremental_models = project.parse(incremental=True)["models"]
+            stored_models = {model["name"]: model for model in project.get_models()}
+
+            full_models = DbtProject(
+                project_root, database_path=os.path.join(tmp_dir, "full.json")
+            ).parse()["models"]
+
+        # Blob offsets depend on the order in which the SQL code was written to each pack file.
+        for models in [incremental_models, full_models]:
+            for model in models.values():
+                model.pop("sql_offset", None)
+
+        self.assertEqual(incremental_models, full_models)
+        self.assertNotIn("customer_orders", stored_models)
+        self.assertEqual(stored_models["customers"]["deps"], ["stg_customers"])
+        self.assertEqual(stored_models["payments"]["deps"], ["stg_orders", "orders"])
+        self.assertEqual(
+            stored_models["customers"]["documentation"]["description"],
+            "Customers with their order counts",
+        )
+
+    def test_parse_removes_deleted_models(self):
+        """
+        Test for the case when SQL files are deleted between two parses, including the SQL file of
+        a model that a yaml file still documents. Incremental and full parses leave the store
+        like a fresh parse.
+        """
+        for incremental in [True, False]:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                project_root = os.path.join(tmp_dir, "project")
+                shutil.copytree(SQL_PROJECT_PATH, project_root)
+
+                project = DbtProject(
+                    project_root, database_path=os.path.join(tmp_dir, "directory.json")
+                )
+                project.parse()
+                os.remove(
+                    os.path.join(project_root, "models", "staging", "stg_customers.sql")
+                )
+                os.remove(
+                    os.path.join(project_root, "models", "marts", "customer_orders.sql")
+                )
+                project.parse(incremental=incremental)
+
+                fresh_project = DbtProject(
+                    project_root, database_path=os.path.join(tmp_dir, "fresh.json")
+                )
+                fresh_project.parse()
+
+                stored_models, fresh_models = [
+                    {model["name"]: model for model in dbt_project.get_models()}
+                    for dbt_project in [project, fresh_project]
+                ]
+
+            for models in [stored_models, fresh_models]:
+                for model in models.values():
+                    model.pop("sql_offset", None)
+
+            self.assertNotIn("stg_customers", stored_models)
+            self.assertNotIn("customer_orders", stored_models)
+            self.assertEqual(stored_models, fresh_models)
+
+    def test_incremental_parse_drops_removed_config(self):
+        """
+        Test for the case when the alias and tags of a model are removed between two parses.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files = {
+                "dbt_project.yml": 'name: "aliased"\n',
+                "models/base.sql": "{{ config(alias='base_alias', tags=['finance']) }}\nselect 1",
+                "models/child.sql": "select * from {{ ref('base_alias') }}",
+                "models/grandchild.sql": "select * from {{ ref('child') }}",
+            }
+            for file_name, contents in files.items():
+                os.makedirs(
+                    os.path.dirname(os.path.join(tmp_dir, file_name)), exist_ok=True
+                )
+                with open(os.path.join(tmp_dir, file_name), "w", encoding="utf-8") as f:
+                    f.write(contents)
+
+            project = DbtProject(
+                tmp_dir, database_path=os.path.join(tmp_dir, "directory.json")
+            )
+            project.parse()
+            project.update_model_directory(
+                {**project.get_single_model("base"), "interpretation": {}}
+            )
+
+            with open(
+                os.path.join(tmp_dir, "models/base.sql"), "w", encoding="utf-8"
+            ) as f:
+                f.write("select 2")
+
+            incremental_models = project.parse(incremental=True)["models"]
+            stored_models = {model["name"]: model for model in project.get_models()}
+            full_models = DbtProject(
+                tmp_dir, database_path=os.path.join(tmp_dir, "full.json")
+            ).parse()["models"]
+
+        for models in [incremental_models, full_models]:
+            for model in models.values():
+                model.pop("sql_offset", None)
+
+        self.assertEqual(incremental_models["base"].pop("interpretation"), {})
+        self.assertEqual(incremental_models, full_models)
+        self.assertNotIn("tags", stored_models["base"])
+        self.assertNotIn("alias", stored_models["base"])
+        self.assertEqual(stored_models["child"]["refs"], ["base_alias"])
+        self.assertEqual(stored_models["grandchild"]["deps"], ["base_alias", "child"])
+
+    def test_full_parse_replaces_stored_entries(self):
+        """
+        Test for the case when the config of a model is removed before a full parse.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project_root = os.path.join(tmp_dir, "project")
+            shutil.copytree(SQL_PROJECT_PATH, project_root)
+            orders_path = os.path.join(project_root, "models", "marts", "orders.sql")
+
+            for database_name in ["db.json", "db.sqlite"]:
+                project = DbtProject(
+                    project_root, database_path=os.path.join(tmp_dir, database_name)
+                )
+                with open(orders_path, "w", encoding="utf-8") as f:
+                    f.write(
+                        "{{ config(tags=['billing'], alias='all_orders') }}\nselect 1"
+                    )
+                project.parse()
+                project.update_model_directory(
+                    {**project.get_single_model("orders"), "interpretation": {}}
+                )
+
+                with open(orders_path, "w", encoding="utf-8") as f:
+                    f.write("select 1")
+                project.parse()
+                orders = project.get_single_model("orders")
+
+                self.assertNotIn("tags", orders)
+                self.assertNotIn("alias", orders)
+                self.assertEqual(orders["interpretation"], {})
+                self.assertEqual(
+                    [model["name"] for model in project.get_models(select="orders")],
+                    ["orders"],
+                )
+                self.assertEqual(project.get_models(select="tag:billing"), [])
+
+    def test_sql_contents_are_loaded_on_demand(self):
+        """
+        Test for the case when the SQL code of a model is needed after parsing. Full parses drop
+        the code of earlier versions of the models.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project_root = os.path.join(tmp_dir, "project")
+            shutil.copytree(SQL_PROJECT_PATH, project_root)
+            database_path = os.path.join(tmp_dir, "directory.json")
+            customers_path = os.path.join(
+                project_root, "models", "marts", "customers.sql"
+            )
+
+            project = DbtProject(project_root, database_path=database_path)
+            project.parse()
+
+            customers = project.get_single_model("customers")
+            with open(customers_path, encoding="utf-8") as f:
+                customers_sql = f.read()
+            with open(database_path, encoding="utf-8") as f:
+                stored_directory = f.read()
+
+            self.assertNotIn("sql_contents", customers)
+            self.assertNotIn("left join orders", stored_directory)
+            self.assertEqual(project.get_sql_contents(customers), customers_sql)
+
+            with open(customers_path, "w", encoding="utf-8") as f:
+                f.write("select * from {{ ref('stg_customers') }}")
+            project.parse(incremental=True)
+
+            self.assertEqual(
+                project.get_sql_contents(project.get_single_model("customers")),
+                "select * from {{ ref('stg_customers') }}",
+            )
+            self.assertEqual(project.get_sql_contents(customers), customers_sql)
+
+            project.parse()
+            updated_customers = project.get_single_model("customers")
+
+            self.assertEqual(
+                project.get_sql_contents(
+                    {**updated_customers, "sql_contents": customers_sql}
+                ),
+                "select * from {{ ref('stg_customers') }}",
+            )
+            with self.assertRaises(Exception):
+                project.get_sql_contents(customers)
+
+    def test_parallel_parse_matches_serial_parse(self):
+        """
+        Test for the case when files are parsed over a process pool.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            serial_directory = DbtProject(
+                SQL_PROJECT_PATH,
+                database_path=os.path.join(tmp_dir, "serial.json"),
+            ).parse()
+            parallel_directory = DbtProject(
+                SQL_PROJECT_PATH,
+                database_path=os.path.join(tmp_dir, "parallel.json"),
+            ).parse(jobs=2)
+
+        self.assertEqual(parallel_directory, serial_directory)
+        self.assertEqual(
+            list(parallel_directory["models"]), list(serial_directory["models"])
+        )
+
+    def test_directory_built_from_manifest_matches_parse(self):
+        """
+        Test for the case when the directory is built from the manifest.json compiled by dbt.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            parsed_models = DbtProject(
+                SQL_PROJECT_PATH,
+                database_path=os.path.join(tmp_dir, "parsed.json"),
+            ).parse()["models"]
+
+            project = DbtProject.from_manifest(
+                os.path.join(SQL_PROJECT_PATH, "target", "manifest.json"),
+                database_path=os.path.join(tmp_dir, "manifest.json"),
+                sql_blob_path=os.path.join(tmp_dir, "sql.pack"),
+            )
+            manifest_models = {model["name"]: model for model in project.get_models()}
+
+            self.assertTrue(os.path.isfile(os.path.join(tmp_dir, "sql.pack")))
+
+        self.assertEqual(set(manifest_models), set(parsed_models))
+
+        for name, model in parsed_models.items():
+            for key in ["refs", "sources", "sql_hash", "yaml_path"]:
+                self.assertEqual(manifest_models[name].get(key), model.get(key))
+            self.assertEqual(set(manifest_models[name]["deps"]), set(model["deps"]))
+
+        self.assertEqual(
+            manifest_models["customers"]["documentation"]["config"]["tags"],
+            ["finance"],
+        )
+
+    def test_sqlite_backend_matches_tinydb_backend(self):
+        """
+        Test for the case when the directory is stored in a SQLite database.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tinydb_project = DbtProject(
+                SQL_PROJECT_PATH, database_path=os.path.join(tmp_dir, "db.json")
+            )
+            sqlite_project = DbtProject(
+                SQL_PROJECT_PATH, database_path=os.path.join(tmp_dir, "db.sqlite")
+            )
+            tinydb_project.parse()
+            sqlite_project.parse()
+
+            self.assertEqual(sqlite_project.get_models(), tinydb_project.get_models())
+            self.assertEqual(
+                sqlite_project.get_single_model("customers"),
+                tinydb_project.get_single_model("customers"),
+            )
+
+    def test_directory_is_cached_until_the_store_changes(self):
+        """
+        Test for the case when models are looked up repeatedly.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            database_path = os.path.join(tmp_dir, "db.json")
+            store = TinyDbDirectoryStore(database_path)
+            project = DbtProject(
+                SQL_PROJECT_PATH, database_path=database_path, storage_backend=store
+            )
+            project.parse()
+
+            with mock.patch.object(store, "search", wraps=store.search) as search:
+                for _ in range(3):
+                    project.get_single_model("customers")["interpretation"] = {}
+                    project.get_models(models=["orders", "customers"])
+
+                self.assertEqual(search.call_count, 2)
+                self.assertNotIn(
+                    "interpretation", project.get_single_model("customers")
+                )
+
+                other_project = DbtProject(
+                    SQL_PROJECT_PATH, database_path=database_path
+                )
+                other_project.update_model_directory(
+                    {**other_project.get_single_model("orders"), "interpretation": {}}
+                )
+
+                self.assertEqual(
+                    project.get_single_model("orders")["interpretation"], {}
+                )
+                self.assertEqual(search.call_count, 4)
+
+    def test_lineage_is_answered_in_both_directions(self):
+        """
+        Test for the case when the upstream and downstream models of a model are requested.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project = DbtProject(
+                SQL_PROJECT_PATH, database_path=os.path.join(tmp_dir, "db.json")
+            )
+            project.parse()
+
+            self.assertEqual(
+                project.get_downstream("stg_orders"),
+                ["customers", "orders", "customer_orders"],
+            )
+            self.assertEqual(
+                project.get_upstream("customer_orders", depth=1),
+                ["customers", "orders"],
+            )
+            self.assertEqual(
+                project.get_subgraph("orders", downstream_depth=1),
+                {
+                    "orders": ["stg_orders"],
+                    "stg_orders": [],
+                    "customer_orders": ["orders"],
+                },
+            )
+
+            with self.assertRaises(Exception):
+                project.get_downstream("missing_model")
+
+    def test_get_models_with_selector(self):
+        """
+        Test for the case when models are selected with a dbt node selector.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project = DbtProject(
+                SQL_PROJECT_PATH, database_path=os.path.join(tmp_dir, "db.json")
+            )
+            project.parse()
+
+            models = project.get_models(
+                select="tag:finance+ stg_orders",
+                excluded_folders=["models/marts/orders.sql"],
+            )
+
+            self.assertEqual(
+                [model["name"] for model in models],
+                ["customer_orders", "customers", "stg_orders"],
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
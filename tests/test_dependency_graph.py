@@ -0,0 +1,85 @@
+import unittest
+
+from dbt_llm_tools.dependency_graph import DependencyGraph
+
+
+class DependencyGraphTestCase(unittest.TestCase):
+    """
+    Test cases for the DependencyGraph class.
+    """
+
+    def test_deps_are_transitive_and_ordered_upstream_first(self):
+        """
+        Test for the case when a model depends on other models through several levels of refs.
+        """
+        graph = DependencyGraph(
+            {
+                "a": ["b", "c"],
+                "b": ["c"],
+                "c": ["d"],
+            }
+        )
+
+        self.assertEqual(graph.get_deps("a"), ["d", "c", "b"])
+        self.assertEqual(graph.get_deps("c"), ["d"])
+        self.assertEqual(graph.get_deps("d"), [])
+        self.assertEqual(graph.get_cycles(), [])
+
+    def test_cycles_are_detected(self):
+        """
+        Test for the case when models reference each other in a cycle.
+        """
+        graph = DependencyGraph(
+            {
+                "a": ["b"],
+                "b": ["c"],
+                "c": ["a", "d"],
+                "e": ["e"],
+            }
+        )
+
+        self.assertEqual(set(graph.get_deps("a")), {"a", "b", "c", "d"})
+        self.assertEqual(graph.get_deps("e"), ["e"])
+        self.assertEqual(
+            sorted(map(sorted, graph.get_cycles())), [["a", "b", "c"], ["e"]]
+        )
+
+    def test_upstream_and_downstream_walks_respect_depth(self):
+        """
+        Test for the case when the lineage of a model is walked in both directions.
+        """
+        graph = DependencyGraph(
+            {
+                "report": ["orders", "customers"],
+                "orders": ["stg_orders"],
+                "customers": ["stg_orders", "stg_customers"],
+            }
+        )
+
+        self.assertEqual(graph.get_children("stg_orders"), ["orders", "customers"])
+        self.assertEqual(
+            graph.get_downstream("stg_orders", depth=1), ["orders", "customers"]
+        )
+        self.assertEqual(
+            graph.get_downstream("stg_orders"), ["orders", "customers", "report"]
+        )
+        self.assertEqual(graph.get_upstream("report", depth=1), ["orders", "customers"])
+        self.assertEqual(
+            graph.get_upstream("report"),
+            ["orders", "customers", "stg_orders", "stg_customers"],
+        )
+        self.assertEqual(graph.get_upstream("report", depth=0), [])
+        self.assertEqual(graph.get_downstream("report"), [])
+
+    def test_deep_graph_does_not_hit_recursion_limit(self):
+        """
+        Test for the case when the ref chain is deeper than the interpreter recursion limit.
+        """
+        depth = 5000
+        graph = DependencyGraph({f"m{i}": [f"m{i + 1}"] for i in range(depth)})
+
+        self.assertEqual(len(graph.get_deps("m0")), depth)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tinydb import TinyDB
+
+from dbt_llm_tools.directory_store import (
+    SqliteDirectoryStore,
+    TinyDbDirectoryStore,
+    get_directory_store,
+)
+
+MODEL_1 = {"type": "model", "name": "model_1", "absolute_path": "/models/model_1.sql"}
+MODEL_2 = {"type": "model", "name": "model_2", "yaml_path": "/models/schema.yml"}
+SOURCE_1 = {"type": "source", "name": "model_1", "yaml_path": "/models/schema.yml"}
+
+
+class DirectoryStoreTestCase(unittest.TestCase):
+    """
+    Test cases for the directory store backends.
+    """
+
+    def test_backend_is_picked_from_database_path(self):
+        """
+        Test for the case when no storage backend is given.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_store = get_directory_store(os.path.join(tmp_dir, "db.json"))
+            sqlite_store = get_directory_store(os.path.join(tmp_dir, "db.sqlite"))
+
+        self.assertIsInstance(json_store, TinyDbDirectoryStore)
+        self.assertIsInstance(sqlite_store, SqliteDirectoryStore)
+
+    def test_sqlite_store_upserts_replaces_and_removes_entries(self):
+        """
+        Test for the case when entries are written to the SQLite store in bulk.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = SqliteDirectoryStore(os.path.join(tmp_dir, "db.sqlite"))
+
+            store.upsert_many([MODEL_1, MODEL_2, SOURCE_1])
+            store.upsert_many([{**MODEL_1, "interpretation": {"name": "model_1"}}])
+            store.upsert_many([{**MODEL_1, "refs": ["model_2"]}])
+
+            self.assertEqual(
+                [model["name"] for model in store.search("model")],
+                ["model_1", "model_2"],
+            )
+            self.assertEqual(
+                store.get("model_1")["interpretation"], {"name": "model_1"}
+            )
+            self.assertEqual(store.get("model_1", "source"), SOURCE_1)
+
+            store.replace_many([MODEL_1], [MODEL_2])
+
+            self.assertEqual(store.search("model"), [MODEL_1])
+            self.assertIsNone(store.get("model_2"))
+
+    def test_tinydb_store_writes_entries_in_one_atomic_write(self):
+        """
+        Test for the case when entries are written to the TinyDB store in bulk.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            database_path = os.path.join(tmp_dir, "db.json")
+            TinyDB(database_path).insert({"type": "settings", "openai_api_key": "key"})
+            store = TinyDbDirectoryStore(database_path)
+
+            with mock.patch.object(os, "replace", wraps=os.replace) as replace:
+                store.upsert_many([MODEL_1, MODEL_2, SOURCE_1])
+                store.upsert_many([{**MODEL_1, "refs": ["model_2"]}])
+                store.replace_many([MODEL_1], [SOURCE_1])
+
+            self.assertEqual(replace.call_count, 3)
+            self.assertEqual(store.search("model"), [MODEL_1, MODEL_2])
+            self.assertEqual(store.search("source"), [])
+            self.assertEqual(
+                TinyDB(database_path).all()[0],
+                {"type": "settings", "openai_api_key": "key"},
+            )
+            self.assertEqual(os.listdir(tmp_dir), ["db.json"])
+
+            os.chmod(database_path, 0o640)
+            store.upsert_many([MODEL_1])
+
+            self.assertEqual(os.stat(database_path).st_mode & 0o777, 0o640)
+
+    def test_sqlite_store_migrates_tinydb_file(self):
+        """
+        Test for the case when an existing TinyDB directory file is migrated to SQLite.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tinydb_store = TinyDbDirectoryStore(os.path.join(tmp_dir, "db.json"))
+            tinydb_store.upsert_many([MODEL_1, MODEL_2, SOURCE_1])
+
+            store = SqliteDirectoryStore(os.path.join(tmp_dir, "db.sqlite"))
+
+            self.assertEqual(
+                store.migrate_from_tinydb(os.path.join(tmp_dir, "db.json")), 3
+            )
+            self.assertEqual(store.search("model"), [MODEL_1, MODEL_2])
+            self.assertEqual(store.search("source"), [SOURCE_1])
+
+
+if __name__ == "__main__":
+    unittest.main()
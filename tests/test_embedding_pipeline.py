@@ -0,0 +1,155 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dbt_llm_tools import (
+    DbtModel,
+    EmbeddingPipeline,
+    HashEmbeddingFunction,
+    VectorStore,
+)
+
+
+class FakeEmbeddingServer(ThreadingHTTPServer):
+    """
+    A local server that implements the OpenAI embeddings API with hash embeddings. It answers the first
+    request with a rate limit error, and records the size of every batch and the highest number of
+    requests handled at the same time.
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), FakeEmbeddingHandler)
+        self.embedding_fn = HashEmbeddingFunction(dimensions=16)
+        self.lock = threading.Lock()
+        self.batch_sizes = []
+        self.active_requests = 0
+        self.max_active_requests = 0
+        self.rate_limited = False
+
+    @property
+    def api_base(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class FakeEmbeddingHandler(BaseHTTPRequestHandler):
+    """
+    Handles the requests of the fake embedding server.
+    """
+
+    server: FakeEmbeddingServer
+
+    def log_message(self, *args) -> None:  # pylint: disable=arguments-differ
+        pass
+
+    def __respond(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        with self.server.lock:
+            if not self.server.rate_limited:
+                self.server.rate_limited = True
+                self.__respond(429, {"error": {"message": "Rate limit reached"}})
+                return
+
+            self.server.active_requests += 1
+            self.server.max_active_requests = max(
+                self.server.max_active_requests, self.server.active_requests
+            )
+            self.server.batch_sizes.append(len(request["input"]))
+
+        time.sleep(0.05)
+        embeddings = self.server.embedding_fn(request["input"])
+
+        with self.server.lock:
+            self.server.active_requests -= 1
+
+        self.__respond(
+            200,
+            {
+                "object": "list",
+                "model": request["model"],
+                "data": [
+                    {"object": "embedding", "index": index, "embedding": embedding}
+                    for index, embedding in reversed(list(enumerate(embeddings)))
+                ],
+                "usage": {"prompt_tokens": 10, "total_tokens": 10},
+            },
+        )
+
+
+class EmbeddingPipelineTestCase(unittest.TestCase):
+    """
+    Test cases for the EmbeddingPipeline class.
+    """
+
+    def test_batches_are_bounded_by_tokens_and_size(self):
+        """
+        Test for the case when documents are split into batches.
+        """
+        pipeline = EmbeddingPipeline(
+            max_batch_tokens=10, max_batch_size=3, token_counter=len
+        )
+
+        self.assertEqual(
+            pipeline.get_batches(
+                ["aaaa", "bbbb", "cc", "d", "e", "f", "ggggggggggggg", "h"]
+            ),
+            [[0, 1, 2], [3, 4, 5], [6], [7]],
+        )
+        self.assertEqual(pipeline.get_batches([]), [])
+
+    def test_models_are_embedded_by_a_local_server(self):
+        """
+        Test for the case when models are upserted with an OpenAI compatible server that rate limits a request.
+        """
+        server = FakeEmbeddingServer()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        models = [
+            DbtModel({"name": f"model_{i}", "description": f"Model number {i}"})
+            for i in range(40)
+        ]
+
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                vector_store = VectorStore(
+                    "api_key",
+                    "fake-embedding-model",
+                    vector_db_path=os.path.join(tmp_dir, "chroma"),
+                    api_base=server.api_base,
+                    embedding_pipeline=EmbeddingPipeline(
+                        max_batch_size=5, concurrency=4, backoff=0.01
+                    ),
+                )
+                vector_store.upsert_models(models)
+                stored_models = vector_store.get_models()
+                closest_model = vector_store.query_collection(
+                    models[7].as_prompt_text(), n_results=1
+                )[0]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(len(stored_models), 40)
+        self.assertEqual(closest_model["id"], "model_7")
+        self.assertAlmostEqual(closest_model["distance"], 0, places=5)
+        self.assertEqual(server.batch_sizes[:-1], [5] * 8)
+        self.assertEqual(server.batch_sizes[-1], 1)
+        self.assertGreater(server.max_active_requests, 1)
+        self.assertLessEqual(server.max_active_requests, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
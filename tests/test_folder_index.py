@@ -0,0 +1,54 @@
+import unittest
+
+from dbt_llm_tools.folder_index import FolderIndex
+
+PROJECT_ROOT = "/projects/shop"
+
+
+class FolderIndexTestCase(unittest.TestCase):
+    """
+    Test cases for the FolderIndex class.
+    """
+
+    def test_folders_match_whole_path_components(self):
+        """
+        Test for the case when folders are given with and without their parent folders.
+        """
+        index = FolderIndex(
+            PROJECT_ROOT,
+            [
+                ["/projects/shop/models/staging/stg_orders.sql"],
+                ["/projects/shop/models/staging_v2/stg_customers.sql"],
+                ["/projects/shop/models/marts/orders.sql"],
+            ],
+        )
+
+        self.assertEqual(index.find(["models/staging"]), {0})
+        self.assertEqual(index.find(["staging/"]), {0})
+        self.assertEqual(index.find(["./models/marts"]), {2})
+        self.assertEqual(index.find(["models/stag"]), set())
+        self.assertEqual(index.find(["/projects/shop/models"]), {0, 1, 2})
+        self.assertEqual(index.find(["shop"]), set())
+
+    def test_entries_in_several_folders_are_found_once(self):
+        """
+        Test for the case when an entry has files in several of the searched folders.
+        """
+        index = FolderIndex(
+            PROJECT_ROOT,
+            [
+                [
+                    "/projects/shop/models/marts/orders.sql",
+                    "/projects/shop/models/docs/schema.yml",
+                ],
+                ["/elsewhere/models/marts/customers.sql"],
+            ],
+        )
+
+        self.assertEqual(index.find(["models/marts", "models/docs", "marts"]), {0, 1})
+        self.assertEqual(index.find(["elsewhere"]), {1})
+        self.assertEqual(index.find([]), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from dbt_llm_tools import BM25Index
+from dbt_llm_tools.lexical_index import tokenize
+
+
+class BM25IndexTestCase(unittest.TestCase):
+    """
+    Test cases for the BM25Index class.
+    """
+
+    def test_identifiers_are_split(self):
+        """
+        Test for the case when a text contains identifiers with underscores.
+        """
+        self.assertEqual(
+            tokenize("Where is `Customer_LTV`?"),
+            ["where", "is", "customer_ltv", "customer", "ltv"],
+        )
+
+    def test_exact_names_rank_first(self):
+        """
+        Test for the case when a query names a column of one of the documents.
+        """
+        index = BM25Index()
+        index.add_many(
+            ["customers", "orders", "payments"],
+            [
+                "The table customers is described as follows: All the customers.\n- customer_ltv: Lifetime value",
+                "The table orders is described as follows: Orders of every customer.",
+                "The table payments is described as follows: Payments of the orders of every customer.",
+            ],
+        )
+
+        self.assertEqual(index.search("where is customer_ltv?")[0][0], "customers")
+        self.assertEqual(
+            [document_id for document_id, _ in index.search("orders", n_results=2)],
+            ["orders", "payments"],
+        )
+        self.assertEqual(index.search("invoices"), [])
+
+    def test_documents_are_replaced_and_removed(self):
+        """
+        Test for the case when documents are indexed again and removed.
+        """
+        index = BM25Index()
+        index.add_many(["orders", "payments"], ["All the orders", "All the payments"])
+        index.add_many(["orders"], ["All the refunds"])
+        index.remove_many(["payments", "missing"])
+
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.search("orders"), [])
+        self.assertEqual(index.search("refunds")[0][0], "orders")
+        self.assertEqual(index.search("payments"), [])
+
+    def test_common_tokens_are_scored(self):
+        """
+        Test for the case when a query token appears in most of the documents.
+        """
+        index = BM25Index()
+        index.add_many(
+            ["customers", "orders", "payments"],
+            [
+                "Lifetime value of every customer",
+                "Orders of every customer",
+                "Payments",
+            ],
+        )
+        results = index.search("customer orders")
+
+        self.assertEqual(
+            [document_id for document_id, _ in results], ["orders", "customers"]
+        )
+        self.assertGreater(results[1][1], 0)
+        self.assertGreater(results[0][1], 2 * results[1][1])
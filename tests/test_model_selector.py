@@ -0,0 +1,102 @@
+import unittest
+
+from dbt_llm_tools.dependency_graph import DependencyGraph
+from dbt_llm_tools.folder_index import FolderIndex
+from dbt_llm_tools.model_selector import ModelSelector
+
+PROJECT_ROOT = "/projects/shop"
+
+MODELS = [
+    {
+        "name": "stg_orders",
+        "absolute_path": "/projects/shop/models/staging/stg_orders.sql",
+    },
+    {
+        "name": "stg_customers",
+        "absolute_path": "/projects/shop/models/staging/stg_customers.sql",
+    },
+    {
+        "name": "orders",
+        "absolute_path": "/projects/shop/models/marts/orders.sql",
+        "refs": ["stg_orders"],
+        "documentation": {"name": "orders", "config": {"tags": ["finance"]}},
+    },
+    {
+        "name": "customers",
+        "absolute_path": "/projects/shop/models/marts/customers.sql",
+        "refs": ["stg_customers", "stg_orders"],
+        "documentation": {"name": "customers", "config": {"tags": "crm"}},
+    },
+    {
+        "name": "customer_orders",
+        "absolute_path": "/projects/shop/models/marts/customer_orders.sql",
+        "refs": ["customers", "orders"],
+        "tags": ["finance"],
+    },
+]
+
+
+def get_selector() -> ModelSelector:
+    return ModelSelector(
+        MODELS,
+        DependencyGraph(
+            {model["name"]: model["refs"] for model in MODELS if "refs" in model}
+        ),
+        FolderIndex(PROJECT_ROOT, [[model["absolute_path"]] for model in MODELS]),
+    )
+
+
+class ModelSelectorTestCase(unittest.TestCase):
+    """
+    Test cases for the ModelSelector class.
+    """
+
+    def test_graph_operators(self):
+        """
+        Test for the case when selectors add the upstream or downstream models of a model.
+        """
+        selector = get_selector()
+
+        self.assertEqual(selector.select("orders"), {"orders"})
+        self.assertEqual(selector.select("+orders"), {"orders", "stg_orders"})
+        self.assertEqual(
+            selector.select("stg_orders+1"), {"stg_orders", "orders", "customers"}
+        )
+        self.assertEqual(
+            selector.select("stg_orders+"),
+            {"stg_orders", "orders", "customers", "customer_orders"},
+        )
+        self.assertEqual(
+            selector.select("1+customer_orders"),
+            {"customer_orders", "customers", "orders"},
+        )
+        self.assertEqual(selector.select("missing+"), set())
+
+    def test_methods_unions_and_intersections(self):
+        """
+        Test for the case when selectors use methods, wildcards, unions and intersections.
+        """
+        selector = get_selector()
+
+        self.assertEqual(selector.select("tag:finance"), {"orders", "customer_orders"})
+        self.assertEqual(selector.select("tag:crm"), {"customers"})
+        self.assertEqual(
+            selector.select("path:models/staging"), {"stg_orders", "stg_customers"}
+        )
+        self.assertEqual(selector.select("path:staging"), set())
+        self.assertEqual(selector.select("path:models/marts/orders.sql"), {"orders"})
+        self.assertEqual(
+            selector.select("stg_* tag:crm"),
+            {"stg_orders", "stg_customers", "customers"},
+        )
+        self.assertEqual(
+            selector.select("+tag:finance,path:models/staging"),
+            {"stg_orders", "stg_customers"},
+        )
+
+        with self.assertRaises(Exception):
+            selector.select("config:materialized")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from dbt_llm_tools import DbtProject, ProjectWatcher, VectorStore
+from tests.test_vector_store import CountingEmbeddingFunction
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+SQL_PROJECT_PATH = os.path.join(HERE, "test_data/sql_dbt_project")
+
+
+class ProjectWatcherTestCase(unittest.TestCase):
+    """
+    Test cases for the ProjectWatcher class.
+    """
+
+    def test_changes_are_debounced_and_only_changed_models_are_embedded(self):
+        """
+        Test for the case when files of a watched project are edited, added and deleted.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project_root = os.path.join(tmp_dir, "project")
+            shutil.copytree(SQL_PROJECT_PATH, project_root)
+            schema_path = os.path.join(project_root, "models/staging/schema.yml")
+
+            embedding_fn = CountingEmbeddingFunction()
+            vector_store = VectorStore(
+                "api_key",
+                vector_db_path=os.path.join(tmp_dir, "vectors"),
+                embedding_fn=embedding_fn,
+                storage_backend="numpy",
+            )
+            watcher = ProjectWatcher(
+                DbtProject(
+                    project_root, database_path=os.path.join(tmp_dir, "db.json")
+                ),
+                vector_store,
+                debounce=0,
+            )
+
+            self.assertEqual(
+                watcher.sync(),
+                {"added": 3, "updated": 0, "unchanged": 0, "deleted": 0},
+            )
+            self.assertIsNone(watcher.poll())
+
+            with open(schema_path, encoding="utf-8") as f:
+                schema = f.read()
+            with open(schema_path, "w", encoding="utf-8") as f:
+                f.write(
+                    schema.replace(
+                        "One row per order", "One row per paid order"
+                    ).replace("  - name: stg_customers\n", "  - name: removed_model\n")
+                )
+            os.remove(os.path.join(project_root, "models/staging/stg_customers.sql"))
+
+            self.assertIsNone(watcher.poll())
+            embedding_fn.documents.clear()
+            self.assertEqual(
+                watcher.poll(),
+                {"added": 0, "updated": 1, "unchanged": 1, "deleted": 1},
+            )
+            stored_documents = {
+                model["id"]: model["document"] for model in vector_store.get_models()
+            }
+
+            self.assertEqual(len(embedding_fn.documents), 1)
+            self.assertIn("One row per paid order", embedding_fn.documents[0])
+            self.assertEqual(set(stored_documents), {"customers", "stg_orders"})
+            self.assertIsNone(watcher.poll())
+
+
+if __name__ == "__main__":
+    unittest.main()
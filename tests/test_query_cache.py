@@ -0,0 +1,60 @@
+import unittest
+
+from dbt_llm_tools import LRUCache
+
+
+class FakeClock:
+    """
+    A clock that only moves when it is told to.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    """
+    Test cases for the LRUCache class.
+    """
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """
+        Test for the case when an entry is added to a full cache.
+        """
+        cache = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_expired_entry_is_evicted(self):
+        """
+        Test for the case when an entry is read after its time to live.
+        """
+        clock = FakeClock()
+        cache = LRUCache(ttl=10, clock=clock)
+        cache.put("a", 1)
+
+        clock.now = 10
+        self.assertEqual(cache.get("a"), 1)
+
+        clock.now = 10.5
+        self.assertEqual(cache.get("a", "expired"), "expired")
+        self.assertEqual(len(cache), 0)
+
+    def test_disabled_cache_stores_nothing(self):
+        """
+        Test for the case when the cache size is 0.
+        """
+        cache = LRUCache(max_size=0)
+        cache.put("a", 1)
+
+        self.assertIsNone(cache.get("a"))
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+from dbt_llm_tools.sql_blob_store import SqlBlobStore, get_sql_hash
+
+
+class SqlBlobStoreTestCase(unittest.TestCase):
+    """
+    Test cases for the SqlBlobStore class.
+    """
+
+    def test_blobs_are_stored_once_per_content(self):
+        """
+        Test for the case when the same SQL code is stored several times, by several stores.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "sql.pack")
+            store = SqlBlobStore(path)
+
+            locations = store.put_many(["select 1", "select 'é'", "select 1"])
+            size = os.path.getsize(path)
+            other_locations = SqlBlobStore(path).put_many(["select 'é'", ""])
+
+            self.assertEqual(locations[0], locations[2])
+            self.assertEqual(locations[0][0], get_sql_hash("select 1"))
+            self.assertEqual(other_locations[0], locations[1])
+            self.assertEqual(other_locations[1][1], size)
+            self.assertEqual(store.get(*locations[1]), "select 'é'")
+            self.assertEqual(store.get(*other_locations[1]), "")
+
+    def test_blobs_are_found_by_hash_when_the_offset_is_stale(self):
+        """
+        Test for the case when a blob is not at the given offset, or does not exist.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = SqlBlobStore(os.path.join(tmp_dir, "sql.pack"))
+            locations = store.put_many(["select 1", "select 2"])
+            first_offset = locations[0][1]
+            sql_hash = locations[1][0]
+
+            self.assertEqual(store.get(sql_hash, first_offset), "select 2")
+            self.assertEqual(store.get(sql_hash), "select 2")
+
+            with self.assertRaises(Exception):
+                store.get(get_sql_hash("select 3"), first_offset)
+
+    def test_appends_of_several_stores_are_interleaved(self):
+        """
+        Test for the case when stores append to the same pack file between each other's writes,
+        in a folder that does not exist yet.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "storage", "sql.pack")
+            store = SqlBlobStore(path)
+            other_store = SqlBlobStore(path)
+
+            first_locations = store.put_many(["select 1"])
+            other_locations = other_store.put_many(["select 2"])
+            second_locations = store.put_many(["select 3", "select 2"])
+
+            self.assertEqual(second_locations[1], other_locations[0])
+            self.assertEqual(store.get(*first_locations[0]), "select 1")
+            self.assertEqual(other_store.get(*second_locations[0]), "select 3")
+
+    def test_compaction_drops_unused_blobs(self):
+        """
+        Test for the case when the pack file is rewritten with only some of its blobs.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "sql.pack")
+            store = SqlBlobStore(path)
+            locations = store.put_many(["select 1", "select 2", "select 3"])
+            os.chmod(path, 0o640)
+
+            offsets = store.compact(
+                {locations[2][0], locations[0][0], get_sql_hash("select 4")}
+            )
+
+            self.assertEqual(offsets, {locations[0][0]: 0, locations[2][0]: 76})
+            self.assertEqual(
+                store.get(locations[2][0], offsets[locations[2][0]]), "select 3"
+            )
+            self.assertEqual(SqlBlobStore(path).get(locations[2][0]), "select 3")
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+
+            with self.assertRaises(Exception):
+                store.get(*locations[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+from dbt_llm_tools.sql_scanner import scan_sql
+
+MODEL_SQL = """
+{{ config(materialized="incremental", tags=["finance", "daily"], alias='fct_orders') }}
+
+-- depends_on: {{ ref('upstream_model') }}
+{# select * from {{ ref('jinja_commented_model') }} #}
+/* {{ source('old_shop', 'orders') }} */
+
+with orders as (
+    select *, 'not -- a comment' as note from {{ ref('stg_orders') }}
+),
+
+payments as (
+    select * from {{ ref("payments_package", 'stg_payments') }}
+    where created_at > '{{ var("start_date") }}'
+)
+
+select * from orders
+join payments using (order_id)
+join {{ source('shop', 'customers') }} using (customer_id)
+join {{ ref('stg_orders') }} as repeated using (order_id)
+{% raw %}{{ ref('raw_model') }}{% endraw %}
+{%- set versioned = ref('versioned_model', v=2) -%}
+"""
+
+
+class SqlScannerTestCase(unittest.TestCase):
+    """
+    Test cases for the SQL scanner.
+    """
+
+    def test_scan_finds_refs_sources_and_config(self):
+        """
+        Test for the case when a model uses refs, package refs, sources and a config block.
+        Blocks inside SQL comments are rendered by dbt, so their calls count.
+        """
+        result = scan_sql(MODEL_SQL)
+
+        self.assertEqual(
+            result["refs"],
+            [
+                {"package": None, "name": "upstream_model"},
+                {"package": None, "name": "stg_orders"},
+                {"package": "payments_package", "name": "stg_payments"},
+                {"package": None, "name": "stg_orders"},
+                {"package": None, "name": "versioned_model"},
+            ],
+        )
+        self.assertEqual(
+            result["sources"],
+            [
+                {"name": "old_shop", "table": "orders"},
+                {"name": "shop", "table": "customers"},
+            ],
+        )
+        self.assertEqual(result["tags"], ["finance", "daily"])
+        self.assertEqual(result["materialized"], "incremental")
+        self.assertEqual(result["alias"], "fct_orders")
+
+    def test_scan_ignores_calls_outside_jinja(self):
+        """
+        Test for the case when a file has no Jinja, or has functions whose names end like dbt's.
+        """
+        self.assertEqual(
+            scan_sql("select pref('a'), ref('b') from t"),
+            {
+                "refs": [],
+                "sources": [],
+                "tags": [],
+                "materialized": None,
+                "alias": None,
+            },
+        )
+        self.assertEqual(
+            scan_sql("{{ my_ref('a') }} {{ config(tags='nightly') }}")["tags"],
+            ["nightly"],
+        )
+        self.assertEqual(scan_sql("{{ my_ref('a') }}")["refs"], [])
+
+    def test_scan_reads_complex_config_blocks(self):
+        """
+        Test for the case when a config block has arguments that are not strings or lists of strings.
+        """
+        result = scan_sql(
+            "{{ config(materialized='table', post_hook=grant('reporter'), tags='daily') }}\n"
+            "{{ config(alias='final', enabled=true, tags=['daily', 'finance']) }}"
+        )
+
+        self.assertEqual(result["tags"], ["daily", "finance"])
+        self.assertEqual(result["materialized"], "table")
+        self.assertEqual(result["alias"], "final")
+
+
+if __name__ == "__main__":
+    unittest.main()
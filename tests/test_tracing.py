@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+from dbt_llm_tools import (
+    DbtModel,
+    DbtProject,
+    HashEmbeddingFunction,
+    JsonLinesSpanExporter,
+    LoggingSpanExporter,
+    OpenTelemetrySpanExporter,
+    SpanExporter,
+    Tracer,
+    VectorStore,
+)
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+SQL_PROJECT_PATH = os.path.join(HERE, "test_data/sql_dbt_project")
+
+
+class ListSpanExporter(SpanExporter):
+    """
+    Keeps the ended spans in a list.
+    """
+
+    def __init__(self) -> None:
+        self.spans = []
+
+    def on_end(self, span) -> None:
+        self.spans.append(span)
+
+
+class TracerTestCase(unittest.TestCase):
+    """
+    Test cases for the Tracer class and its exporters.
+    """
+
+    def test_spans_are_nested_and_record_errors(self):
+        """
+        Test for the case when spans are opened inside other spans and one of them fails.
+        """
+        exporter = ListSpanExporter()
+        tracer = Tracer([exporter])
+
+        with self.assertRaises(ValueError):
+            with tracer.span("outer", model="customers") as outer:
+                with tracer.span("inner") as inner:
+                    inner.add_count("files", 2)
+                    inner.add_count("files")
+                    inner.add_token_usage({"prompt_tokens": 10, "total_tokens": 12})
+
+                raise ValueError("failed")
+
+        self.assertEqual([span.name for span in exporter.spans], ["inner", "outer"])
+        self.assertIs(inner.parent, outer)
+        self.assertEqual(inner.trace_id, outer.trace_id)
+        self.assertEqual(
+            inner.counts, {"files": 3, "prompt_tokens": 10, "total_tokens": 12}
+        )
+        self.assertEqual(outer.attributes, {"model": "customers"})
+        self.assertIn("failed", outer.error)
+        self.assertIsNone(inner.error)
+        self.assertGreaterEqual(outer.duration, inner.duration)
+
+        with tracer.span("next") as span:
+            self.assertIsNone(span.parent)
+
+    def test_logging_and_json_lines_exporters(self):
+        """
+        Test for the case when spans are exported to a logger and a JSON lines file.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "spans.jsonl")
+            tracer = Tracer(
+                [
+                    LoggingSpanExporter(logging.getLogger("test_tracing")),
+                    JsonLinesSpanExporter(path),
+                ]
+            )
+
+            with self.assertLogs("test_tracing", level="INFO") as logs:
+                with tracer.span("outer"):
+                    with tracer.span("inner") as span:
+                        span.add_count("models", 4)
+
+            with open(path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn("inner took", logs.output[0])
+        self.assertIn('"models": 4', logs.output[0])
+        self.assertEqual([record["name"] for record in records], ["inner", "outer"])
+        self.assertEqual(records[0]["parent_id"], records[1]["span_id"])
+        self.assertEqual(records[0]["counts"], {"models": 4})
+
+    def test_open_telemetry_exporter(self):
+        """
+        Test for the case when spans are forwarded to an OpenTelemetry tracer provider.
+        """
+        # pylint: disable=import-outside-toplevel
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+            InMemorySpanExporter,
+        )
+
+        otel_exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(otel_exporter))
+        tracer = Tracer([OpenTelemetrySpanExporter(provider)])
+
+        with tracer.span("outer", tags=["a", "b"]):
+            with tracer.span("inner") as span:
+                span.add_count("files", 5)
+
+        inner, outer = otel_exporter.get_finished_spans()
+
+        self.assertEqual(inner.name, "inner")
+        self.assertEqual(inner.parent.span_id, outer.context.span_id)
+        self.assertEqual(inner.attributes["count.files"], 5)
+        self.assertEqual(outer.attributes["tags"], '["a", "b"]')
+
+    def test_pipeline_stages_are_traced(self):
+        """
+        Test for the case when a dbt project is parsed and its models are loaded into a vector store.
+        """
+        exporter = ListSpanExporter()
+        tracer = Tracer([exporter])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project = DbtProject(
+                SQL_PROJECT_PATH,
+                database_path=os.path.join(tmp_dir, "directory.json"),
+                package_cache_path=os.path.join(tmp_dir, "packages"),
+                tracer=tracer,
+            )
+            project.parse()
+            spans = {span.name: span for span in exporter.spans}
+
+            self.assertIs(
+                spans["dbt_project.parse_files"].parent, spans["dbt_project.parse"]
+            )
+            self.assertIs(
+                spans["dbt_project.save_directory"].parent, spans["dbt_project.parse"]
+            )
+            self.assertTrue(spans["dbt_project.parse"].attributes["full_parse"])
+            self.assertGreater(spans["dbt_project.parse_files"].counts["files"], 0)
+            self.assertIn("read_seconds", spans["dbt_project.parse_files"].counts)
+
+            exporter.spans.clear()
+            store = VectorStore(
+                "unused",
+                vector_db_path=os.path.join(tmp_dir, "chroma"),
+                embedding_fn=HashEmbeddingFunction(),
+                tracer=tracer,
+            )
+            store.upsert_models(
+                [
+                    DbtModel(model["documentation"])
+                    for model in project.get_models()
+                    if "documentation" in model
+                ]
+            )
+            store.query_collection("customers")
+            spans = [span.name for span in exporter.spans]
+
+            self.assertIn("dbt_project.load_directory", spans)
+            self.assertEqual(
+                spans[-4:],
+                [
+                    "vector_store.embed",
+                    "vector_store.upsert_models",
+                    "vector_store.embed",
+                    "vector_store.query_collection",
+                ],
+            )
+            self.assertIs(exporter.spans[-2].parent, exporter.spans[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
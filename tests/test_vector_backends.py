@@ -0,0 +1,145 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from dbt_llm_tools import ChromaVectorBackend, NumpyVectorBackend
+
+
+def get_documents(count: int, dimensions: int = 16, seed: int = 0):
+    """
+    Generate documents with random embeddings.
+    """
+    rng = np.random.default_rng(seed)
+    ids = [f"model_{i}" for i in range(count)]
+
+    return (
+        ids,
+        [f"Document of {model_id}" for model_id in ids],
+        rng.normal(size=(count, dimensions)).tolist(),
+        [{"tags": "[]", "position": i} for i in range(count)],
+    )
+
+
+class NumpyVectorBackendTestCase(unittest.TestCase):
+    """
+    Test cases for the NumpyVectorBackend class.
+    """
+
+    def test_results_match_chroma(self):
+        """
+        Test for the case when the same documents are searched with the NumPy and the ChromaDB backends.
+        """
+        documents = get_documents(200)
+        queries = np.random.default_rng(1).normal(size=(5, 16)).tolist()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            numpy_backend = NumpyVectorBackend(os.path.join(tmp_dir, "numpy"))
+            chroma_backend = ChromaVectorBackend(os.path.join(tmp_dir, "chroma"))
+
+            for backend in [numpy_backend, chroma_backend]:
+                backend.upsert(*documents)
+
+            numpy_results = numpy_backend.query(queries, n_results=5)
+            chroma_results = chroma_backend.query(queries, n_results=5)
+
+        for numpy_result, chroma_result in zip(numpy_results, chroma_results):
+            self.assertEqual(
+                [result["id"] for result in numpy_result],
+                [result["id"] for result in chroma_result],
+            )
+            self.assertEqual(numpy_result[0]["metadata"], chroma_result[0]["metadata"])
+            self.assertEqual(numpy_result[0]["document"], chroma_result[0]["document"])
+
+            for numpy_match, chroma_match in zip(numpy_result, chroma_result):
+                self.assertAlmostEqual(
+                    numpy_match["distance"], chroma_match["distance"], places=3
+                )
+
+    def test_empty_id_lists_get_no_documents(self):
+        """
+        Test for the case when documents are read with an empty list of ids, from both backends.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for backend in [
+                NumpyVectorBackend(os.path.join(tmp_dir, "numpy")),
+                ChromaVectorBackend(os.path.join(tmp_dir, "chroma")),
+            ]:
+                backend.upsert(*get_documents(3))
+
+                self.assertEqual(
+                    backend.get([]), {"ids": [], "documents": [], "metadatas": []}
+                )
+                self.assertEqual(len(backend.get()["ids"]), 3)
+
+    def test_documents_are_persisted(self):
+        """
+        Test for the case when documents are upserted in batches, updated and deleted, and read by another backend.
+        """
+        ids, documents, embeddings, metadatas = get_documents(150)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backend = NumpyVectorBackend(tmp_dir)
+            other_backend = NumpyVectorBackend(tmp_dir)
+
+            for start in range(0, 150, 40):
+                end = start + 40
+                backend.upsert(
+                    ids[start:end],
+                    documents[start:end],
+                    embeddings[start:end],
+                    metadatas[start:end],
+                )
+
+            backend.upsert([ids[3]], ["Changed document"], [embeddings[4]], [None])
+            backend.delete([ids[0], ids[10], "missing_model"])
+
+            stored_documents = other_backend.get()
+            changed_documents = other_backend.get([ids[3], ids[10]])
+            nearest = other_backend.query([embeddings[4], embeddings[149]], n_results=2)
+            missing = other_backend.query([embeddings[0]], n_results=200)[0]
+
+            backend.reset()
+            self.assertEqual(
+                NumpyVectorBackend(tmp_dir).query([embeddings[0]], 3), [[]]
+            )
+            self.assertEqual(other_backend.get()["ids"], [])
+
+        self.assertEqual(len(stored_documents["ids"]), 148)
+        self.assertNotIn(ids[0], stored_documents["ids"])
+        self.assertEqual(
+            changed_documents,
+            {"ids": [ids[3]], "documents": ["Changed document"], "metadatas": [None]},
+        )
+        self.assertEqual({result["id"] for result in nearest[0]}, {ids[3], ids[4]})
+        self.assertAlmostEqual(nearest[0][0]["distance"], 0, places=4)
+        self.assertEqual(nearest[1][0]["id"], ids[149])
+        self.assertEqual(nearest[1][0]["metadata"], metadatas[149])
+        self.assertEqual(len(missing), 148)
+        self.assertNotIn(ids[10], [result["id"] for result in missing])
+
+    def test_vector_store_does_not_import_chromadb(self):
+        """
+        Test for the case when a vector store with the NumPy backend is used in a new process.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            script = (
+                "import sys\n"
+                "from dbt_llm_tools import DbtModel, HashEmbeddingFunction, VectorStore\n"
+                f"store = VectorStore('api_key', vector_db_path={tmp_dir!r}, "
+                "embedding_fn=HashEmbeddingFunction(), storage_backend='numpy')\n"
+                "store.upsert_models([DbtModel({'name': 'orders', 'description': 'All the orders'})])\n"
+                "print(store.query_collection('orders', n_results=1)[0]['id'])\n"
+                "print('chromadb' in sys.modules)\n"
+            )
+            output = subprocess.run(
+                [sys.executable, "-c", script],
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout
+
+        self.assertEqual(output.split(), ["orders", "False"])
@@ -1,6 +1,17 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
 
-from dbt_llm_tools import DbtModel, VectorStore
+from dbt_llm_tools import (
+    DbtModel,
+    EmbeddingPipeline,
+    HashEmbeddingFunction,
+    LRUCache,
+    OpenAIEmbeddingFunction,
+    VectorStore,
+)
+from dbt_llm_tools.embeddings import get_embedding_cache_id
 from tests.test_data.model_examples import (
     INVALID_MODEL,
     MODEL_WITH_NAME_AND_DESCRIPTION,
@@ -9,6 +20,22 @@ from tests.test_data.model_examples import (
 )
 
 
+class CountingEmbeddingFunction(HashEmbeddingFunction):
+    """
+    A hash embedding function that records the documents it embeds.
+    """
+
+    def __init__(self, dimensions: int = 256) -> None:
+        super().__init__(dimensions)
+        self.documents = []
+        self.batches = []
+
+    def __call__(self, input):  # pylint: disable=redefined-builtin
+        self.documents.extend(input)
+        self.batches.append(len(input))
+        return super().__call__(input)
+
+
 class VectorStoreTestCase(unittest.TestCase):
     """
     Test cases for the VectorStore class.
@@ -107,3 +134,296 @@ class VectorStoreTestCase(unittest.TestCase):
 
         vector_store.reset_collection()
         self.assertEqual(len(vector_store.get_models()), 0)
+
+    def test_cached_embeddings_are_reused(self):
+        """
+        Test for the case when models are upserted again, by a new vector store that shares the embedding cache.
+        """
+        models = [
+            DbtModel(MODEL_WITH_ONLY_NAME),
+            DbtModel(MODEL_WITH_NAME_AND_DESCRIPTION),
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            embedding_fn = CountingEmbeddingFunction()
+            vector_store = VectorStore(
+                "api_key",
+                vector_db_path=os.path.join(tmp_dir, "chroma"),
+                embedding_fn=embedding_fn,
+            )
+            vector_store.upsert_models(models)
+
+            other_embedding_fn = CountingEmbeddingFunction()
+            other_vector_store = VectorStore(
+                "api_key",
+                vector_db_path=os.path.join(tmp_dir, "other_chroma"),
+                embedding_fn=other_embedding_fn,
+            )
+            other_vector_store.upsert_models(
+                [*models, DbtModel(MODEL_WITH_NAME_DESCRIPTION_AND_COLUMNS)]
+            )
+            closest_model = other_vector_store.query_collection(
+                models[1].as_prompt_text(), n_results=1
+            )[0]
+
+        self.assertEqual(
+            embedding_fn.documents, [model.as_prompt_text() for model in models]
+        )
+        self.assertEqual(
+            other_embedding_fn.documents,
+            [
+                DbtModel(MODEL_WITH_NAME_DESCRIPTION_AND_COLUMNS).as_prompt_text(),
+                models[1].as_prompt_text(),
+            ],
+        )
+        self.assertEqual(closest_model["id"], models[1].name)
+        self.assertAlmostEqual(closest_model["distance"], 0, places=5)
+
+    def test_embedding_cache_is_keyed_by_configuration(self):
+        """
+        Test for the case when embedding functions of the same class but with different configurations
+        share an embedding cache in a folder that does not exist yet.
+        """
+        models = [DbtModel(MODEL_WITH_ONLY_NAME)]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            embedding_cache_path = os.path.join(tmp_dir, "cache", "embeddings.sqlite")
+            embedding_fns = [
+                CountingEmbeddingFunction(dimensions=8),
+                CountingEmbeddingFunction(dimensions=16),
+            ]
+
+            for position, embedding_fn in enumerate(embedding_fns):
+                VectorStore(
+                    "api_key",
+                    vector_db_path=os.path.join(tmp_dir, f"vectors_{position}"),
+                    embedding_fn=embedding_fn,
+                    embedding_cache_path=embedding_cache_path,
+                    storage_backend="numpy",
+                ).upsert_models(models)
+
+        self.assertEqual([len(fn.documents) for fn in embedding_fns], [1, 1])
+        self.assertNotEqual(
+            get_embedding_cache_id(OpenAIEmbeddingFunction("api_key")),
+            get_embedding_cache_id(
+                OpenAIEmbeddingFunction("api_key", api_base="http://localhost:8000/v1")
+            ),
+        )
+
+    def test_sync_only_writes_changed_models(self):
+        """
+        Test for the case when the vector store is synced with models that were added, changed and removed.
+        """
+        changed_model = dict(MODEL_WITH_NAME_AND_DESCRIPTION)
+        changed_model["description"] = "A changed description."
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            embedding_fn = CountingEmbeddingFunction()
+            vector_store = VectorStore(
+                "api_key",
+                vector_db_path=os.path.join(tmp_dir, "chroma"),
+                embedding_fn=embedding_fn,
+                embedding_cache_path=os.path.join(tmp_dir, "embeddings.sqlite"),
+            )
+            first_counts = vector_store.sync(
+                [
+                    DbtModel(MODEL_WITH_ONLY_NAME),
+                    DbtModel(MODEL_WITH_NAME_AND_DESCRIPTION),
+                ]
+            )
+            embedding_fn.documents.clear()
+            second_counts = vector_store.sync(
+                [
+                    DbtModel(changed_model),
+                    DbtModel(MODEL_WITH_NAME_DESCRIPTION_AND_COLUMNS),
+                ]
+            )
+            third_counts = vector_store.sync(
+                [
+                    DbtModel(changed_model),
+                    DbtModel(MODEL_WITH_NAME_DESCRIPTION_AND_COLUMNS),
+                ]
+            )
+            partial_counts = vector_store.sync(
+                [DbtModel(changed_model)], delete_missing=False
+            )
+            stored_documents = {
+                model["id"]: model["document"] for model in vector_store.get_models()
+            }
+
+        self.assertEqual(
+            first_counts, {"added": 2, "updated": 0, "unchanged": 0, "deleted": 0}
+        )
+        self.assertEqual(
+            second_counts, {"added": 1, "updated": 1, "unchanged": 0, "deleted": 1}
+        )
+        self.assertEqual(
+            third_counts, {"added": 0, "updated": 0, "unchanged": 2, "deleted": 0}
+        )
+        self.assertEqual(
+            partial_counts, {"added": 0, "updated": 0, "unchanged": 1, "deleted": 0}
+        )
+        self.assertEqual(len(embedding_fn.documents), 2)
+        self.assertEqual(
+            stored_documents,
+            {
+                model.name: model.as_prompt_text()
+                for model in [
+                    DbtModel(changed_model),
+                    DbtModel(MODEL_WITH_NAME_DESCRIPTION_AND_COLUMNS),
+                ]
+            },
+        )
+
+    def test_repeated_queries_are_cached(self):
+        """
+        Test for the case when the same query is asked again before and after the collection changes.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            embedding_fn = CountingEmbeddingFunction()
+            result_cache = LRUCache()
+            vector_store = VectorStore(
+                "api_key",
+                vector_db_path=os.path.join(tmp_dir, "chroma"),
+                embedding_fn=embedding_fn,
+                query_embedding_cache=LRUCache(),
+                result_cache=result_cache,
+            )
+            vector_store.upsert_models([DbtModel(MODEL_WITH_NAME_AND_DESCRIPTION)])
+            embedding_fn.documents.clear()
+
+            first_results = vector_store.query_collection("Which model has orders?")
+            first_results[0]["id"] = "mutated"
+            second_results = vector_store.query_collection(
+                "  Which model   has orders? "
+            )
+            vector_store.upsert_models([DbtModel(MODEL_WITH_ONLY_NAME)])
+            third_results = vector_store.query_collection("Which model has orders?")
+
+        self.assertEqual(embedding_fn.documents.count("Which model has orders?"), 1)
+        self.assertEqual(
+            [result["id"] for result in second_results],
+            [MODEL_WITH_NAME_AND_DESCRIPTION["name"]],
+        )
+        self.assertEqual(len(third_results), 2)
+        self.assertEqual(len(result_cache), 2)
+
+    def test_query_embeddings_are_cached_by_configuration(self):
+        """
+        Test for the case when vector stores that use the same OpenAI model through different APIs
+        share a query embedding cache.
+        """
+        query_embedding_cache = LRUCache()
+
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch.object(
+            OpenAIEmbeddingFunction,
+            "__call__",
+            autospec=True,
+            side_effect=lambda _, documents: [[1.0, 0.0] for _ in documents],
+        ) as embed:
+            for position, api_base in enumerate([None, "http://localhost:8000/v1"]):
+                VectorStore(
+                    "api_key",
+                    vector_db_path=os.path.join(tmp_dir, f"vectors_{position}"),
+                    api_base=api_base,
+                    query_embedding_cache=query_embedding_cache,
+                    storage_backend="numpy",
+                ).query_collection("Which model has orders?")
+
+        self.assertEqual(embed.call_count, 2)
+
+    def test_many_queries_are_searched_in_batches(self):
+        """
+        Test for the case when many queries are searched at once.
+        """
+        models = [
+            DbtModel(MODEL_WITH_ONLY_NAME),
+            DbtModel(MODEL_WITH_NAME_AND_DESCRIPTION),
+            DbtModel(MODEL_WITH_NAME_DESCRIPTION_AND_COLUMNS),
+        ]
+        queries = [model.as_prompt_text() for model in reversed(models)]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            embedding_fn = CountingEmbeddingFunction()
+            vector_store = VectorStore(
+                "api_key",
+                vector_db_path=os.path.join(tmp_dir, "chroma"),
+                embedding_fn=embedding_fn,
+                embedding_pipeline=EmbeddingPipeline(max_batch_size=2),
+                query_embedding_cache=LRUCache(),
+            )
+            vector_store.upsert_models(models)
+            embedding_fn.batches.clear()
+
+            many_results = vector_store.query_collection_many(
+                [*queries, queries[0]], n_results=2
+            )
+            single_results = [
+                vector_store.query_collection(query, n_results=2) for query in queries
+            ]
+
+            with self.assertRaises(Exception):
+                vector_store.query_collection_many(["A query", ""])
+
+        self.assertEqual(sorted(embedding_fn.batches), [1, 2])
+        self.assertEqual(many_results[:3], single_results)
+        self.assertEqual(many_results[3], many_results[0])
+        self.assertEqual(
+            [results[0]["id"] for results in many_results[:3]],
+            [model.name for model in reversed(models)],
+        )
+
+    def test_hybrid_queries_find_exact_names(self):
+        """
+        Test for the case when a query names a column that the embeddings cannot tell apart.
+        """
+        models = [
+            DbtModel(
+                {
+                    "name": f"model_{i}",
+                    "description": f"Model number {i}",
+                    "columns": [{"name": f"column_{i}", "description": "A column"}],
+                }
+            )
+            for i in range(10)
+        ]
+        models[6].columns[0]["name"] = "customer_ltv"
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            vector_store = VectorStore(
+                "api_key",
+                vector_db_path=os.path.join(tmp_dir, "chroma"),
+                embedding_fn=HashEmbeddingFunction(dimensions=1),
+                query_embedding_cache=LRUCache(),
+            )
+            vector_store.upsert_models(models)
+            first_result = vector_store.query_collection(
+                "customer_ltv", n_results=1, mode="hybrid"
+            )[0]
+
+            vector_store.upsert_models(
+                [
+                    DbtModel(
+                        {
+                            "name": "orders",
+                            "columns": [{"name": "order_margin"}],
+                        }
+                    )
+                ]
+            )
+            vector_store.delete_models(["model_6"])
+            results = vector_store.query_collection_many(
+                ["customer_ltv", "order_margin"],
+                n_results=1,
+                mode="hybrid",
+            )
+
+            with self.assertRaises(Exception):
+                vector_store.query_collection("A query", mode="keyword")
+
+        self.assertEqual(first_result["id"], "model_6")
+        self.assertGreater(first_result["score"], 0)
+        self.assertIsNotNone(first_result["distance"])
+        self.assertNotEqual(results[0][0]["id"], "model_6")
+        self.assertEqual(results[1][0]["id"], "orders")
+        self.assertIsNotNone(results[1][0]["distance"])
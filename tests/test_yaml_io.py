@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from dbt_llm_tools.yaml_io import YamlCache, dump_yaml, load_yaml
+
+
+class YamlIOTestCase(unittest.TestCase):
+    """
+    Test cases for the shared yaml loading and dumping helpers.
+    """
+
+    def test_dbt_style_dump_indents_lists(self):
+        """
+        Test for the case when yaml is dumped for a dbt schema file.
+        """
+        content = {"version": 2, "models": [{"name": "model_1"}]}
+
+        self.assertEqual(
+            dump_yaml(content, dbt_style=True, sort_keys=False),
+            "version: 2\nmodels:\n  - name: model_1\n",
+        )
+        self.assertEqual(load_yaml(dump_yaml(content)), content)
+
+    def test_cache_reuses_parsed_documents(self):
+        """
+        Test for the case when the same yaml contents are loaded twice through the cache.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = YamlCache(os.path.join(tmp_dir, "yaml_cache"))
+
+            first = cache.load("models:\n  - name: model_1\n", "hash_1")
+            self.assertTrue(
+                os.path.isfile(os.path.join(tmp_dir, "yaml_cache", "hash_1.json"))
+            )
+
+            second = cache.load("not: parsed again", "hash_1")
+
+        self.assertEqual(first, {"models": [{"name": "model_1"}]})
+        self.assertEqual(second, first)
+
+    def test_prune_removes_unused_documents(self):
+        """
+        Test for the case when the cache holds documents of yaml files that are gone.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = YamlCache(os.path.join(tmp_dir, "yaml_cache"))
+
+            for content_hash in ["hash_1", "hash_2", "hash_3"]:
+                cache.load(f"name: {content_hash}", content_hash)
+
+            removed_count = cache.prune({"hash_2", "hash_4"})
+            cached_files = sorted(os.listdir(os.path.join(tmp_dir, "yaml_cache")))
+
+        self.assertEqual(removed_count, 2)
+        self.assertEqual(cached_files, ["hash_2.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()